@@ -24,13 +24,16 @@ from database_management.pymongo_client import (
     corporate_scenario_infra_collection,
 )
 from user_management.encryption import cipher_suite
-from user_management.utils import USER_ROLES
+from user_management.utils import USER_ROLES, invalidate_user_principal
 from cloud_management.utils import (
     get_instance_flavors, 
     get_instance_images,
     get_image_detail,
 )
 from ctf_management.utils import validate_file_size
+from ctf_management.catalog import bump_ctf_catalog_version
+from corporate_management.services.scenario_summary import rename_scenario_creator
+from corporate_management.services.scoring import invalidate_scoring_configs_for_scenario
 
 class UserAdminSerializer(serializers.Serializer):
     user_full_name = serializers.CharField(max_length=100)
@@ -212,6 +215,7 @@ class UserAdminSerializer(serializers.Serializer):
             "user_bio": "",
             "user_ctf_score": 0,
             "user_scenario_score": 0,
+            "total_score": 0,
             "user_badges_earned": [],
             "user_profile_liked_by": [],
             "user_profiles_liked": [],
@@ -356,6 +360,9 @@ class UserUpdateAdminSerializer(serializers.Serializer):
 
         user_values = { "$set": user}
         user_update = user_collection.update_one({'user_id':validated_data['user_id']}, user_values)
+        if validated_data["user_data"].get("user_full_name") != user["user_full_name"]:
+            rename_scenario_creator(validated_data['user_id'], user["user_full_name"])
+        invalidate_user_principal(validated_data['user_id'])
         user_game_update = user_profile_collection.update_one({'user_id':validated_data['user_id']}, {"$set": 
             {
                 'assigned_games.display_all_ctf': validated_data['display_all_ctf'],
@@ -390,6 +397,7 @@ class UserRemoveAdminSerializer(serializers.Serializer):
         user_id = self.validated_data["user_id"]
 
         result = user_collection.delete_one({"user_id": user_id})
+        invalidate_user_principal(user_id)
 
         if result.deleted_count == 0:
             raise serializers.ValidationError("User not found for deletion")
@@ -501,6 +509,7 @@ class CTFCategorySerializer(serializers.Serializer):
         }
 
         ctf_category_collection.insert_one(ctf_category)
+        bump_ctf_catalog_version()
         
         return ctf_category
     
@@ -606,6 +615,7 @@ class CTFCategoryUpdateSerializer(serializers.Serializer):
         }
 
         ctf_category_collection.update_one({"ctf_category_id":ctf_category_id},{"$set":ctf_category})
+        bump_ctf_catalog_version()
         
         return ctf_category
     
@@ -763,6 +773,7 @@ class CTFGameMappingSerializer(serializers.Serializer):
                 }
             }
         )
+        bump_ctf_catalog_version()
         
         return ctf_mapping
 
@@ -793,6 +804,7 @@ class CTFDeleteMappingSerializer(serializers.Serializer):
                 }
             }
         )
+        bump_ctf_catalog_version()
         
         return {}
     
@@ -976,6 +988,7 @@ class CTFGameUpdateSerializer(serializers.Serializer):
         }
 
         ctf_game_collection.update_one({"ctf_id":ctf_id},{"$set":ctf})
+        bump_ctf_catalog_version()
         
         return ctf
     
@@ -2244,5 +2257,6 @@ class AdminCorporateScenarioUpdateSerializer(serializers.Serializer):
             {"id": scenario_id},
             {"$set": update_doc}
         )
+        invalidate_scoring_configs_for_scenario(scenario_id)
 
         return {"message": "Scenario updated successfully"}
\ No newline at end of file
@@ -0,0 +1,143 @@
+import datetime
+import logging
+
+from celery import shared_task, current_app
+from django.conf import settings
+from pymongo import ReturnDocument
+
+from database_management.pymongo_client import cloud_instance_boot_collection, cloud_leaked_resource_collection
+from .teardown import (
+    teardown_resources,
+    TEARDOWN_COMPLETED,
+    LEAKED_RESOURCE_PENDING,
+    LEAKED_RESOURCE_RETRYING,
+    LEAKED_RESOURCE_RELEASED,
+    LEAKED_RESOURCE_ABANDONED,
+)
+from .utils import (
+    openstack_conn,
+    get_instance_address,
+    CLOUD_BOOT_TIMEOUT,
+    CLOUD_BOOT_PENDING,
+    CLOUD_BOOT_READY,
+    CLOUD_BOOT_FAILED,
+)
+
+logger = logging.getLogger(__name__)
+
+# Sweep attempts per leaked resource record before it is left for an operator
+CLOUD_LEAK_MAX_ATTEMPTS = getattr(settings, "CLOUD_LEAK_MAX_ATTEMPTS", 5)
+# A RETRYING record older than this belongs to a sweep that died and is claimed again
+CLOUD_LEAK_LEASE_SECONDS = getattr(settings, "CLOUD_LEAK_LEASE_SECONDS", 30 * 60)
+
+
+@shared_task
+def poll_pending_cloud_instances():
+    """
+    Resolves every pending instance boot with a single server list call and
+    dispatches the `on_ready` task of each boot group once all of its
+    instances are READY or FAILED.
+    """
+    pending_boots = list(cloud_instance_boot_collection.find({"status": CLOUD_BOOT_PENDING}, {"_id": 0}))
+    if not pending_boots:
+        return {"message": "No pending instance boots.", "ready": [], "failed": []}
+
+    servers = {server.id: server for server in openstack_conn.compute.servers(details=True)}
+
+    current_time = datetime.datetime.now()
+    ready_list, failed_list = [], []
+    settled_groups = set()
+
+    for boot in pending_boots:
+        server = servers.get(boot["instance_id"])
+        elapsed = (current_time - boot["created_at"]).total_seconds()
+
+        if server and server.status == "ACTIVE":
+            update = {"status": CLOUD_BOOT_READY, "ip": get_instance_address(server)}
+            ready_list.append(boot["instance_id"])
+        elif server and server.status == "ERROR":
+            fault = (server.fault or {}).get("message", "") if isinstance(server.fault, dict) else str(server.fault or "")
+            update = {"status": CLOUD_BOOT_FAILED, "fault": fault}
+            failed_list.append(boot["instance_id"])
+        elif elapsed > CLOUD_BOOT_TIMEOUT:
+            update = {"status": CLOUD_BOOT_FAILED, "fault": "Instance boot timed out." if server else "Instance not found."}
+            failed_list.append(boot["instance_id"])
+        else:
+            continue
+
+        update["updated_at"] = current_time
+        cloud_instance_boot_collection.update_one(
+            {"instance_id": boot["instance_id"], "status": CLOUD_BOOT_PENDING},
+            {"$set": update}
+        )
+        if boot.get("boot_group_id"):
+            settled_groups.add((boot["boot_group_id"], boot.get("on_ready", "")))
+
+    for boot_group_id, on_ready in settled_groups:
+        if cloud_instance_boot_collection.count_documents({"boot_group_id": boot_group_id, "status": CLOUD_BOOT_PENDING}):
+            continue
+
+        # Flip the flag atomically so overlapping polls dispatch the callback only once
+        dispatched = cloud_instance_boot_collection.update_many(
+            {"boot_group_id": boot_group_id, "callback_dispatched": False},
+            {"$set": {"callback_dispatched": True, "updated_at": current_time}}
+        )
+        if dispatched.modified_count and on_ready:
+            current_app.send_task(on_ready, args=[boot_group_id])
+            logger.info(f"Boot group {boot_group_id} settled, dispatched {on_ready}.")
+
+    return {
+        "message": "Pending instance boots polled.",
+        "ready": ready_list,
+        "failed": failed_list,
+    }
+
+
+def _claim_leaked_resource(started_at):
+    return cloud_leaked_resource_collection.find_one_and_update(
+        {"$or": [
+            # Records put back during this sweep wait for the next one
+            {"status": LEAKED_RESOURCE_PENDING, "updated_at": {"$lte": started_at}},
+            {"status": LEAKED_RESOURCE_RETRYING, "updated_at": {"$lte": started_at - datetime.timedelta(seconds=CLOUD_LEAK_LEASE_SECONDS)}},
+        ]},
+        {"$set": {"status": LEAKED_RESOURCE_RETRYING, "updated_at": datetime.datetime.now()}, "$inc": {"attempts": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+@shared_task
+def release_leaked_cloud_resources():
+    """
+    Retries the teardown of resources their owners gave up on. Each record is
+    claimed before its teardown, so overlapping sweeps never run it twice, and
+    left ABANDONED after CLOUD_LEAK_MAX_ATTEMPTS failed attempts.
+    """
+    released_list, failed_list = [], []
+    started_at = datetime.datetime.now()
+
+    while True:
+        leaked = _claim_leaked_resource(started_at)
+        if not leaked:
+            break
+
+        report = teardown_resources(**leaked["resources"])
+        if report["status"] == TEARDOWN_COMPLETED:
+            status = LEAKED_RESOURCE_RELEASED
+            released_list.append(leaked["leaked_resource_id"])
+        else:
+            status = LEAKED_RESOURCE_ABANDONED if leaked["attempts"] >= CLOUD_LEAK_MAX_ATTEMPTS else LEAKED_RESOURCE_PENDING
+            failed_list.append(leaked["leaked_resource_id"])
+            if status == LEAKED_RESOURCE_ABANDONED:
+                logger.error(f"Leaked resource {leaked['leaked_resource_id']} abandoned after {leaked['attempts']} attempts.")
+
+        cloud_leaked_resource_collection.update_one(
+            {"leaked_resource_id": leaked["leaked_resource_id"]},
+            {"$set": {"status": status, "teardown_report": report, "updated_at": datetime.datetime.now()}}
+        )
+
+    return {
+        "message": "Leaked cloud resources swept.",
+        "released": released_list,
+        "failed": failed_list,
+    }
@@ -0,0 +1,171 @@
+import datetime
+import logging
+import time
+
+from django.conf import settings
+from openstack import exceptions as openstack_exceptions
+
+from core.utils import generate_random_string
+from database_management.pymongo_client import cloud_leaked_resource_collection
+from .utils import openstack_conn, run_in_pool, CLOUD_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Attempts per resource before a layer is reported as failed
+CLOUD_TEARDOWN_RETRIES = getattr(settings, "CLOUD_TEARDOWN_RETRIES", 3)
+# Linear backoff between attempts, in seconds
+CLOUD_TEARDOWN_RETRY_DELAY = getattr(settings, "CLOUD_TEARDOWN_RETRY_DELAY", 2)
+
+TEARDOWN_COMPLETED = "COMPLETED"
+TEARDOWN_FAILED = "FAILED"
+TEARDOWN_SKIPPED = "SKIPPED"
+
+# cloud_leaked_resource_collection statuses
+LEAKED_RESOURCE_PENDING = "PENDING"
+LEAKED_RESOURCE_RETRYING = "RETRYING"
+LEAKED_RESOURCE_RELEASED = "RELEASED"
+LEAKED_RESOURCE_ABANDONED = "ABANDONED"
+
+# Each layer can only go once everything in the previous one is gone
+TEARDOWN_LAYERS = ("instances", "router_interfaces", "routers", "subnets", "networks")
+
+
+def _delete_instance(instance_id):
+    server = openstack_conn.compute.find_server(instance_id, ignore_missing=True)
+    if server:
+        openstack_conn.compute.delete_server(server, ignore_missing=True)
+        openstack_conn.compute.wait_for_delete(server)
+
+
+def _remove_router_interface(router_id, subnet_id):
+    try:
+        openstack_conn.network.remove_interface_from_router(router_id, subnet_id)
+    except openstack_exceptions.NotFoundException:
+        # Router gone or subnet already detached
+        pass
+
+
+def _delete_router(router_id):
+    openstack_conn.network.delete_router(router_id, ignore_missing=True)
+
+
+def _delete_subnet(subnet_id):
+    openstack_conn.network.delete_subnet(subnet_id, ignore_missing=True)
+
+
+def _delete_network(network_id):
+    openstack_conn.network.delete_network(network_id, ignore_missing=True)
+
+
+TEARDOWN_ACTIONS = {
+    "instances": _delete_instance,
+    "router_interfaces": _remove_router_interface,
+    "routers": _delete_router,
+    "subnets": _delete_subnet,
+    "networks": _delete_network,
+}
+
+
+def build_teardown_plan(instance_ids=(), routers=(), networks=()):
+    """
+    Groups cloud resources into dependency layers.
+
+    routers: [{"router_id": ..., "subnet_ids": [...]}]
+    networks: [{"network_id": ..., "subnet_id": ...}]
+    Returns {layer: [job args tuple, ...]} in TEARDOWN_LAYERS order.
+    """
+    plan = {layer: [] for layer in TEARDOWN_LAYERS}
+
+    plan["instances"] = [(instance_id,) for instance_id in dict.fromkeys(instance_ids) if instance_id]
+    for router in routers:
+        plan["router_interfaces"] += [(router["router_id"], subnet_id) for subnet_id in router.get("subnet_ids", [])]
+        plan["routers"].append((router["router_id"],))
+    for network in networks:
+        if network.get("subnet_id"):
+            plan["subnets"].append((network["subnet_id"],))
+        plan["networks"].append((network["network_id"],))
+
+    for layer in TEARDOWN_LAYERS:
+        plan[layer] = list(dict.fromkeys(plan[layer]))
+    return plan
+
+
+def _with_retries(action):
+    def run(*args):
+        for attempt in range(1, CLOUD_TEARDOWN_RETRIES + 1):
+            try:
+                action(*args)
+                return attempt
+            except Exception as e:
+                if attempt == CLOUD_TEARDOWN_RETRIES:
+                    raise
+                logger.warning(f"Teardown of {args} failed (attempt {attempt}): {str(e)}")
+                time.sleep(CLOUD_TEARDOWN_RETRY_DELAY * attempt)
+    return run
+
+
+def execute_teardown(plan, max_workers=CLOUD_MAX_WORKERS):
+    """
+    Deletes the resources of a plan layer by layer, each layer concurrently
+    on the bounded pool. Every action is idempotent (missing resources count
+    as deleted), so a failed teardown can simply be executed again.
+
+    Returns a report:
+    {"status": COMPLETED | FAILED, "duration": seconds,
+     "layers": {layer: {"status", "deleted": [...], "failed": [{"resource", "error"}]}}}
+    """
+    started_at = time.monotonic()
+    report = {"status": TEARDOWN_COMPLETED, "layers": {}}
+
+    for layer in TEARDOWN_LAYERS:
+        jobs = plan.get(layer, [])
+        if report["status"] == TEARDOWN_FAILED:
+            report["layers"][layer] = {"status": TEARDOWN_SKIPPED, "deleted": [], "failed": [], "pending": [list(job) for job in jobs]}
+            continue
+
+        results = run_in_pool(_with_retries(TEARDOWN_ACTIONS[layer]), jobs, max_workers=max_workers)
+        layer_report = {"status": TEARDOWN_COMPLETED, "deleted": [], "failed": []}
+        for job, (_, error) in zip(jobs, results):
+            resource = job[0] if len(job) == 1 else list(job)
+            if error:
+                layer_report["failed"].append({"resource": resource, "error": str(error)})
+            else:
+                layer_report["deleted"].append(resource)
+
+        if layer_report["failed"]:
+            layer_report["status"] = TEARDOWN_FAILED
+            report["status"] = TEARDOWN_FAILED
+            logger.error(f"Teardown layer {layer} failed: {layer_report['failed']}")
+        report["layers"][layer] = layer_report
+
+    report["duration"] = round(time.monotonic() - started_at, 2)
+    return report
+
+
+def teardown_resources(instance_ids=(), routers=(), networks=(), max_workers=CLOUD_MAX_WORKERS):
+    return execute_teardown(build_teardown_plan(instance_ids, routers, networks), max_workers=max_workers)
+
+
+def record_leaked_resources(source, source_id, resources, report):
+    """
+    Hands the resources of a teardown its owner gave up on to the leaked
+    resource sweep, so they stay recorded and are retried once the owner's
+    own records are gone.
+
+    resources: the teardown_resources kwargs (instance_ids, routers, networks)
+    """
+    current_time = datetime.datetime.now()
+    leaked_resource_id = generate_random_string("LEAKED_RESOURCE", 16)
+    cloud_leaked_resource_collection.insert_one({
+        "leaked_resource_id": leaked_resource_id,
+        "source": source,
+        "source_id": source_id,
+        "resources": resources,
+        "status": LEAKED_RESOURCE_PENDING,
+        "attempts": 0,
+        "teardown_report": report,
+        "created_at": current_time,
+        "updated_at": current_time,
+    })
+    logger.error(f"Teardown of {source} {source_id} failed, recorded as leaked resource {leaked_resource_id}.")
+    return leaked_resource_id
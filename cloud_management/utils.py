@@ -1,6 +1,11 @@
+import datetime
 import openstack
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 
+from core.cache import TTLCache
+from database_management.pymongo_client import cloud_instance_boot_collection
+
 
 openstack.enable_logging(debug=False)
 openstack_conn = openstack.connect(cloud='openstack')
@@ -9,30 +14,116 @@ openstack_conn = openstack.connect(cloud='openstack')
 openstack_conn = openstack.connection.from_config()
 # openstack_conn = openstack.connection.Connection(auth_url=settings.AUTH_URL, project_id=settings.PROJECT_ID, user_domain_name=settings.USER_DOMAIN_NAME, password=settings.PASSWORD, username=settings.USERNAME)
 
+# Upper bound on concurrent OpenStack calls issued by a single task, so fan-outs don't overload Nova/Neutron.
+CLOUD_MAX_WORKERS = getattr(settings, "CLOUD_MAX_WORKERS", 8)
+
+# Pending instance boots are polled in batches instead of blocking a worker in wait_for_server.
+CLOUD_BOOT_TIMEOUT = getattr(settings, "CLOUD_BOOT_TIMEOUT", 600)
+CLOUD_BOOT_PENDING = "BUILD"
+CLOUD_BOOT_READY = "READY"
+CLOUD_BOOT_FAILED = "FAILED"
+
+# Image/flavor catalogs change rarely; cache them in-process and in Redis
+CLOUD_METADATA_CACHE_TTL = getattr(settings, "CLOUD_METADATA_CACHE_TTL", 600)
+image_cache = TTLCache("cloud_images", ttl=CLOUD_METADATA_CACHE_TTL, local_ttl=60)
+flavor_cache = TTLCache("cloud_flavors", ttl=CLOUD_METADATA_CACHE_TTL, local_ttl=60)
+
+# noVNC console tokens stay valid for a while (nova consoleauth token_ttl), so reuse them
+CONSOLE_URL_CACHE_TTL = getattr(settings, "CONSOLE_URL_CACHE_TTL", 300)
+console_url_cache = TTLCache("console_urls", ttl=CONSOLE_URL_CACHE_TTL)
+
+
+def run_in_pool(func, jobs, max_workers=CLOUD_MAX_WORKERS):
+    """
+    Runs func(*job) for every job on a bounded thread pool.
+    Returns a list of (result, error) tuples in the same order as jobs.
+    """
+    jobs = [job if isinstance(job, tuple) else (job,) for job in jobs]
+    if not jobs:
+        return []
+
+    def _call(job):
+        try:
+            return func(*job), None
+        except Exception as e:
+            return None, e
+
+    max_workers = max(1, min(int(max_workers or 1), len(jobs)))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_call, jobs))
+
+
+class CachedResource(dict):
+    """Cached OpenStack metadata; supports both item and attribute access like the SDK resources."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def _image_to_dict(image):
+    return {
+        "id": image.id,
+        "name": image.name,
+        "status": image.status,
+        "size": image.size,
+        "disk_format": image.disk_format,
+        "min_disk": image.min_disk,
+        "min_ram": image.min_ram,
+    }
+
+def _flavor_to_dict(flavor):
+    return {
+        "id": flavor.id,
+        "name": flavor.name,
+        "ram": flavor.ram,
+        "vcpus": flavor.vcpus,
+        "disk": flavor.disk,
+    }
+
 def get_instance_images():
-    images = openstack_conn.image.images()
-    choices = [(image.id, image.name) for image in images]
+    images = image_cache.get("list", lambda: [[image.id, image.name] for image in openstack_conn.image.images()])
+    choices = [tuple(image) for image in images]
     return choices
 
 def get_instance_flavors():
-    flavors = openstack_conn.compute.flavors()
-    choices = [(flavor.id, flavor.name) for flavor in flavors]
+    flavors = flavor_cache.get("list", lambda: [[flavor.id, flavor.name] for flavor in openstack_conn.compute.flavors()])
+    choices = [tuple(flavor) for flavor in flavors]
     return choices
 
 def get_image_detail(image_id):
     try:
-        image = openstack_conn.image.get_image(image_id)
+        image = CachedResource(image_cache.get(image_id, lambda: _image_to_dict(openstack_conn.image.get_image(image_id))))
     except Exception as e:
         image = None
     return image
 
 def get_flavor_detail(flavor_id):
     try:
-        flavor = openstack_conn.compute.get_flavor(flavor_id)
+        flavor = CachedResource(flavor_cache.get(flavor_id, lambda: _flavor_to_dict(openstack_conn.compute.get_flavor(flavor_id))))
     except Exception as e:
         flavor = None
     return flavor
 
+def invalidate_cloud_metadata(image_id=None, flavor_id=None):
+    """
+    Drops cached image/flavor metadata. With no arguments both catalogs are cleared;
+    call it after images or flavors are added, renamed or removed in OpenStack.
+    """
+    if image_id is None and flavor_id is None:
+        image_cache.invalidate()
+        flavor_cache.invalidate()
+        return
+
+    if image_id is not None:
+        image_cache.invalidate(image_id)
+        image_cache.invalidate("list")
+    if flavor_id is not None:
+        flavor_cache.invalidate(flavor_id)
+        flavor_cache.invalidate("list")
+
 def get_cloud_network(network_id):
     try:
         network = openstack_conn.network.get_network(network_id)
@@ -73,6 +164,48 @@ def get_instance_console(instance):
     instance_console = openstack_conn.compute.create_server_remote_console(server=instance, protocol='vnc', type='novnc')
     return instance_console
 
+def _create_console_url(instance_id):
+    return get_instance_console(instance_id).url
+
+def get_instance_console_urls(instance_ids):
+    """
+    Returns {instance_id: noVNC url or None} for every requested instance.
+    URLs are cached per instance for CONSOLE_URL_CACHE_TTL; the remaining
+    instances are checked with one server list call and their consoles are
+    created concurrently.
+    """
+    instance_ids = [instance_id for instance_id in dict.fromkeys(instance_ids) if instance_id]
+    console_urls = {}
+    missing_ids = []
+
+    for instance_id in instance_ids:
+        console_url = console_url_cache.get(instance_id)
+        if console_url:
+            console_urls[instance_id] = console_url
+        else:
+            missing_ids.append(instance_id)
+
+    if len(missing_ids) > 1:
+        try:
+            existing_ids = {server.id for server in openstack_conn.compute.servers(details=False)}
+        except Exception as e:
+            existing_ids = set(missing_ids)
+
+        for instance_id in missing_ids:
+            if instance_id not in existing_ids:
+                console_urls[instance_id] = None
+        missing_ids = [instance_id for instance_id in missing_ids if instance_id in existing_ids]
+
+    for instance_id, (console_url, error) in zip(missing_ids, run_in_pool(_create_console_url, missing_ids)):
+        console_urls[instance_id] = console_url
+        if console_url:
+            console_url_cache.set(instance_id, console_url)
+
+    return console_urls
+
+def get_instance_console_url(instance_id):
+    return get_instance_console_urls([instance_id]).get(instance_id)
+
 def create_cloud_network(network_name_initial="", subnet_cidr = "192.168.169.0/24", network_name="", subnet_name=""):
     if len(network_name_initial) > 0:
         network_name = network_name_initial + "_network"
@@ -101,31 +234,74 @@ def connect_router_to_private_network(router, private_network_subnet):
     updated_router = openstack_conn.network.add_interface_to_router(router, subnet_id=private_network_subnet.id)
     return updated_router
 
-def create_cloud_instance(instance_name, instance_image_id, instance_flavor_id, instance_network_id, instance_availability_zone="nova"):
+def _build_instance_networks(instance_network_id):
     if isinstance(instance_network_id, list):
-        networks = [{"uuid": net_id} for net_id in instance_network_id if net_id]
+        return [{"uuid": net_id} for net_id in instance_network_id if net_id]
     elif isinstance(instance_network_id, str):
-        networks = [{"uuid": instance_network_id}]
-    else:
-        networks = []
+        return [{"uuid": instance_network_id}]
+    return []
+
+def get_instance_address(instance):
+    internet_protocol = ""
+    try:
+        instance_info = instance.to_dict()
+        for address_obj in (instance_info.get("addresses") or {}).values():
+            if address_obj :
+                for single_obj in address_obj:
+                    internet_protocol = single_obj.get("addr","")
+    except :
+        internet_protocol = ""
+    return internet_protocol
+
+def create_cloud_instance(instance_name, instance_image_id, instance_flavor_id, instance_network_id, instance_availability_zone="nova"):
     instance = openstack_conn.compute.create_server(
             name=instance_name,
             availability_zone= instance_availability_zone,
             image_id=instance_image_id,
             flavor_id=instance_flavor_id, 
-            networks=networks,
+            networks=_build_instance_networks(instance_network_id),
         )
     instance_wait = openstack_conn.compute.wait_for_server(instance, wait=600)
-    try:
-        instance_info = instance_wait.to_dict()
-        for address_obj in instance_info.get("addresses",{}).values():
-            if address_obj :
-                for single_obj in address_obj:
-                    internet_protocol = single_obj.get("addr","")
-    except :
-        internet_protocol = ""
+    internet_protocol = get_instance_address(instance_wait)
     return instance, internet_protocol
 
+def submit_cloud_instance(instance_name, instance_image_id, instance_flavor_id, instance_network_id, instance_availability_zone="nova", boot_group_id="", on_ready=""):
+    """
+    Non-blocking variant of create_cloud_instance.
+    Submits the server create and records a pending boot document; the
+    cloud_management.tasks.poll_pending_cloud_instances beat task marks it
+    READY/FAILED and, once a whole boot group has settled, calls the
+    `on_ready` task with the boot_group_id.
+    """
+    instance = openstack_conn.compute.create_server(
+            name=instance_name,
+            availability_zone= instance_availability_zone,
+            image_id=instance_image_id,
+            flavor_id=instance_flavor_id, 
+            networks=_build_instance_networks(instance_network_id),
+        )
+
+    current_time = datetime.datetime.now()
+    cloud_instance_boot_collection.insert_one({
+        "instance_id": instance.id,
+        "instance_name": instance_name,
+        "boot_group_id": boot_group_id,
+        "on_ready": on_ready,
+        "status": CLOUD_BOOT_PENDING,
+        "ip": "",
+        "fault": "",
+        "callback_dispatched": False,
+        "created_at": current_time,
+        "updated_at": current_time,
+    })
+    return instance
+
+def get_boot_group(boot_group_id):
+    return list(cloud_instance_boot_collection.find({"boot_group_id": boot_group_id}, {"_id": 0}))
+
+def delete_boot_group(boot_group_id):
+    cloud_instance_boot_collection.delete_many({"boot_group_id": boot_group_id})
+
 def delete_cloud_instance(instance):
     openstack_conn.compute.delete_server(instance.id)
     instance_wait = openstack_conn.compute.wait_for_delete(instance)
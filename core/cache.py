@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+
+import redis
+
+from database_management.redis_client import redis_client
+
+# namespace -> TTLCache, used for reporting hit-rate counters
+CACHE_REGISTRY = {}
+
+
+class TTLCache:
+    """
+    Two-level cache: a per-process dict in front of Redis, both with a TTL.
+
+    The local layer uses a shorter TTL (local_ttl) so that an invalidation in
+    one process reaches every other process within local_ttl seconds. Redis
+    errors fall through to the loader, so Redis is never a hard dependency.
+    Values must be JSON serialisable.
+    """
+
+    def __init__(self, namespace, ttl, local_ttl=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local_ttl = min(local_ttl or ttl, ttl)
+        self._local = {}
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        CACHE_REGISTRY[namespace] = self
+
+    def _redis_key(self, key):
+        return f"cache:{self.namespace}:{key}"
+
+    def _set_local(self, key, value):
+        with self._lock:
+            self._local[key] = (value, time.monotonic() + self.local_ttl)
+
+    def get(self, key, loader=None):
+        key = str(key)
+        with self._lock:
+            cached = self._local.get(key)
+        if cached and cached[1] > time.monotonic():
+            self.local_hits += 1
+            return cached[0]
+
+        try:
+            raw = redis_client.get(self._redis_key(key))
+        except redis.RedisError:
+            raw = None
+        if raw is not None:
+            value = json.loads(raw)
+            self.redis_hits += 1
+            self._set_local(key, value)
+            return value
+
+        self.misses += 1
+        if loader is None:
+            return None
+
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def set(self, key, value):
+        key = str(key)
+        self._set_local(key, value)
+        try:
+            redis_client.set(self._redis_key(key), json.dumps(value, default=str), ex=self.ttl)
+        except redis.RedisError:
+            pass
+
+    def invalidate(self, key=None):
+        """Drops one key, or the whole namespace when key is None."""
+        with self._lock:
+            if key is None:
+                self._local.clear()
+            else:
+                self._local.pop(str(key), None)
+        try:
+            if key is None:
+                redis_keys = list(redis_client.scan_iter(match=self._redis_key("*")))
+                if redis_keys:
+                    redis_client.delete(*redis_keys)
+            else:
+                redis_client.delete(self._redis_key(key))
+        except redis.RedisError:
+            pass
+
+    def stats(self):
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "ttl": self.ttl,
+            "local_ttl": self.local_ttl,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.local_hits + self.redis_hits) / lookups, 2) if lookups else 0,
+        }
+
+
+def get_cache_stats():
+    return [cache.stats() for cache in CACHE_REGISTRY.values()]
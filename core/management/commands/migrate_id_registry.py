@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand
+from pymongo.errors import OperationFailure
+
+from database_management.indexes import INDEX_REGISTRY
+from database_management.pymongo_client import dbname, id_collection
+
+
+def _unique_id_indexes():
+    """(collection name, field, spec) for every single-field unique index in the registry."""
+    for collection_name, declared in INDEX_REGISTRY.items():
+        for spec in declared:
+            if spec["options"].get("unique") and len(spec["keys"]) == 1:
+                yield collection_name, spec["keys"][0][0], spec
+
+
+def _duplicates(collection, field, limit=5):
+    return [
+        group["_id"]
+        for group in collection.aggregate([
+            {"$match": {field: {"$exists": True}}},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+            {"$limit": limit},
+        ], allowDiskUse=True)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves ID uniqueness from the legacy id_collection registry to unique indexes on the owning "
+        "collections: reports duplicate IDs, upgrades non-unique ID indexes and optionally drops the registry."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report, do not change any index.")
+        parser.add_argument("--drop-registry", action="store_true", help="Drop id_collection once every ID index is unique.")
+
+    def handle(self, *args, **options):
+        blocked = 0
+
+        for collection_name, field, spec in _unique_id_indexes():
+            collection = dbname.get_collection(collection_name)
+
+            duplicates = _duplicates(collection, field)
+            if duplicates:
+                blocked += 1
+                self.stdout.write(self.style.ERROR(f"{collection_name}.{field}: duplicate values {duplicates}, fix them first"))
+                continue
+
+            existing = next(
+                (
+                    (name, info) for name, info in collection.index_information().items()
+                    if list(info["key"]) == spec["keys"]
+                ),
+                None
+            )
+            if existing and existing[1].get("unique"):
+                continue
+
+            if options["dry_run"]:
+                blocked += 1
+                state = "not unique" if existing else "missing"
+                self.stdout.write(self.style.WARNING(f"{collection_name}.{field}: unique index {state}"))
+                continue
+
+            try:
+                if existing:
+                    collection.drop_index(existing[0])
+                collection.create_index(spec["keys"], **spec["options"])
+                self.stdout.write(self.style.SUCCESS(f"{collection_name}.{field}: unique index created"))
+            except OperationFailure as e:
+                blocked += 1
+                self.stdout.write(self.style.ERROR(f"{collection_name}.{field}: {str(e)}"))
+
+        registered = id_collection.estimated_document_count()
+        if not options["drop_registry"]:
+            self.stdout.write(f"id_collection still holds {registered} reserved IDs; it is no longer read or written.")
+        elif blocked or options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"Keeping id_collection, {blocked} ID indexes are not unique yet."))
+        else:
+            id_collection.drop()
+            self.stdout.write(self.style.SUCCESS(f"Dropped id_collection ({registered} reserved IDs)."))
+
+        self.stdout.write(self.style.SUCCESS(f"Done, {blocked} ID indexes need attention."))
@@ -14,7 +14,9 @@ from database_management.pymongo_client import (
 from cloud_management.utils import (
     get_instance_images, 
     get_instance_flavors,
+    invalidate_cloud_metadata,
 )
+from .cache import get_cache_stats
 
 from .utils import NEWS_API_KEY
 
@@ -97,3 +99,12 @@ class TotalResourcesSerializer(serializers.Serializer):
 class NewsListSerializer(serializers.Serializer):
     def get(self):
         return []
+
+
+class CacheStatsSerializer(serializers.Serializer):
+    def get(self):
+        return get_cache_stats()
+
+    def invalidate(self):
+        invalidate_cloud_metadata()
+        return {"message": "Cloud metadata cache cleared."}
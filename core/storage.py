@@ -0,0 +1,159 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# "local" writes under OBJECT_STORAGE_ROOT, "s3" talks to any S3-compatible
+# endpoint (MinIO locally). Either way files are served by nginx or the
+# bucket from OBJECT_STORAGE_PUBLIC_URL, never through Django.
+OBJECT_STORAGE_BACKEND = getattr(settings, "OBJECT_STORAGE_BACKEND", "local")
+OBJECT_STORAGE_ROOT = getattr(settings, "OBJECT_STORAGE_ROOT", "static")
+OBJECT_STORAGE_PUBLIC_URL = getattr(settings, "OBJECT_STORAGE_PUBLIC_URL", f"{settings.API_URL}/static")
+OBJECT_STORAGE_CHUNK_SIZE = getattr(settings, "OBJECT_STORAGE_CHUNK_SIZE", 64 * 1024)
+
+# Read once at import: os.umask can only be queried by setting it, which is not thread safe
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def iter_file_chunks(fileobj, chunk_size=OBJECT_STORAGE_CHUNK_SIZE):
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class _ChunkReader:
+    """File-like wrapper over a chunk iterator, for APIs that want .read()."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class StorageBackend:
+    """Keys are "/"-separated relative paths such as chat_attachments/ab/abcd.pdf."""
+
+    def save(self, key, chunks, content_type=None):
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def url(self, key):
+        return f"{OBJECT_STORAGE_PUBLIC_URL.rstrip('/')}/{key}"
+
+
+class LocalStorageBackend(StorageBackend):
+
+    def __init__(self, root=OBJECT_STORAGE_ROOT):
+        self.root = root
+        self._created_dirs = set()
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def _ensure_dir(self, directory):
+        if directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
+
+    def save(self, key, chunks, content_type=None):
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        self._ensure_dir(directory)
+
+        # Write next to the target and rename, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as dst:
+                for chunk in chunks:
+                    dst.write(chunk)
+            # mkstemp creates 0600 files; nginx may run as another user
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+
+class S3StorageBackend(StorageBackend):
+    """S3-compatible bucket; boto3 is only needed when this backend is configured."""
+
+    def __init__(self):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise ImproperlyConfigured("OBJECT_STORAGE_BACKEND = 's3' requires boto3.")
+
+        self.bucket = getattr(settings, "OBJECT_STORAGE_BUCKET", "cyber-range")
+        self._client_error = ClientError
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=getattr(settings, "OBJECT_STORAGE_ENDPOINT_URL", None),
+            aws_access_key_id=getattr(settings, "OBJECT_STORAGE_ACCESS_KEY", None),
+            aws_secret_access_key=getattr(settings, "OBJECT_STORAGE_SECRET_KEY", None),
+        )
+
+    def save(self, key, chunks, content_type=None):
+        extra_args = {"ContentType": content_type} if content_type else None
+        # upload_fileobj streams in multipart parts instead of buffering the whole file
+        self.client.upload_fileobj(_ChunkReader(chunks), self.bucket, key, ExtraArgs=extra_args)
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+
+STORAGE_BACKENDS = {
+    "local": LocalStorageBackend,
+    "s3": S3StorageBackend,
+}
+
+_storage_backend = None
+
+
+def get_storage_backend():
+    global _storage_backend
+    if _storage_backend is None:
+        if OBJECT_STORAGE_BACKEND not in STORAGE_BACKENDS:
+            raise ImproperlyConfigured(f"Unknown OBJECT_STORAGE_BACKEND {OBJECT_STORAGE_BACKEND!r}.")
+        _storage_backend = STORAGE_BACKENDS[OBJECT_STORAGE_BACKEND]()
+    return _storage_backend
+
+
+def stage_upload(uploaded_file, staging_dir):
+    """
+    Moves a Django upload that is already spooled to disk into staging_dir
+    (a rename on the same filesystem) and returns the staged path.
+    """
+    os.makedirs(staging_dir, exist_ok=True)
+    fd, staged_path = tempfile.mkstemp(dir=staging_dir, prefix="upload-")
+    os.close(fd)
+    shutil.move(uploaded_file.temporary_file_path(), staged_path)
+    return staged_path
@@ -7,6 +7,7 @@ from .views import (
     ScenarioForceDeleteGameView,
     TotalResourcesView,
     NewsListView,
+    CacheStatsView,
 )
 
 app_name = "core"
@@ -17,7 +18,8 @@ urlpatterns = [
     path('mailing-list/', MailingListView.as_view(), name='mailing-list'),
     path('instance/essentials/list/', InstanceEssentialsView.as_view(), name= "instance-essentials"),
     path('total/resources/', TotalResourcesView.as_view(), name= "total-resources"),
-    path('news/', NewsListView.as_view(), name= "total-resources")
+    path('news/', NewsListView.as_view(), name= "total-resources"),
+    path('cache/stats/', CacheStatsView.as_view(), name= "cache-stats"),
 
 ]
 
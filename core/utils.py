@@ -1,11 +1,11 @@
 import string
-import random
+import secrets
 import socket
 import whois
 import requests
 import time
 
-from database_management.pymongo_client import id_collection, ctf_active_game_collection, scenario_active_game_collection
+from database_management.pymongo_client import ctf_active_game_collection, scenario_active_game_collection
 from celery import shared_task
 from django.conf import settings
 
@@ -37,22 +37,16 @@ BLACKLISTED_REGISTRARS = [
 BLACKLISTED_DOMAINS = []
 
 
-def generate_random_string(id_type, length=10):
-
-    letters_and_digits = string.ascii_letters + string.digits
-
-    id = ''.join(random.choice(letters_and_digits) for i in range(length))
+ID_ALPHABET = string.ascii_letters + string.digits
 
-    while id_collection.find_one({'id': id, 'id_type': id_type}):
-        id = ''.join(random.choice(letters_and_digits) for i in range(length))
 
-    id_obj = {
-        'id': id,
-        'id_type': id_type
-    }
-    id_collection.insert_one(id_obj)
-
-    return id
+def generate_random_string(id_type, length=10):
+    """
+    Returns a random ID drawn from the OS CSPRNG, without any database round trip.
+    Uniqueness is enforced by the unique index on the owning collection (declared in
+    database_management.indexes); id_type only documents what the ID is for.
+    """
+    return ''.join(secrets.choice(ID_ALPHABET) for _ in range(length))
 
 
 @shared_task(bind = True)
@@ -119,43 +113,6 @@ def auto_login():
     response = requests.post(url, json= credentials_data, headers=headers)
     return response.json()["access_token"]
 
-def auto_delete_service_in_openstack(ctf_game_id):
-    token = auto_login()
-    url = f"{API_URL}/api/core/game/force/delete/{ctf_game_id}/"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.delete(url, headers= headers)
-    return response
-
-@shared_task(bind = True)
-def game_auto_delete_in_30_min(self):
-    ctf_active_game_list = list(ctf_active_game_collection.find({},{"_id":0,"ctf_game_id":1,"ctf_end_time":1}))
-
-    active_game_id_list = list()
-    error_list = list()
-    for active_game in ctf_active_game_list:
-        actual_time_remaining = active_game["ctf_end_time"] - time.time()
-        if actual_time_remaining <= 0 :
-            delete_response = auto_delete_service_in_openstack(active_game["ctf_game_id"])
-            if delete_response.status_code == 202:
-                active_game_id_list.append(active_game["ctf_game_id"])
-            else:
-                error_list.append(active_game["ctf_game_id"])
-    
-    if ctf_active_game_list and active_game_id_list:
-        response = {
-            "message" : "Games Delete Successfully.",
-            "ctf_game_id_list" : active_game_id_list,
-            "error_list" : error_list,
-        }
-        return response
-    else:
-        response = {
-            "message" : "No pending games to delete.",
-            "ctf_game_id_list" : [],
-            "error_list" : error_list,
-        }
-        return response
-
 ############################
 ### Commented Now later use
    
@@ -3,7 +3,7 @@ from rest_framework.response import Response
 from ctf_management.views import CTFDeleteGameView
 from scenario_management.views import ScenarioGameDeleteView
 from user_management.permissions import CustomIsSuperAdmin
-from .serializers import MailingListSerializer, InstanceEssentialsSerializer, TotalResourcesSerializer, NewsListSerializer
+from .serializers import MailingListSerializer, InstanceEssentialsSerializer, TotalResourcesSerializer, NewsListSerializer, CacheStatsSerializer
 from drf_yasg.utils import swagger_auto_schema
 
 
@@ -90,4 +90,25 @@ class NewsListView(generics.ListAPIView):
 
         if 'errors' in queryset:
             return Response(queryset, status=status.HTTP_400_BAD_REQUEST)
-        return Response(queryset, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(queryset, status=status.HTTP_200_OK)
+
+
+class CacheStatsView(generics.ListAPIView):
+    permission_classes = [CustomIsSuperAdmin]
+    serializer_class = CacheStatsSerializer
+
+    @swagger_auto_schema(
+        operation_summary="Cache Hit-Rate Counters",
+        responses={200: CacheStatsSerializer(many=True)},
+    )
+    def get(self, request, *args, **kwargs):
+        serializer = self.serializer_class()
+        return Response(serializer.get(), status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_summary="Invalidate Cloud Metadata Cache",
+        responses={200: "Success"},
+    )
+    def delete(self, request, *args, **kwargs):
+        serializer = self.serializer_class()
+        return Response(serializer.invalidate(), status=status.HTTP_200_OK)
@@ -1,21 +1,27 @@
 import pymongo
+from urllib.parse import parse_qs
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from rest_framework.exceptions import AuthenticationFailed
 
 from database_management.pymongo_client import notification_group_collection, notification_collection
 from user_management.utils import get_user_from_access_token
 from database_management.pymongo_client import user_collection
 from database_management.pymongo_client import active_scenario_collection,participant_data_collection
+from notification_management.consumers import GroupEventReplayMixin
+from corporate_management.services.chat_access import build_chat_channels
+from corporate_management.services.chat_history import (
+    CHAT_MESSAGE_MAX_LENGTH,
+    broadcast_chat_message,
+    chat_group_name,
+    store_chat_message,
+)
 
-class NotificationConsumer(AsyncJsonWebsocketConsumer):
+class NotificationConsumer(GroupEventReplayMixin, AsyncJsonWebsocketConsumer):
 
     async def connect(self):
-        self.group_name = self.scope['url_route']['kwargs']['group_name']
-        await self.channel_layer.group_add(self.group_name, self.channel_name)
-        await self.accept()
-
-    async def receive(self, text_data):
-        await self.send_json(text_data)
+        await self.join_authorized_group()
     # async def receive_json(self, content, **kwargs):
     #     print("\n\n Data Received from Client: \n", content, "\n\n")
     #     await self.send_json(content)
@@ -57,11 +63,63 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
     #     })
     #     print("\n\n 22 \n\n")
 
-    async def notification_message(self, event):
-        await self.send_json({
-            'notifications': event['notification']
-        })        
-        
     async def disconnect(self, close_code):         
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
-        
\ No newline at end of file
+        
+
+class ScenarioChatConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Live team chat for one active scenario: ws corporate/chat/<active_scenario_id>/?token=<access token>.
+    The socket joins every channel build_chat_channels allows for the user.
+
+    Client -> server: {"action": "send", "channel_key": ..., "message": ...}
+    Server -> client: {"type": "channels", ...}, {"type": "message", "message": ...}, {"type": "error", ...}
+    Attachments still go through the REST send endpoint, which fans out the same way.
+    """
+
+    async def connect(self):
+        self.active_scenario_id = self.scope['url_route']['kwargs']['active_scenario_id']
+        self.channel_groups = {}
+
+        token = parse_qs(self.scope.get('query_string', b'').decode()).get('token', [None])[0]
+        try:
+            self.user = await database_sync_to_async(get_user_from_access_token)(token)
+        except AuthenticationFailed:
+            await self.close()
+            return
+
+        channels = await database_sync_to_async(build_chat_channels)(self.active_scenario_id, self.user)
+        if not channels:
+            await self.close()
+            return
+
+        self.channel_groups = {channel["channel_key"]: chat_group_name(channel["channel_key"]) for channel in channels}
+        for group_name in self.channel_groups.values():
+            await self.channel_layer.group_add(group_name, self.channel_name)
+
+        await self.accept()
+        await self.send_json({'type': 'channels', 'channels': channels})
+
+    async def receive_json(self, content, **kwargs):
+        if content.get('action') != 'send':
+            await self.send_json({'type': 'error', 'error': "Unsupported action"})
+            return
+
+        channel_key = content.get('channel_key')
+        message = (content.get('message') or "").strip()
+        if channel_key not in self.channel_groups:
+            await self.send_json({'type': 'error', 'error': "You are not a member of this chat channel"})
+            return
+        if not message or len(message) > CHAT_MESSAGE_MAX_LENGTH:
+            await self.send_json({'type': 'error', 'error': f"Message must be 1 to {CHAT_MESSAGE_MAX_LENGTH} characters"})
+            return
+
+        stored = await database_sync_to_async(store_chat_message)(self.user, self.active_scenario_id, channel_key, message)
+        await broadcast_chat_message(stored)
+
+    async def chat_message(self, event):
+        await self.send_json({'type': 'message', 'message': event['message']})
+
+    async def disconnect(self, close_code):
+        for group_name in self.channel_groups.values():
+            await self.channel_layer.group_discard(group_name, self.channel_name)
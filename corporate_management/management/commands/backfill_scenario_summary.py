@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from corporate_management.services.scenario_summary import compute_scenario_summary
+from database_management.pymongo_client import corporate_scenario_collection
+
+
+class Command(BaseCommand):
+    help = "Stores total_points, creator_name and type on corporate scenarios, repairing drifted values."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario-id", help="Only repair this scenario.")
+
+    def handle(self, *args, **options):
+        query = {"id": options["scenario_id"]} if options.get("scenario_id") else {}
+        scenarios = corporate_scenario_collection.find(
+            query, {"_id": 0, "id": 1, "creator_id": 1, "type": 1, "flag_data": 1, "milestone_data": 1,
+                    "total_points": 1, "creator_name": 1}
+        )
+
+        checked, repaired = 0, 0
+        for scenario in scenarios:
+            checked += 1
+            summary = compute_scenario_summary(scenario)
+            if any(scenario.get(key) != value for key, value in summary.items()):
+                corporate_scenario_collection.update_one({"id": scenario["id"]}, {"$set": summary})
+                repaired += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} corporate scenarios, repaired {repaired}."))
@@ -4,4 +4,5 @@ from . import consumers
 
 corporate_websocket_urlpatterns = [
     path('corporate/notification/<slug:group_name>/', consumers.NotificationConsumer.as_asgi()),
+    path('corporate/chat/<str:active_scenario_id>/', consumers.ScenarioChatConsumer.as_asgi()),
 ]
\ No newline at end of file
@@ -14,14 +14,42 @@ from django.conf import settings
 from cloud_management.utils import (
     get_instance_images,
     get_instance_flavors,
-    get_cloud_instance,
-    get_instance_console,
+    get_instance_console_url,
+    get_instance_console_urls,
     get_flavor_detail,
 )
 from core.utils import generate_random_string, API_URL
 from ctf_management.utils import validate_file_size
 from corporate_management.scoring.decay import compute_decay_score
 from corporate_management.scoring.standard import compute_standard_score
+from corporate_management.services.leaderboard import record_participant_score
+from corporate_management.services.snapshot import load_active_scenario_snapshot
+from corporate_management.services.chat_access import get_allowed_channel_keys, invalidate_chat_roster
+from corporate_management.services.chat_attachments import (
+    prepare_chat_attachment,
+    schedule_chat_attachment,
+    CHAT_ATTACHMENT_CONTENT_TYPES,
+)
+from corporate_management.services.chat_history import (
+    CHAT_PAGE_SIZE,
+    InvalidChatCursor,
+    get_chat_messages,
+    store_chat_message,
+)
+from corporate_management.services.scenario_summary import (
+    refresh_scenario_summary,
+    get_scenario_points,
+    get_scenario_type_label,
+)
+from corporate_management.services.scoring import (
+    get_scenario_scoring_config,
+    parse_start_time,
+    apply_flag_score,
+    record_wrong_flag_answer,
+    invalidate_scoring_configs_for_scenario,
+    hash_flag_answer,
+    is_flag_answer_correct,
+)
 from database_management.pymongo_client import (
     scenario_category_collection,
     corporate_scenario_collection,
@@ -189,6 +217,10 @@ class CorporateScenarioCreateSerializer(serializers.Serializer):
             "type": validated_data["type"],              # FLAG / MILESTONE
             "scoring_config": scoring_config,            # ✅ NEW
 
+            # denormalized for listings, see services.scenario_summary
+            "total_points": 0,
+            "creator_name": validated_data["user"].get("user_full_name", "Unknown"),
+
             "phases": [],
             "infra_id": None,
             "is_prepared": False,
@@ -330,6 +362,8 @@ class CorporateScenarioFlagCreateSerializer(serializers.Serializer):
                 }
             }
         )
+        refresh_scenario_summary(scenario_id)
+        invalidate_scoring_configs_for_scenario(scenario_id)
 
         return {"flags": created}
 
@@ -421,6 +455,7 @@ class CorporateScenarioMilestoneCreateSerializer(serializers.Serializer):
                 }
             }
         )
+        refresh_scenario_summary(scenario_id)
 
         return {"milestones": created}
     
@@ -1016,14 +1051,9 @@ class CorporateScenarioConsoleSerializer(serializers.Serializer):
         consoles = []
         console_url = None
         if selected_instance_id:
+            console_urls = get_instance_console_urls(instance_ids)
             for iid in instance_ids:
-                try:
-                    instance = get_cloud_instance(iid)
-                    console = get_instance_console(instance)
-                    url = console.url
-                except Exception:
-                    url = None
-                consoles.append({"instance_id": iid, "console_url": url})
+                consoles.append({"instance_id": iid, "console_url": console_urls.get(iid)})
 
             # current console url (selected)
             for c in consoles:
@@ -1268,14 +1298,11 @@ class CorporateScenarioSwitchMachineSerializer(serializers.Serializer):
             {"id": validated_data["participant_data_id"]},
             {"$set": {"selected_instance_id": validated_data["instance_id"], "updated_at": datetime.datetime.now()}}
         )
+        invalidate_chat_roster(validated_data["active_scenario_id"])
         return {"message": "Machine switched", "instance_id": validated_data["instance_id"]}
 
-ALLOWED_CHAT_FILE_TYPES = (
-    ".pdf", ".png", ".jpg", ".jpeg",
-    ".txt", ".log", ".csv", ".json"
-)
+ALLOWED_CHAT_FILE_TYPES = tuple(CHAT_ATTACHMENT_CONTENT_TYPES)
 
-CHAT_UPLOAD_DIR = "static/chat_attachments"
 
 
 class ScenarioChatSendSerializer(serializers.Serializer):
@@ -1307,88 +1334,43 @@ class ScenarioChatSendSerializer(serializers.Serializer):
                     f"File type {ext} not allowed"
                 )
 
+        user = self.context["request"].user
+        if data["channel_key"] not in get_allowed_channel_keys(data["active_scenario_id"], user):
+            raise serializers.ValidationError("You are not a member of this chat channel")
+
         return data
 
     def create(self, validated_data):
         user = self.context["request"].user
-        now = timezone.now()
 
         attachments_meta = []
+        staged = []
 
         for f in validated_data.get("attachments", []):
-            ext = os.path.splitext(f.name)[1]
-            att_id = f"ATT_{uuid.uuid4().hex[:12]}"
-            new_name = f"{att_id}{ext}"
-
-            save_path = os.path.join(CHAT_UPLOAD_DIR, new_name)
-            os.makedirs(CHAT_UPLOAD_DIR, exist_ok=True)
-
-            with open(save_path, "wb+") as dst:
-                for chunk in f.chunks():
-                    dst.write(chunk)
-
-            attachments_meta.append({
-                "id": att_id,
-                "file_name": f.name,
-                "file_type": f.content_type,
-                "file_url": f"{settings.API_URL}/{save_path}",
-                "uploaded_at": now.isoformat(),
-            })
-
-        # =====================================================
-        # 🔑 FIX: DETERMINE CHAT ROLE FROM PARTICIPANT DATA
-        # =====================================================
-        sender_role = "WHITE"
-        sender_team_group = "WHITE"
-
-        participant = participant_data_collection.find_one(
-            {"user_id": user["user_id"]},
-            {"_id": 0}
+            attachment, staged_path = prepare_chat_attachment(f)
+            attachments_meta.append(attachment)
+            if staged_path:
+                staged.append((staged_path, attachment))
+
+        message = store_chat_message(
+            user,
+            validated_data["active_scenario_id"],
+            validated_data["channel_key"],
+            validated_data.get("message", ""),
+            attachments_meta,
         )
 
-        if participant:
-            # NORMAL PLAYER
-            sender_role = (participant.get("team") or "WHITE").upper()
-            sender_team_group = participant.get("team_group", "DEFAULT")
-        else:
-            # WHITE TEAM / ADMIN / SUPERADMIN
-            if user.get("is_superadmin"):
-                sender_role = "SUPERADMIN"
-            else:
-                sender_role = "WHITE"
-
-            sender_team_group = "WHITE"
-
-        # =====================================================
-        # MESSAGE DOCUMENT
-        # =====================================================
-        doc = {
-            "id": f"MSG_{int(now.timestamp() * 1000)}",
-            "active_scenario_id": validated_data["active_scenario_id"],
-            "channel_key": validated_data["channel_key"],
-
-            "sender_user_id": str(user["user_id"]),
-            "sender_name": str(user.get("user_full_name") or ""),
-            "sender_role": sender_role,                 # ✅ FIXED
-            "sender_team_group": sender_team_group,     # ✅ FIXED
-
-            "message": validated_data.get("message", "").strip(),
-            "attachments": attachments_meta,
-            "created_at": now.isoformat(),
-        }
-
-        scenario_chat_messages_collection.insert_one(doc)
-        doc.pop("_id", None)
-        return doc
+        # Large files are stored by a worker, which pushes the message again once they are READY
+        for staged_path, attachment in staged:
+            schedule_chat_attachment(staged_path, message, attachment)
+        return message
 
 class ScenarioChatMessageListSerializer(serializers.Serializer):
-    def get(self, channel_key):
-        return list(
-            scenario_chat_messages_collection.find(
-                {"channel_key": channel_key},
-                {"_id": 0}
-            ).sort("created_at", 1)
-        )
+    def get(self, channel_key, before=None, after=None, limit=CHAT_PAGE_SIZE):
+        try:
+            return get_chat_messages(channel_key, before=before, after=after, limit=limit)
+        except (InvalidChatCursor, ValueError, TypeError):
+            raise serializers.ValidationError("Invalid pagination parameters.")
     
 
 class CorporateScenarioSubmitFlagSerializer(serializers.Serializer):
@@ -1400,10 +1382,7 @@ class CorporateScenarioSubmitFlagSerializer(serializers.Serializer):
         user = self.context["request"].user
         data["user"] = user
 
-        active = active_scenario_collection.find_one(
-            {"id": data["active_scenario_id"]},
-            {"_id": 0}
-        )
+        active = get_scenario_scoring_config(data["active_scenario_id"])
         if not active:
             raise serializers.ValidationError("Invalid Active Scenario")
 
@@ -1413,7 +1392,8 @@ class CorporateScenarioSubmitFlagSerializer(serializers.Serializer):
         pd_id = active["participant_data"][user["user_id"]]
         participant = participant_data_collection.find_one(
             {"id": pd_id, "flag_data.flag_id": data["flag_id"]},
-            {"_id": 0}
+            {"_id": 0, "id": 1, "user_id": 1, "team": 1, "team_group": 1, "total_obtained_score": 1,
+             "flag_data": {"$elemMatch": {"flag_id": data["flag_id"]}}}
         )
         if not participant:
             raise serializers.ValidationError("Invalid Flag")
@@ -1428,17 +1408,16 @@ class CorporateScenarioSubmitFlagSerializer(serializers.Serializer):
         participant = validated_data["_participant"]
         pd_id = validated_data["_participant_data_id"]
 
-        scenario = corporate_scenario_collection.find_one(
-            {"id": active["scenario_id"]},
-            {"_id": 0}
-        ) or {}
+        scoring_config = active["scoring_config"]
 
-        scoring_config = scenario.get("scoring_config", {"type": "standard"})
-
-        flag = flag_data_collection.find_one(
-            {"id": validated_data["flag_id"]},
-            {"_id": 0}
-        ) or {}
+        flag = active["flags"].get(validated_data["flag_id"])
+        if flag is None:
+            # Flag added to the scenario after the config was cached
+            flag = flag_data_collection.find_one(
+                {"id": validated_data["flag_id"]},
+                {"_id": 0, "score": 1, "hint_penalty": 1, "answer": 1}
+            ) or {}
+            flag["answer_hash"] = hash_flag_answer(flag.get("answer"))
 
         base_score = int(flag.get("score", 0))
         hint_penalty = int(flag.get("hint_penalty", 0))
@@ -1446,19 +1425,12 @@ class CorporateScenarioSubmitFlagSerializer(serializers.Serializer):
         now = datetime.datetime.now()
 
         # ---------------- FIND FLAG STATE ----------------
-        attempts = 0
-        already_correct = False
-        hint_used = False
-
-        for f in participant.get("flag_data", []):
-            if f.get("flag_id") == validated_data["flag_id"]:
-                attempts = int(f.get("retires", 0))
-                already_correct = bool(f.get("is_correct", False))
-                hint_used = bool(f.get("hint_used", False))
-                break
+        flag_state = participant["flag_data"][0]
+        attempts = int(flag_state.get("retires", 0))
+        hint_used = bool(flag_state.get("hint_used", False))
 
         # ❌ No re-scoring
-        if already_correct:
+        if flag_state.get("is_correct"):
             return {
                 "message": "Flag already solved",
                 "is_correct": True,
@@ -1469,63 +1441,27 @@ class CorporateScenarioSubmitFlagSerializer(serializers.Serializer):
         attempts_next = attempts + 1
 
         # ---------------- VERIFY ANSWER ----------------
-        is_correct = (
-            str(validated_data["submitted_answer"]).strip()
-            == str(flag.get("answer")).strip()
-        )
-
-        filter_q = {
-            "id": pd_id,
-            "flag_data.flag_id": validated_data["flag_id"],
-        }
+        is_correct = is_flag_answer_correct(flag, validated_data["submitted_answer"])
 
         # ---------------- WRONG ANSWER ----------------
         if not is_correct:
-            participant_data_collection.update_one(
-                filter_q,
-                {
-                    "$set": {
-                        "flag_data.$.is_correct": False,
-                        "flag_data.$.submitted_response": validated_data["submitted_answer"],
-                        "flag_data.$.submitted_at": now,
-                        "flag_data.$.updated_at": now,
-                        "flag_data.$.retires": attempts_next,
-                        "flag_data.$.obtained_score": 0,
-                    }
-                }
+            updated_pd = record_wrong_flag_answer(
+                pd_id, validated_data["flag_id"], validated_data["submitted_answer"], now
             )
 
             return {
-                "message": "Wrong Answer",
-                "is_correct": False,
+                "message": "Wrong Answer" if updated_pd else "Flag already solved",
+                "is_correct": False if updated_pd else True,
                 "awarded_score": 0,
-                "total_obtained_score": participant.get("total_obtained_score", 0),
+                "total_obtained_score": (updated_pd or participant).get("total_obtained_score", 0),
             }
 
-        raw_start = active.get("start_time")
-
-        # ---------------- FIX START TIME ----------------
-        start_time = active.get("start_time")
-        if isinstance(raw_start, str):
-            parsed_start = datetime.datetime.fromisoformat(raw_start.replace("Z", ""))
-        else:
-            parsed_start = raw_start
-
-        print("PARSED start_time:", parsed_start, type(parsed_start))
-
-        if isinstance(parsed_start, datetime.datetime):
-            print("ELAPSED MINUTES:",
-                (now - parsed_start).total_seconds() / 60)
-
-        print("SCORING CONFIG:", scoring_config)
-        print("=============================")
-
         # ---------------- SCORING ----------------
         if scoring_config.get("type") == "decay":
             awarded, meta = compute_decay_score(
                 base_score=base_score,
                 scoring_config=scoring_config,
-                start_time=start_time,
+                start_time=parse_start_time(active.get("start_time")),
                 event_time=now,
                 attempts=attempts_next,
                 hint_used=hint_used,
@@ -1540,35 +1476,20 @@ class CorporateScenarioSubmitFlagSerializer(serializers.Serializer):
 
         meta = _sanitize_meta(meta)
 
-        # ---------------- UPDATE FLAG ----------------
-        participant_data_collection.update_one(
-            filter_q,
-            {
-                "$set": {
-                    "flag_data.$.is_correct": True,
-                    "flag_data.$.obtained_score": int(awarded),
-                    "flag_data.$.submitted_response": validated_data["submitted_answer"],
-                    "flag_data.$.submitted_at": now,
-                    "flag_data.$.updated_at": now,
-                    "flag_data.$.achieved_at": now,
-                    "flag_data.$.retires": attempts_next,
-                    "flag_data.$.score_meta": meta,
-                }
-            }
-        )
-
-        # ---------------- TOTAL SCORE ----------------
-        updated_pd = participant_data_collection.find_one(
-            {"id": pd_id},
-            {"_id": 0}
+        # ---------------- UPDATE FLAG + TOTAL ----------------
+        updated_pd = apply_flag_score(
+            pd_id, validated_data["flag_id"], validated_data["submitted_answer"], awarded, meta, now
         )
+        if not updated_pd:
+            # A concurrent submission solved the flag first
+            return {
+                "message": "Flag already solved",
+                "is_correct": True,
+                "awarded_score": 0,
+                "total_obtained_score": participant.get("total_obtained_score", 0),
+            }
 
-        total = sum(int(x.get("obtained_score", 0)) for x in updated_pd["flag_data"])
-
-        participant_data_collection.update_one(
-            {"id": pd_id},
-            {"$set": {"total_obtained_score": total}}
-        )
+        total = updated_pd.get("total_obtained_score", 0)
 
         return {
             "message": "Correct Answer",
@@ -1576,6 +1497,7 @@ class CorporateScenarioSubmitFlagSerializer(serializers.Serializer):
             "awarded_score": int(awarded),
             "scoring_type": scoring_config.get("type", "standard"),
             "total_obtained_score": total,
+            "leaderboard": record_participant_score(active["id"], updated_pd, total),
         }
 
 ALLOWED_EVIDENCE_EXT = ("pdf", "jpg", "jpeg", "png")
@@ -1852,12 +1774,13 @@ class CorporateScenarioApproveMilestoneSerializer(serializers.Serializer):
         if result.matched_count == 0:
             raise serializers.ValidationError("Milestone approval failed")
 
+        updated_participant = participant_data_collection.find_one(
+            {"id": validated_data["participant_data_id"]},
+            {"_id": 0},
+        )
         total = sum(
             int(m.get("obtained_score", 0))
-            for m in participant_data_collection.find_one(
-                {"id": validated_data["participant_data_id"]},
-                {"_id": 0},
-            )["milestone_data"]
+            for m in updated_participant["milestone_data"]
         )
 
         participant_data_collection.update_one(
@@ -1869,6 +1792,9 @@ class CorporateScenarioApproveMilestoneSerializer(serializers.Serializer):
             "message": "Milestone Approved",
             "final_score": final_score,
             "scoring_type": scoring_config.get("type", "standard"),
+            "leaderboard": record_participant_score(
+                validated_data["active_scenario"]["id"], updated_participant, total
+            ),
         }
 
 class CorporateScenarioRejectMilestoneSerializer(serializers.Serializer):
@@ -2145,15 +2071,12 @@ class CorporateScenarioModeratorSerializer(serializers.Serializer):
 
         team_groups = {}   # 🔥 NEW: Team A / Team B / etc
 
-        # ---------- PARTICIPANTS LOOP ----------
-        for key in active_scenario["participant_data"]:
-            participant_data = participant_data_collection.find_one(
-                {"id": active_scenario["participant_data"][key]},
-                {"_id": 0}
-            )
-            if not participant_data:
-                continue
+        snapshot = load_active_scenario_snapshot(
+            active_scenario, scenario, with_milestones=bool(scenario.get("milestone_data"))
+        )
 
+        # ---------- PARTICIPANTS LOOP ----------
+        for _, participant_data in snapshot["participants"]:
             # 🔑 NEW FIELD (defaults safe)
             team_group = participant_data.get("team_group", "Default")
 
@@ -2165,16 +2088,13 @@ class CorporateScenarioModeratorSerializer(serializers.Serializer):
                     "yellow_team": [],
                 }
 
-            user_info = user_collection.find_one(
-                {"user_id": participant_data["user_id"]},
-                {"_id": 0}
-            )
+            user_info = snapshot["users"].get(participant_data["user_id"], {})
 
             temp = {
                 "participant_data_id": participant_data["id"],
                 "participant_id": participant_data["user_id"],
-                "participant_name": user_info["user_full_name"],
-                "participant_avatar": user_info["user_avatar"],
+                "participant_name": user_info.get("user_full_name"),
+                "participant_avatar": user_info.get("user_avatar"),
                 "team": participant_data["team"],
                 "team_group": team_group,            # 🔥 NEW
                 "total_score": participant_data["total_score"],
@@ -2189,10 +2109,9 @@ class CorporateScenarioModeratorSerializer(serializers.Serializer):
                 hint_used_count = 0
 
                 for md in participant_data.get("milestone_data", []):
-                    milestone = milestone_data_collection.find_one(
-                        {"id": md["milestone_id"]},
-                        {"_id": 0}
-                    )
+                    milestone = snapshot["milestones"].get(md["milestone_id"])
+                    if not milestone:
+                        continue
 
                     milestone_temp = {
                         "id": md["milestone_id"],
@@ -2277,19 +2196,14 @@ class CorporateScenarioModeratorSerializer(serializers.Serializer):
             scenario.pop(key, None)
         
         try:
-            instance_id = None
-
             # pick any participant (first is fine for moderator)
-            for pd_id in active_scenario["participant_data"].values():
-                pd = participant_data_collection.find_one({"id": pd_id}, {"_id": 0})
-                if pd and pd.get("instance_id"):
-                    instance_id = pd["instance_id"]
-                    break
+            instance_id = next(
+                (pd["instance_id"] for _, pd in snapshot["participants"] if pd.get("instance_id")),
+                None
+            )
 
             if instance_id:
-                instance = get_cloud_instance(instance_id)
-                console = get_instance_console(instance)
-                scenario["console_url"] = console.url
+                scenario["console_url"] = get_instance_console_url(instance_id)
             else:
                 scenario["console_url"] = None
 
@@ -2332,17 +2246,15 @@ class CorporateScenarioModeratorConsoleSerializer(serializers.Serializer):
             "kill_chain_progress": scenario.get("kill_chain_progress", []),
         }
 
-        # ================= PARTICIPANTS ======================
-        for uid, pd_id in active["participant_data"].items():
+        snapshot = load_active_scenario_snapshot(
+            active, scenario, with_milestones=is_milestone, with_flags=is_flag
+        )
 
-            pd = participant_data_collection.find_one(
-                {"id": pd_id}, {"_id": 0}
-            )
-            user_obj = user_collection.find_one(
-                {"user_id": uid}, {"_id": 0}
-            )
+        # ================= PARTICIPANTS ======================
+        for uid, pd in snapshot["participants"]:
 
-            if not pd or not user_obj:
+            user_obj = snapshot["users"].get(uid)
+            if not user_obj:
                 continue
 
             payload["participants_data"].append({
@@ -2359,20 +2271,11 @@ class CorporateScenarioModeratorConsoleSerializer(serializers.Serializer):
 
             milestone_list = []
 
-            for uid, pd_id in active["participant_data"].items():
-
-                pd = participant_data_collection.find_one(
-                    {"id": pd_id}, {"_id": 0}
-                )
-                if not pd:
-                    continue
+            for uid, pd in snapshot["participants"]:
 
                 for md in pd.get("milestone_data", []):
 
-                    milestone = milestone_data_collection.find_one(
-                        {"id": md["milestone_id"]},
-                        {"_id": 0}
-                    )
+                    milestone = snapshot["milestones"].get(md["milestone_id"])
                     if not milestone:
                         continue
 
@@ -2396,20 +2299,11 @@ class CorporateScenarioModeratorConsoleSerializer(serializers.Serializer):
 
             flag_list = []
 
-            for uid, pd_id in active["participant_data"].items():
-
-                pd = participant_data_collection.find_one(
-                    {"id": pd_id}, {"_id": 0}
-                )
-                if not pd:
-                    continue
+            for uid, pd in snapshot["participants"]:
 
                 for fd in pd.get("flag_data", []):
 
-                    flag_db = flag_data_collection.find_one(
-                        {"id": fd["flag_id"]},
-                        {"_id": 0}
-                    )
+                    flag_db = snapshot["flags"].get(fd["flag_id"])
                     if not flag_db:
                         continue
 
@@ -2460,12 +2354,7 @@ class CorporateActiveScenarioDeleteSerializer(serializers.Serializer):
         # if active_scenario["participant_data"].get(user["user_id"]):
         #     return {"errors":"You are not authorised to deleted this game."}
 
-        active_scenario["end_time"] = datetime.datetime.now()
-        archive_scenario_collection.insert_one(active_scenario)
-        active_scenario.pop("_id")
-        active_scenario_collection.delete_one({"id": active_scenario["id"]})
-
-        end_corporate_game.delay(active_scenario)
+        end_active_corporate_scenario(active_scenario)
 
         # subnet_dict = {}
 
@@ -2487,11 +2376,6 @@ class CorporateActiveScenarioDeleteSerializer(serializers.Serializer):
         # for network in active_scenario["networks"]:
         #     delete_cloud_network(network['network_id'], network['subnet_id'])
 
-        for key in active_scenario["participant_data"]:
-            participant_data = participant_data_collection.find_one({"id": active_scenario["participant_data"][key]})
-            archive_participant_collection.insert_one(participant_data)
-            participant_data_collection.delete_one({"id": active_scenario["participant_data"][key]})
-
         return {'message': 'Scenario Deleted Successfully'}
 
 
@@ -2554,12 +2438,7 @@ class CorporateScenarioModeratorConsoleDetailSerializer(serializers.Serializer):
         instance_id = participant.get("instance_id")
 
         if instance_id:
-            try:
-                instance = get_cloud_instance(instance_id)
-                console = get_instance_console(instance)
-                console_url = getattr(console, "url", None)
-            except Exception:
-                console_url = None
+            console_url = get_instance_console_url(instance_id)
 
         # ================= FLAG SCENARIO =====================
         if is_flag:
@@ -2712,53 +2591,6 @@ class CorporateByCategoryIdSerializer(serializers.Serializer):
                 for scenario in scenario_category_detail_list:
                     scenario['display'] = scenario['id'] in query["$in"]
 
-                for scenario in scenario_category_detail_list:
-                    user = user_collection.find_one({"user_id": scenario["creator_id"]})
-                    scenario["creator_name"] = user["user_full_name"]
-
-                    scenario["type"] = "Milestone" if scenario.get("milestone_data") else "Flag"
-
-                    if scenario.get("milestone_data"):
-                        inner_score = 0
-                        if scenario["milestone_data"].get("red_team"):
-                            for i in scenario["milestone_data"].get("red_team"):
-                                score = milestone_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                                inner_score += score["score"]
-                        if scenario["milestone_data"].get("blue_team"):
-                            for i in scenario["milestone_data"].get("blue_team"):
-                                score = milestone_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                                inner_score += score["score"]
-                        if scenario["milestone_data"].get("purple_team"):
-                            for i in scenario["milestone_data"].get("purple_team"):
-                                score = milestone_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                                inner_score += score["score"]
-                        if scenario["milestone_data"].get("yellow_team"):
-                            for i in scenario["milestone_data"].get("yellow_team"):
-                                score = milestone_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                                inner_score += score["score"]
-
-                    else:
-                        inner_score = 0
-                        if scenario["flag_data"].get("red_team"):
-                            for i in scenario["flag_data"].get("red_team"):
-                                score = flag_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                                inner_score += score["score"]
-                        if scenario["flag_data"].get("blue_team"):
-                            for i in scenario["flag_data"].get("blue_team"):
-                                score = flag_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                                inner_score += score["score"]
-                        if scenario["flag_data"].get("purple_team"):
-                            for i in scenario["flag_data"].get("purple_team"):
-                                score = flag_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                                inner_score += score["score"]
-                        if scenario["flag_data"].get("yellow_team"):
-                            for i in scenario["flag_data"].get("yellow_team"):
-                                score = flag_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                                inner_score += score["score"]
-
-                    scenario["points"] = inner_score
-
-
         else:
             scenario_category_detail_list = list(
                 corporate_scenario_collection.find({
@@ -2772,51 +2604,12 @@ class CorporateByCategoryIdSerializer(serializers.Serializer):
                      'created_at': 0,
                      'updated_at': 0,
                      }))
-            for scenario in scenario_category_detail_list:
-                user = user_collection.find_one({"user_id": scenario["creator_id"]})
-                scenario["creator_name"] = user["user_full_name"]
-
-                scenario["type"] = "Milestone" if scenario.get("milestone_data") else "Flag"
-
-                if scenario.get("milestone_data"):
-                    inner_score = 0
-                    if scenario["milestone_data"].get("red_team"):
-                        for i in scenario["milestone_data"].get("red_team"):
-                            score = milestone_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                            inner_score += score["score"]
-                    if scenario["milestone_data"].get("blue_team"):
-                        for i in scenario["milestone_data"].get("blue_team"):
-                            score = milestone_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                            inner_score += score["score"]
-                    if scenario["milestone_data"].get("purple_team"):
-                        for i in scenario["milestone_data"].get("purple_team"):
-                            score = milestone_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                            inner_score += score["score"]
-                    if scenario["milestone_data"].get("yellow_team"):
-                        for i in scenario["milestone_data"].get("yellow_team"):
-                            score = milestone_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                            inner_score += score["score"]
 
-                else:
-                    inner_score = 0
-                    if scenario["flag_data"].get("red_team"):
-                        for i in scenario["flag_data"].get("red_team"):
-                            score = flag_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                            inner_score += score["score"]
-                    if scenario["flag_data"].get("blue_team"):
-                        for i in scenario["flag_data"].get("blue_team"):
-                            score = flag_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                            inner_score += score["score"]
-                    if scenario["flag_data"].get("purple_team"):
-                        for i in scenario["flag_data"].get("purple_team"):
-                            score = flag_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                            inner_score += score["score"]
-                    if scenario["flag_data"].get("yellow_team"):
-                        for i in scenario["flag_data"].get("yellow_team"):
-                            score = flag_data_collection.find_one({"id": i}, {"_id": 0, "score": 1})
-                            inner_score += score["score"]
-
-                scenario["points"] = inner_score
+        for scenario in scenario_category_detail_list:
+            if "creator_name" not in scenario:
+                scenario.update(refresh_scenario_summary(scenario["id"]) or {})
+            scenario["points"] = get_scenario_points(scenario)
+            scenario["type"] = get_scenario_type_label(scenario)
 
         return scenario_category_detail_list
 
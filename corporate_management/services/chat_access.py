@@ -1,3 +1,6 @@
+from django.conf import settings
+
+from core.cache import TTLCache
 from database_management.pymongo_client import (
     active_scenario_collection,
     participant_data_collection,
@@ -5,15 +8,61 @@ from database_management.pymongo_client import (
 
 ROLE_CHANNELS = ["RED", "BLUE", "PURPLE", "YELLOW"]
 
-def build_chat_channels(active_scenario_id: str, user: dict):
-    if not active_scenario_id or not user:
-        return []
+# Team assignments are fixed once a scenario starts; machine switches and
+# the scenario ending drop the entry explicitly.
+CORPORATE_CHAT_ROSTER_CACHE_TTL = getattr(settings, "CORPORATE_CHAT_ROSTER_CACHE_TTL", 300)
+
+chat_roster_cache = TTLCache("corporate_chat_roster", ttl=CORPORATE_CHAT_ROSTER_CACHE_TTL, local_ttl=30)
+
 
+def _load_chat_roster(active_scenario_id):
     active = active_scenario_collection.find_one(
         {"id": active_scenario_id},
-        {"_id": 0}
+        {"_id": 0, "started_by": 1, "participant_data": 1}
     )
     if not active:
+        return None
+
+    participants = {
+        pd["user_id"]: {
+            "team": (pd.get("team") or "").upper(),
+            "team_group": pd.get("team_group", "DEFAULT"),
+        }
+        for pd in participant_data_collection.find(
+            {"id": {"$in": list(active.get("participant_data", {}).values())}},
+            {"_id": 0, "user_id": 1, "team": 1, "team_group": 1}
+        )
+    }
+
+    return {
+        "started_by": active.get("started_by"),
+        "team_groups": sorted({participant["team_group"] for participant in participants.values()}),
+        "participants": participants,
+    }
+
+
+def get_chat_roster(active_scenario_id):
+    """
+    Returns {"started_by", "team_groups", "participants": {user_id: {"team", "team_group"}}}
+    of an active scenario, or None if it is not running.
+    """
+    roster = chat_roster_cache.get(active_scenario_id, loader=lambda: _load_chat_roster(active_scenario_id))
+    if roster is None:
+        # Never cache a miss: the scenario may be starting right now
+        chat_roster_cache.invalidate(active_scenario_id)
+    return roster
+
+
+def invalidate_chat_roster(active_scenario_id):
+    chat_roster_cache.invalidate(active_scenario_id)
+
+
+def build_chat_channels(active_scenario_id: str, user: dict):
+    if not active_scenario_id or not user:
+        return []
+
+    roster = get_chat_roster(active_scenario_id)
+    if not roster:
         return []
 
     channels = []
@@ -22,65 +71,48 @@ def build_chat_channels(active_scenario_id: str, user: dict):
     user_role = (user.get("user_role") or "").upper()
 
     is_superadmin = user.get("is_superadmin", False)
-    is_admin = user.get("is_admin", False)
     is_white = "WHITE" in user_role
 
-
     # ==========================================================
     # SUPERADMIN → EVERYTHING
+    # WHITE → only the scenarios they started
     # ==========================================================
-    if is_superadmin:
-        team_groups = set()
-
-        for pid in active.get("participant_data", {}).values():
-            p = participant_data_collection.find_one({"id": pid}, {"_id": 0})
-            if p:
-                team_groups.add(p.get("team_group", "DEFAULT"))
-
-        for tg in sorted(team_groups):
-            channels.append(_team_all_channel(active_scenario_id, tg))
-            channels.extend(_team_role_channels(active_scenario_id, tg))
-
-        channels.append(_global_channel(active_scenario_id))
-        return channels
-
-    # ==========================================================
-    # WHITE / ADMIN → ONLY ALLOWED TEAMS
-    # ==========================================================
-# ==========================================================
-    if is_white:
-        # 🔐 white team only sees scenarios they started
-        if active.get("started_by") != user_id:
+    if is_superadmin or is_white:
+        if not is_superadmin and roster["started_by"] != user_id:
             return []
 
-        team_groups = _derive_team_groups_from_participants(active)
-
-        for tg in team_groups:
+        for tg in roster["team_groups"]:
             channels.append(_team_all_channel(active_scenario_id, tg))
             channels.extend(_team_role_channels(active_scenario_id, tg))
 
         channels.append(_global_channel(active_scenario_id))
         return channels
-    
+
     # ==========================================================
     # NORMAL PLAYER
     # ==========================================================
-    participant = participant_data_collection.find_one(
-        {"id": active.get("participant_data", {}).get(user_id)},
-        {"_id": 0}
-    )
+    participant = roster["participants"].get(user_id)
     if not participant:
         return []
 
-    team_group = participant.get("team_group", "DEFAULT")
-    role = (participant.get("team") or "").upper()
-
     return [
-        _team_role_channel(active_scenario_id, team_group, role),
-        _team_all_channel(active_scenario_id, team_group),
+        _team_role_channel(active_scenario_id, participant["team_group"], participant["team"]),
+        _team_all_channel(active_scenario_id, participant["team_group"]),
     ]
 
 
+def get_chat_sender(active_scenario_id: str, user: dict):
+    """(sender_role, sender_team_group) of a message, scoped to this scenario's roster."""
+    participant = (get_chat_roster(active_scenario_id) or {}).get("participants", {}).get(user["user_id"])
+    if participant:
+        return participant["team"] or "WHITE", participant["team_group"]
+    return ("SUPERADMIN" if user.get("is_superadmin") else "WHITE"), "WHITE"
+
+
+def get_allowed_channel_keys(active_scenario_id: str, user: dict):
+    return {channel["channel_key"] for channel in build_chat_channels(active_scenario_id, user)}
+
+
 def _team_role_channel(scn_id, team, role):
     return {
         "channel_key": f"{scn_id}__{team}_{role}",
@@ -110,16 +142,3 @@ def _global_channel(scn_id):
         "scope": "GLOBAL",
         "label": "All Teams — All Roles",
     }
-
-def _derive_team_groups_from_participants(active):
-    team_groups = set()
-
-    for pd_id in active.get("participant_data", {}).values():
-        pd = participant_data_collection.find_one(
-            {"id": pd_id},
-            {"_id": 0}
-        )
-        if pd and pd.get("team_group"):
-            team_groups.add(pd["team_group"])
-
-    return sorted(team_groups)
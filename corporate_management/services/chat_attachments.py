@@ -0,0 +1,121 @@
+import hashlib
+import logging
+import os
+import uuid
+
+from asgiref.sync import async_to_sync
+from celery import current_app
+from django.conf import settings
+from django.utils import timezone
+from pymongo import ReturnDocument
+
+from core.storage import get_storage_backend, iter_file_chunks, stage_upload
+from corporate_management.services.chat_history import broadcast_chat_message
+from database_management.pymongo_client import scenario_chat_messages_collection
+
+logger = logging.getLogger(__name__)
+
+CHAT_ATTACHMENT_PREFIX = "chat_attachments"
+# Uploads Django already spooled to disk wait here for the worker; it must be
+# on a filesystem the Celery workers can read. Unset, they are stored inline.
+CHAT_ATTACHMENT_STAGING_DIR = getattr(settings, "CORPORATE_CHAT_ATTACHMENT_STAGING_DIR", None)
+
+# Allowed extensions and the type they are served with; the client's
+# content type is never trusted
+CHAT_ATTACHMENT_CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".txt": "text/plain",
+    ".log": "text/plain",
+    ".csv": "text/csv",
+    ".json": "application/json",
+}
+
+ATTACHMENT_READY = "READY"
+ATTACHMENT_PROCESSING = "PROCESSING"
+ATTACHMENT_FAILED = "FAILED"
+
+
+def attachment_key(digest, ext):
+    # Content-addressed, so the same file posted twice is stored once
+    return f"{CHAT_ATTACHMENT_PREFIX}/{digest[:2]}/{digest}{ext.lower()}"
+
+
+def _store(chunks_factory, ext, content_type):
+    """Hashes the content, then stores it unless an identical file already exists."""
+    digest = hashlib.sha256()
+    for chunk in chunks_factory():
+        digest.update(chunk)
+    digest = digest.hexdigest()
+
+    storage = get_storage_backend()
+    key = attachment_key(digest, ext)
+    if not storage.exists(key):
+        storage.save(key, chunks_factory(), content_type=content_type)
+    return digest, storage.url(key)
+
+
+def prepare_chat_attachment(uploaded_file):
+    """
+    Returns (attachment metadata, staged path or None). In-memory uploads are
+    stored right away; uploads Django spooled to disk are only moved to the
+    staging dir and stored by the store_chat_attachment task, or stored
+    right away too when no staging dir is configured.
+    """
+    ext = os.path.splitext(uploaded_file.name)[1]
+    content_type = CHAT_ATTACHMENT_CONTENT_TYPES[ext.lower()]
+    attachment = {
+        "id": f"ATT_{uuid.uuid4().hex[:12]}",
+        "file_name": uploaded_file.name,
+        "file_type": content_type,
+        "size": uploaded_file.size,
+        "uploaded_at": timezone.now().isoformat(),
+    }
+
+    if CHAT_ATTACHMENT_STAGING_DIR and hasattr(uploaded_file, "temporary_file_path"):
+        attachment.update({"status": ATTACHMENT_PROCESSING, "file_url": None, "sha256": None})
+        return attachment, stage_upload(uploaded_file, CHAT_ATTACHMENT_STAGING_DIR)
+
+    digest, url = _store(uploaded_file.chunks, ext, content_type)
+    attachment.update({"status": ATTACHMENT_READY, "file_url": url, "sha256": digest})
+    return attachment, None
+
+
+def schedule_chat_attachment(staged_path, message, attachment):
+    current_app.send_task(
+        "corporate_management.tasks.store_chat_attachment",
+        args=[staged_path, message["id"], attachment["id"], os.path.splitext(attachment["file_name"])[1], attachment["file_type"]],
+    )
+
+
+def store_staged_chat_attachment(staged_path, message_id, attachment_id, ext, content_type):
+    """Stores a staged upload, marks the attachment READY (or FAILED) and pushes the updated message."""
+    def chunks():
+        with open(staged_path, "rb") as staged:
+            yield from iter_file_chunks(staged)
+
+    update = {"attachments.$.status": ATTACHMENT_FAILED}
+    try:
+        digest, url = _store(chunks, ext, content_type)
+        update = {
+            "attachments.$.status": ATTACHMENT_READY,
+            "attachments.$.file_url": url,
+            "attachments.$.sha256": digest,
+        }
+    except Exception as e:
+        logger.error(f"Chat attachment {attachment_id} of {message_id} could not be stored: {str(e)}")
+    finally:
+        if os.path.exists(staged_path):
+            os.remove(staged_path)
+
+    message = scenario_chat_messages_collection.find_one_and_update(
+        {"id": message_id, "attachments.id": attachment_id},
+        {"$set": update},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+    if message:
+        async_to_sync(broadcast_chat_message)(message)
+    return update["attachments.$.status"]
@@ -0,0 +1,142 @@
+import base64
+import hashlib
+import json
+import uuid
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.utils import timezone
+
+from corporate_management.services.chat_access import get_chat_sender
+from database_management.pymongo_client import scenario_chat_messages_collection
+
+CHAT_PAGE_SIZE = getattr(settings, "CORPORATE_CHAT_PAGE_SIZE", 50)
+CHAT_MAX_PAGE_SIZE = getattr(settings, "CORPORATE_CHAT_MAX_PAGE_SIZE", 200)
+# Same limit as ScenarioChatSendSerializer.message
+CHAT_MESSAGE_MAX_LENGTH = 2000
+
+
+class InvalidChatCursor(ValueError):
+    pass
+
+
+def encode_chat_cursor(message):
+    return base64.urlsafe_b64encode(json.dumps([message["created_at"], message["id"]]).encode()).decode()
+
+
+def decode_chat_cursor(cursor):
+    try:
+        created_at, message_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise InvalidChatCursor("Invalid cursor.")
+    return created_at, message_id
+
+
+def _newer_than(cursor):
+    created_at, message_id = decode_chat_cursor(cursor)
+    return {"$or": [
+        {"created_at": {"$gt": created_at}},
+        {"created_at": created_at, "id": {"$gt": message_id}},
+    ]}
+
+
+def _older_than(cursor):
+    created_at, message_id = decode_chat_cursor(cursor)
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": message_id}},
+    ]}
+
+
+def get_chat_messages(channel_key, before=None, after=None, limit=CHAT_PAGE_SIZE):
+    """
+    Returns one page of a channel's history, oldest first, walking the
+    (channel_key, created_at) index; id only breaks ties in the sort, so
+    (created_at, id) cursors keep pages stable when several messages share
+    a timestamp.
+
+    - no cursor: the latest `limit` messages
+    - before: the `limit` messages preceding that cursor (scrolling back)
+    - after: up to `limit` messages following it (catching up after a reconnect)
+
+    {"messages": [...], "before": cursor of an older page or None,
+     "after": cursor to resume from on reconnect (latest and after pages only),
+     "has_more": more newer messages follow an after page}
+    """
+    limit = min(max(int(limit), 1), CHAT_MAX_PAGE_SIZE)
+    query = {"channel_key": channel_key}
+
+    if after:
+        query.update(_newer_than(after))
+        messages = list(
+            scenario_chat_messages_collection.find(query, {"_id": 0})
+            .sort([("created_at", 1), ("id", 1)])
+            .limit(limit + 1)
+        )
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        return {
+            "messages": messages,
+            "before": None,
+            "after": encode_chat_cursor(messages[-1]) if messages else after,
+            "has_more": has_more,
+        }
+
+    if before:
+        query.update(_older_than(before))
+    messages = list(
+        scenario_chat_messages_collection.find(query, {"_id": 0})
+        .sort([("created_at", -1), ("id", -1)])
+        .limit(limit + 1)
+    )
+    has_older = len(messages) > limit
+    messages = messages[:limit][::-1]
+
+    return {
+        "messages": messages,
+        "before": encode_chat_cursor(messages[0]) if has_older else None,
+        # Only the latest page marks where a reconnecting client resumes from
+        "after": encode_chat_cursor(messages[-1]) if messages and not before else None,
+        "has_more": False,
+    }
+
+
+def chat_group_name(channel_key):
+    # Channel layer group names only allow a restricted ASCII set, team groups may not
+    return "scenario_chat." + hashlib.sha1(channel_key.encode()).hexdigest()
+
+
+def store_chat_message(user, active_scenario_id, channel_key, message, attachments=()):
+    """Persists one chat message and returns it without the Mongo _id."""
+    now = timezone.now()
+
+    sender_role, sender_team_group = get_chat_sender(active_scenario_id, user)
+
+    doc = {
+        # Random suffix keeps ids unique within a millisecond; (created_at, id) is the page cursor
+        "id": f"MSG_{int(now.timestamp() * 1000)}_{uuid.uuid4().hex[:8]}",
+        "active_scenario_id": active_scenario_id,
+        "channel_key": channel_key,
+
+        "sender_user_id": str(user["user_id"]),
+        "sender_name": str(user.get("user_full_name") or ""),
+        "sender_role": sender_role,
+        "sender_team_group": sender_team_group,
+
+        "message": (message or "").strip(),
+        "attachments": list(attachments),
+        "created_at": now.isoformat(),
+    }
+
+    scenario_chat_messages_collection.insert_one(doc)
+    doc.pop("_id", None)
+    return doc
+
+
+async def broadcast_chat_message(message):
+    """Pushes a stored message to every socket subscribed to its channel."""
+    channel_layer = get_channel_layer()
+    await channel_layer.group_send(chat_group_name(message["channel_key"]), {
+        'type': 'chat.message',
+        'message': message,
+    })
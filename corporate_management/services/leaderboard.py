@@ -0,0 +1,85 @@
+import redis
+
+from database_management.pymongo_client import (
+    active_scenario_collection,
+    participant_data_collection,
+)
+from database_management.redis_client import redis_client
+from notification_management.utils import publish_group_event
+from user_management.utils import get_user_principal
+
+# Leaderboards outlive the longest exercise; end_corporate_game clears them explicitly
+LEADERBOARD_TTL = 7 * 24 * 60 * 60
+
+
+def _leaderboard_key(active_scenario_id):
+    return f"leaderboard:corporate:{active_scenario_id}"
+
+
+def _seed_leaderboard(active_scenario_id):
+    """Rebuilds the sorted set from Mongo, e.g. for scenarios started before Redis held it."""
+    active = active_scenario_collection.find_one({"id": active_scenario_id}, {"_id": 0, "participant_data": 1})
+    if not active:
+        return
+
+    participants = participant_data_collection.find(
+        {"id": {"$in": list(active.get("participant_data", {}).values())}},
+        {"_id": 0, "user_id": 1, "total_obtained_score": 1}
+    )
+    scores = {p["user_id"]: p.get("total_obtained_score", 0) for p in participants}
+    if scores:
+        key = _leaderboard_key(active_scenario_id)
+        pipeline = redis_client.pipeline()
+        pipeline.zadd(key, scores)
+        pipeline.expire(key, LEADERBOARD_TTL)
+        pipeline.execute()
+
+
+def record_participant_score(active_scenario_id, participant, total_obtained_score):
+    """
+    Stores the participant's new total and returns their leaderboard row
+    (profile, team, score and 1-based rank) without any flag/milestone data.
+    """
+    user_id = participant["user_id"]
+    key = _leaderboard_key(active_scenario_id)
+    rank = None
+
+    try:
+        if not redis_client.exists(key):
+            _seed_leaderboard(active_scenario_id)
+
+        pipeline = redis_client.pipeline()
+        pipeline.zadd(key, {user_id: total_obtained_score})
+        pipeline.expire(key, LEADERBOARD_TTL)
+        pipeline.zrevrank(key, user_id)
+        rank = pipeline.execute()[-1]
+    except redis.RedisError:
+        pass
+
+    user = get_user_principal(user_id) or {}
+
+    return {
+        "id": participant.get("id"),
+        "user_id": user_id,
+        "user_full_name": user.get("user_full_name"),
+        "user_avatar": user.get("user_avatar"),
+        "user_role": user.get("user_role"),
+        "team": participant.get("team"),
+        "team_group": participant.get("team_group"),
+        "total_obtained_score": total_obtained_score,
+        "rank": rank + 1 if rank is not None else None,
+    }
+
+
+def clear_leaderboard(active_scenario_id):
+    try:
+        redis_client.delete(_leaderboard_key(active_scenario_id))
+    except redis.RedisError:
+        pass
+
+
+async def broadcast_leaderboard_row(group_name, row):
+    await publish_group_event(group_name, {
+        "type": "leaderboard_update",
+        "row": row,
+    })
@@ -0,0 +1,68 @@
+from database_management.pymongo_client import (
+    corporate_scenario_collection,
+    flag_data_collection,
+    milestone_data_collection,
+    user_collection,
+)
+
+TEAM_KEYS = ["red_team", "blue_team", "purple_team", "yellow_team"]
+
+# Stored in the FLAG/MILESTONE form the create serializer already uses;
+# listings show the title-cased label.
+SCENARIO_TYPE_LABELS = {"FLAG": "Flag", "MILESTONE": "Milestone"}
+
+
+def compute_scenario_summary(scenario):
+    """Returns the denormalized {total_points, creator_name, type} of a corporate scenario."""
+    if scenario.get("milestone_data"):
+        scenario_type, data_source, collection = "MILESTONE", scenario["milestone_data"], milestone_data_collection
+    elif scenario.get("flag_data"):
+        scenario_type, data_source, collection = "FLAG", scenario["flag_data"], flag_data_collection
+    else:
+        # Nothing added yet, keep the type chosen at creation
+        scenario_type, data_source, collection = scenario.get("type") or "FLAG", {}, flag_data_collection
+
+    item_ids = [item_id for team in TEAM_KEYS for item_id in data_source.get(team, [])]
+    scores = {
+        item["id"]: item.get("score", 0)
+        for item in collection.find({"id": {"$in": item_ids}}, {"_id": 0, "id": 1, "score": 1})
+    }
+
+    creator = user_collection.find_one({"user_id": scenario.get("creator_id")}, {"_id": 0, "user_full_name": 1})
+
+    return {
+        "total_points": sum(scores.get(item_id, 0) for item_id in item_ids),
+        "creator_name": creator.get("user_full_name") if creator else "Unknown",
+        "type": scenario_type,
+    }
+
+
+def refresh_scenario_summary(scenario_id):
+    """Recomputes and stores the summary; call after flags or milestones of the scenario change."""
+    scenario = corporate_scenario_collection.find_one(
+        {"id": scenario_id},
+        {"_id": 0, "creator_id": 1, "type": 1, "flag_data": 1, "milestone_data": 1}
+    )
+    if not scenario:
+        return None
+
+    summary = compute_scenario_summary(scenario)
+    corporate_scenario_collection.update_one({"id": scenario_id}, {"$set": summary})
+    return summary
+
+
+def rename_scenario_creator(user_id, user_full_name):
+    corporate_scenario_collection.update_many({"creator_id": user_id}, {"$set": {"creator_name": user_full_name}})
+
+
+def get_scenario_points(scenario):
+    """Stored total_points, repairing scenarios that predate the backfill."""
+    if "total_points" not in scenario:
+        scenario["total_points"] = (refresh_scenario_summary(scenario["id"]) or {}).get("total_points", 0)
+    return scenario["total_points"]
+
+
+def get_scenario_type_label(scenario):
+    if scenario.get("milestone_data") or scenario.get("flag_data"):
+        return "Milestone" if scenario.get("milestone_data") else "Flag"
+    return SCENARIO_TYPE_LABELS.get(scenario.get("type"), "Flag")
@@ -0,0 +1,160 @@
+import datetime
+import hashlib
+import hmac
+
+from django.conf import settings
+from pymongo import ReturnDocument
+
+from core.cache import TTLCache
+from database_management.pymongo_client import (
+    active_scenario_collection,
+    corporate_scenario_collection,
+    flag_data_collection,
+    participant_data_collection,
+)
+
+# Scoring inputs only change when an admin edits the scenario, so a running
+# exercise can serve them from cache; the flag and scenario update serializers
+# drop the entries of the scenario's running exercises, end_corporate_game its own.
+CORPORATE_SCORING_CACHE_TTL = getattr(settings, "CORPORATE_SCORING_CACHE_TTL", 300)
+
+# v2: flags hold answer hashes; entries cached with plaintext answers are never read
+scenario_scoring_cache = TTLCache("corporate_scoring_config_v2", ttl=CORPORATE_SCORING_CACHE_TTL, local_ttl=30)
+
+
+def hash_flag_answer(answer):
+    """
+    Keyed hash of a normalized flag answer. The scoring cache lives in Redis,
+    so it only ever holds these, never the plaintext answers.
+    """
+    return hmac.new(settings.SECRET_KEY.encode(), str(answer).strip().encode(), hashlib.sha256).hexdigest()
+
+
+def is_flag_answer_correct(flag, submitted_answer):
+    return hmac.compare_digest(flag["answer_hash"], hash_flag_answer(submitted_answer))
+
+
+def _load_scenario_scoring_config(active_scenario_id):
+    active = active_scenario_collection.find_one(
+        {"id": active_scenario_id},
+        {"_id": 0, "id": 1, "scenario_id": 1, "start_time": 1, "participant_data": 1}
+    )
+    if not active:
+        return None
+
+    scenario = corporate_scenario_collection.find_one(
+        {"id": active["scenario_id"]},
+        {"_id": 0, "scoring_config": 1, "flag_data": 1}
+    ) or {}
+
+    flag_ids = [
+        flag_id
+        for team_flag_ids in (scenario.get("flag_data") or {}).values()
+        for flag_id in team_flag_ids
+    ]
+    flags = {
+        flag["id"]: {
+            "score": int(flag.get("score", 0)),
+            "hint_penalty": int(flag.get("hint_penalty", 0)),
+            "answer_hash": hash_flag_answer(flag.get("answer")),
+        }
+        for flag in flag_data_collection.find(
+            {"id": {"$in": flag_ids}},
+            {"_id": 0, "id": 1, "score": 1, "hint_penalty": 1, "answer": 1}
+        )
+    }
+
+    start_time = active.get("start_time")
+    return {
+        "id": active["id"],
+        "scenario_id": active["scenario_id"],
+        "start_time": start_time.isoformat() if isinstance(start_time, datetime.datetime) else start_time,
+        "participant_data": active.get("participant_data", {}),
+        "scoring_config": scenario.get("scoring_config") or {"type": "standard"},
+        "flags": flags,
+    }
+
+
+def get_scenario_scoring_config(active_scenario_id):
+    """
+    Returns the participant map, start time, scoring config and flag
+    score/answer hash table of an active scenario, or None if it is not running.
+    """
+    config = scenario_scoring_cache.get(
+        active_scenario_id,
+        loader=lambda: _load_scenario_scoring_config(active_scenario_id)
+    )
+    if config is None:
+        # Never cache a miss: the scenario may be starting right now
+        scenario_scoring_cache.invalidate(active_scenario_id)
+    return config
+
+
+def invalidate_scenario_scoring_config(active_scenario_id):
+    scenario_scoring_cache.invalidate(active_scenario_id)
+
+
+def invalidate_scoring_configs_for_scenario(scenario_id):
+    """Drops the cached scoring inputs of every running exercise of a scenario after an admin edit."""
+    for active in active_scenario_collection.find({"scenario_id": scenario_id}, {"_id": 0, "id": 1}):
+        scenario_scoring_cache.invalidate(active["id"])
+
+
+def parse_start_time(start_time):
+    if isinstance(start_time, str):
+        return datetime.datetime.fromisoformat(start_time.replace("Z", ""))
+    return start_time
+
+
+def apply_flag_score(participant_data_id, flag_id, submitted_answer, awarded, meta, event_time):
+    """
+    Marks the flag correct and adds its score to the participant's total in a
+    single write. The filter only matches while the flag is still unsolved,
+    so concurrent correct submissions score it exactly once; None means
+    another request got there first.
+    """
+    return participant_data_collection.find_one_and_update(
+        {
+            "id": participant_data_id,
+            "flag_data": {"$elemMatch": {"flag_id": flag_id, "is_correct": {"$ne": True}}},
+        },
+        {
+            "$set": {
+                "flag_data.$.is_correct": True,
+                "flag_data.$.obtained_score": int(awarded),
+                "flag_data.$.submitted_response": submitted_answer,
+                "flag_data.$.submitted_at": event_time,
+                "flag_data.$.updated_at": event_time,
+                "flag_data.$.achieved_at": event_time,
+                "flag_data.$.score_meta": meta,
+            },
+            "$inc": {
+                "flag_data.$.retires": 1,
+                "total_obtained_score": int(awarded),
+            },
+        },
+        projection={"_id": 0, "id": 1, "user_id": 1, "team": 1, "team_group": 1, "total_obtained_score": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def record_wrong_flag_answer(participant_data_id, flag_id, submitted_answer, event_time):
+    """Counts a wrong attempt, unless the flag was solved in the meantime."""
+    return participant_data_collection.find_one_and_update(
+        {
+            "id": participant_data_id,
+            "flag_data": {"$elemMatch": {"flag_id": flag_id, "is_correct": {"$ne": True}}},
+        },
+        {
+            "$set": {
+                "flag_data.$.is_correct": False,
+                "flag_data.$.submitted_response": submitted_answer,
+                "flag_data.$.submitted_at": event_time,
+                "flag_data.$.updated_at": event_time,
+                "flag_data.$.obtained_score": 0,
+            },
+            "$inc": {"flag_data.$.retires": 1},
+        },
+        projection={"_id": 0, "total_obtained_score": 1},
+        return_document=ReturnDocument.AFTER,
+    )
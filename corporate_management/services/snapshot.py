@@ -0,0 +1,70 @@
+from database_management.pymongo_client import (
+    corporate_scenario_collection,
+    flag_data_collection,
+    milestone_data_collection,
+    participant_data_collection,
+    user_collection,
+)
+
+USER_SNAPSHOT_PROJECTION = {"_id": 0, "user_id": 1, "user_full_name": 1, "user_avatar": 1, "user_role": 1, "email": 1}
+
+
+def load_active_scenario_snapshot(active_scenario, scenario=None, with_milestones=False, with_flags=False):
+    """
+    Loads everything a corporate moderator/console view needs about a running
+    scenario with one `$in` query per collection instead of one query per
+    participant, milestone or flag.
+
+    Returns a dict with:
+      - active_scenario, scenario (None if the scenario no longer exists)
+      - participants: [(user_id, participant_data)] in participant_data order,
+        skipping participant documents that are missing
+      - users: {user_id: user}
+      - milestones / flags: {id: definition}, only filled when requested
+    """
+    if scenario is None:
+        scenario = corporate_scenario_collection.find_one({"id": active_scenario["scenario_id"]}, {"_id": 0})
+
+    participant_ids = active_scenario.get("participant_data", {})
+    participant_docs = {
+        pd["id"]: pd
+        for pd in participant_data_collection.find({"id": {"$in": list(participant_ids.values())}}, {"_id": 0})
+    }
+    participants = [
+        (user_id, participant_docs[pd_id])
+        for user_id, pd_id in participant_ids.items()
+        if pd_id in participant_docs
+    ]
+
+    users = {
+        user["user_id"]: user
+        for user in user_collection.find(
+            {"user_id": {"$in": [user_id for user_id, _ in participants]}},
+            USER_SNAPSHOT_PROJECTION
+        )
+    }
+
+    milestones = {}
+    if with_milestones:
+        milestone_ids = {md["milestone_id"] for _, pd in participants for md in pd.get("milestone_data", [])}
+        milestones = {
+            milestone["id"]: milestone
+            for milestone in milestone_data_collection.find({"id": {"$in": list(milestone_ids)}}, {"_id": 0})
+        }
+
+    flags = {}
+    if with_flags:
+        flag_ids = {fd["flag_id"] for _, pd in participants for fd in pd.get("flag_data", [])}
+        flags = {
+            flag["id"]: flag
+            for flag in flag_data_collection.find({"id": {"$in": list(flag_ids)}}, {"_id": 0})
+        }
+
+    return {
+        "active_scenario": active_scenario,
+        "scenario": scenario,
+        "participants": participants,
+        "users": users,
+        "milestones": milestones,
+        "flags": flags,
+    }
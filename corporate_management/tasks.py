@@ -0,0 +1,75 @@
+import datetime
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from pymongo import ReturnDocument
+
+from corporate_management.services.chat_attachments import store_staged_chat_attachment
+from corporate_management.utils import (
+    resume_corporate_game_end,
+    CORPORATE_END_STEPS,
+    CORPORATE_END_PENDING,
+    CORPORATE_END_FAILED,
+)
+from database_management.pymongo_client import archive_scenario_collection
+
+logger = logging.getLogger(__name__)
+
+# An end attempt holds its scenario this long; it must outlast the slowest
+# teardown, and doubles as the backoff between attempts
+CORPORATE_END_LEASE_SECONDS = getattr(settings, "CORPORATE_END_LEASE_SECONDS", 60 * 60)
+# Attempts, the first end included, before a scenario is left for an operator
+CORPORATE_END_MAX_ATTEMPTS = getattr(settings, "CORPORATE_END_MAX_ATTEMPTS", 5)
+
+
+@shared_task
+def store_chat_attachment(staged_path, message_id, attachment_id, ext, content_type):
+    return store_staged_chat_attachment(staged_path, message_id, attachment_id, ext, content_type)
+
+
+def _claim_unfinished_game_end(current_time):
+    """Takes the lease of one archived scenario whose end is unfinished and whose last attempt expired."""
+    expired = current_time - datetime.timedelta(seconds=CORPORATE_END_LEASE_SECONDS)
+    return archive_scenario_collection.find_one_and_update(
+        {
+            "$and": [
+                {"$or": [
+                    {f"end_progress.{step}": {"$in": [CORPORATE_END_PENDING, CORPORATE_END_FAILED]}}
+                    for step in CORPORATE_END_STEPS
+                ]},
+                {"$or": [
+                    {"end_lease_at": {"$lte": expired}},
+                    # Scenarios archived before ends were leased
+                    {"end_lease_at": {"$exists": False}, "end_time": {"$lte": expired}},
+                ]},
+            ],
+            "end_attempts": {"$not": {"$gte": CORPORATE_END_MAX_ATTEMPTS}},
+        },
+        {"$set": {"end_lease_at": current_time}, "$inc": {"end_attempts": 1}},
+        projection={"_id": 0, "id": 1, "end_attempts": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+@shared_task
+def resume_pending_corporate_game_ends():
+    """
+    Reruns the end of archived scenarios whose teardown or notifications failed
+    or never ran. Each scenario is leased before it is resumed, so an end that
+    is still running is never started twice, and it is given up on after
+    CORPORATE_END_MAX_ATTEMPTS attempts.
+    """
+    current_time = datetime.datetime.now()
+
+    resumed = []
+    while True:
+        archived_scenario = _claim_unfinished_game_end(current_time)
+        if not archived_scenario:
+            break
+
+        if archived_scenario["end_attempts"] >= CORPORATE_END_MAX_ATTEMPTS:
+            logger.error(f"Last attempt to end corporate scenario {archived_scenario['id']}, it needs an operator if this one fails.")
+        resume_corporate_game_end.delay(archived_scenario["id"])
+        resumed.append(archived_scenario["id"])
+    return {"resumed": resumed}
@@ -44,6 +44,7 @@ urlpatterns = [
     path("scenario/scenario/walkthroughs/", CorporateScenarioWalkthroughListView.as_view(),name="corporate-scenario-walkthrough-list"),
     path("scenario/chat/channels/<str:active_scenario_id>/",ScenarioChatChannelsView.as_view(),name="corporate-chat-channel"),
     path("scenario/chat/messages/<str:channel_key>/",ScenarioChatMessagesView.as_view(),name="corporate-chat-message"),
+    path("scenario/chat/messages/<str:channel_key>/since/",ScenarioChatMessagesSinceView.as_view(),name="corporate-chat-message-since"),
     path("scenario/chat/send/", ScenarioChatSendView.as_view(),name="corporate-chat-send"),
     path("scenario/walkthrough/create/",CorporateScenarioWalkthroughCreateView.as_view(),),
     path("scenario/walkthrough/list/",CorporateScenarioWalkthroughListView.as_view()),
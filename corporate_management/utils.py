@@ -2,7 +2,7 @@ import math
 import datetime, os, ipaddress, logging
 from asgiref.sync import async_to_sync
 from celery import shared_task
-from notification_management.utils import send_notification
+from notification_management.utils import publish_group_event, dispatch_notifications
 from fpdf  import FPDF
 import pandas as pd
 import json
@@ -10,8 +10,10 @@ import random
 from pathlib import Path
 
 from django.conf import settings
+from pymongo.errors import OperationFailure
 from core.utils import generate_random_string
 from database_management.pymongo_client import (
+    client as mongo_client,
     corporate_scenario_collection,   
     flag_data_collection,
     milestone_data_collection,
@@ -29,18 +31,31 @@ from cloud_management.utils import (
     connect_router_to_private_network,
     connect_router_to_public_network,
     get_cloud_subnet,
-    get_cloud_instance,
-    delete_cloud_instance,
-    disconnect_router_from_private_network,
-    get_cloud_router,
-    delete_cloud_router,
-    delete_cloud_network,
+    run_in_pool,
 )
+from cloud_management.teardown import teardown_resources, TEARDOWN_COMPLETED
 
 
 from database_management.pymongo_client import notification_collection,participant_data_collection
 from core.utils import generate_random_string
 from channels.layers import get_channel_layer
+from corporate_management.services.leaderboard import clear_leaderboard
+from corporate_management.services.scoring import invalidate_scenario_scoring_config
+from corporate_management.services.chat_access import invalidate_chat_roster
+from user_management.winning_wall import refresh_winning_wall_task
+
+# Max concurrent OpenStack provisioning calls per corporate game launch.
+CORPORATE_PROVISION_MAX_WORKERS = getattr(settings, "CORPORATE_PROVISION_MAX_WORKERS", 8)
+# Max concurrent OpenStack delete calls per teardown layer of an ended game.
+CORPORATE_TEARDOWN_MAX_WORKERS = getattr(settings, "CORPORATE_TEARDOWN_MAX_WORKERS", 8)
+
+# "Transaction numbers are only allowed on a replica set member or mongos"
+MONGO_TRANSACTIONS_UNSUPPORTED = 20
+
+CORPORATE_END_STEPS = ("teardown", "notifications")
+CORPORATE_END_PENDING = "PENDING"
+CORPORATE_END_DONE = "DONE"
+CORPORATE_END_FAILED = "FAILED"
 
 NARRATIVE_PATH = Path(
     settings.BASE_DIR / "corporate_management" / "report_narratives"
@@ -270,7 +285,6 @@ def generate_report_for_participant(pdf, user_id, p_data_id):
 
 
 async def corporate_send_notification(group_name="",data=""):
-    channel_layer = get_channel_layer()
     if group_name != "":
         active_game = active_scenario_collection.find_one({"id":group_name}, {"_id": 0})
         
@@ -298,19 +312,21 @@ async def corporate_send_notification(group_name="",data=""):
                 for i in obj["flag_data"]:
                     del i["updated_at"]
 
-        await channel_layer.group_send(group_name, {
-            'type': 'notification.message',
-            'notification': new_list 
-        })
+        await publish_group_event(group_name, new_list)
+
+
+def milestone_state_update(user_id, milestone_id, status):
+    return {
+        "type": "milestone_update",
+        "user_id": user_id,
+        "milestone_id": milestone_id,
+        "status": status,
+    }
 
 
 async def send_notification_reload(group_name="",data=""):
-    # print("reload data",data)
-    channel_layer = get_channel_layer()
-    await channel_layer.group_send(group_name, {
-        'type': 'notification.message',
-        'notification': "reload"
-    })
+    # Clients apply the state diff in data; a bare "reload" still means refetch
+    await publish_group_event(group_name, data or "reload")
     
 
 # NOTE:
@@ -371,8 +387,8 @@ def start_corporate_game(validated_data):
             continue
         allowed.setdefault(role, []).append(inst.get("name"))
 
-    # --------- per-team cloning ----------
-    for team_name, machine_to_user in team_machine_map.items():
+    # --------- phase 1: per-team networks + routers (teams in parallel) ----------
+    def _provision_team_network(team_name):
         team_slug = _safe_slug(team_name)
 
         # 1) Create team networks
@@ -407,8 +423,6 @@ def start_corporate_game(validated_data):
             except Exception as e:
                 logging.error("Network Exception Occured (team=%s): %s", team_name, e)
 
-        networks_obj_list.extend(team_networks_obj)
-
         # 2) Create team routers
         team_routers_obj = []
         for router in scenario_infra.get("routers", []):
@@ -437,9 +451,30 @@ def start_corporate_game(validated_data):
             except Exception as e:
                 logging.error("Router Exception Occured (team=%s): %s", team_name, e)
 
+        return team_networks_obj, team_routers_obj, team_network_dict
+
+    team_names = list(team_machine_map.keys())
+    team_network_results = run_in_pool(
+        _provision_team_network, team_names, max_workers=CORPORATE_PROVISION_MAX_WORKERS
+    )
+
+    team_network_dicts = {}  # team_name -> {logical_network_name -> network_id}
+    for team_name, (result, error) in zip(team_names, team_network_results):
+        if error:
+            logging.error("Team Infra Exception Occured (team=%s): %s", team_name, error)
+            team_network_dicts[team_name] = {}
+            continue
+        team_networks_obj, team_routers_obj, team_network_dict = result
+        networks_obj_list.extend(team_networks_obj)
         routers_obj_list.extend(team_routers_obj)
+        team_network_dicts[team_name] = team_network_dict
+
+    # --------- phase 2: fan out instance boots across all teams ----------
+    instance_jobs = []
+    for team_name, machine_to_user in team_machine_map.items():
+        team_slug = _safe_slug(team_name)
+        team_network_dict = team_network_dicts.get(team_name, {})
 
-        # 3) Create instances + participant_data for THIS team
         for base_inst in scenario_infra.get("instances", []):
             logical_machine_name = base_inst.get("name")
             role = (base_inst.get("team") or "").upper()
@@ -458,9 +493,6 @@ def start_corporate_game(validated_data):
                 logging.error("No participant mapped for machine=%s (team=%s)", logical_machine_name, team_name)
                 continue
 
-            # Build team-specific OpenStack instance name (unique)
-            cloud_machine_name = f"{team_slug}-{logical_machine_name}"
-
             # Resolve network ids for this team
             networks = base_inst.get("network")
             if isinstance(networks, list):
@@ -470,130 +502,169 @@ def start_corporate_game(validated_data):
             else:
                 network_ids = []
 
-            image = base_inst.get("image")
-            flavor = base_inst.get("flavor")
-            team_role = base_inst.get("team")
+            instance_jobs.append({
+                "team_group": team_name,
+                "participant_id": participant_id,
+                "logical_machine_name": logical_machine_name,
+                # Build team-specific OpenStack instance name (unique)
+                "cloud_machine_name": f"{team_slug}-{logical_machine_name}",
+                "networks": networks,
+                "network_ids": network_ids,
+                "image": base_inst.get("image"),
+                "flavor": base_inst.get("flavor"),
+                "team": base_inst.get("team"),
+            })
 
-            try:
-                cloud_instance, instance_ip = create_cloud_instance(
-                    cloud_machine_name, image, flavor, network_ids
-                )
+    instance_results = run_in_pool(
+        create_cloud_instance,
+        [(job["cloud_machine_name"], job["image"], job["flavor"], job["network_ids"]) for job in instance_jobs],
+        max_workers=CORPORATE_PROVISION_MAX_WORKERS,
+    )
 
-                # Save instance object (keep logical name to not break existing UI)
-                instances_obj_list.append({
-                    "team_group": team_name,
-                    "id": cloud_instance.id,
-                    "name": logical_machine_name,     # logical machine name (existing usage)
-                    "cloud_name": cloud_machine_name, # unique in openstack
-                    "flavor": flavor,
-                    "network": networks,
-                    "image": image,
-                    "team": team_role,
-                    "ip": instance_ip,                # safe extra for reports/ops
-                })
+    # --------- phase 3: participant_data for every booted instance ----------
+    flag_doc_cache = {}
+    milestone_doc_cache = {}
 
-                # ---- Create participant_data (ONLY AFTER cloud_instance + participant_id exist) ----
-                participant_data_id = generate_random_string(id_type="Particiapnt Data", length=40)
-
-                participant_data = {
-                    "id": participant_data_id,
-                    "user_id": participant_id,
-                    "team": team_role,                         # RED/BLUE/PURPLE/YELLOW (role)
-                    "team_group": team_name,                   # Team A / Team B (non-breaking extra)
-                    "instance_id": cloud_instance.id,
-                    "logical_machine_name": logical_machine_name,
-                    "cloud_machine_name": cloud_machine_name,
-                    "total_obtained_score": 0,
-                    "scenario_id": scenario["id"],
-                    "created_at": current_time_stamp,
-                    "updated_at": current_time_stamp,
-                }
-
-                if participant_id not in participant_array:
-                    participant_array.append(participant_id)
-
-                # ----- Flag init -----
-                if scenario.get("flag_data"):
-                    flag_data_list = []
-                    flag_ids = scenario["flag_data"].get(team_role.lower() + "_team", [])
-                    total_score = 0
-
-                    for fid in flag_ids:
-                        flag_doc = flag_data_collection.find_one({"id": fid}) or {}
-                        total_score += int(flag_doc.get("score", 0))
-
-                        flag_data_list.append({
-                            "flag_id": fid,
-                            #(for phase-wise UI)
-                            "phase_id": flag_doc.get("phase_id"),  
-                            "submitted_response": "",
-                            "obtained_score": 0,
-                            "hint_used": False,
-                            "retires": 0,
-                            "assigned_at": current_time_stamp,
-                            "first_visible_at": current_time_stamp,  #  (decay anchor)
-                            "submitted_at": None,
-                            "approved_at": None,
-                            "locked_by_admin": bool(flag_doc.get("is_locked", False)),
-                            "updated_at": current_time_stamp,
-                            "status": True
-                        })
-
-                    participant_data["flag_data"] = flag_data_list
-                    participant_data["total_score"] = total_score
-
-                # ----- Milestone init -----
-                elif scenario.get("milestone_data"):
-                    milestone_data_list = []
-                    milestone_ids = scenario["milestone_data"].get(team_role.lower() + "_team", [])
-                    total_score = 0
-
-                    milestone_data_list = []
-                    total_score = 0
-
-                    for mid in milestone_ids:
-                        milestone_doc = milestone_data_collection.find_one({"id": mid}) or {}
-                        total_score += int(milestone_doc.get("score", 0))
-
-                        milestone_data_list.append({
-                            "milestone_id": mid,
-
-                            # phase mapping (kill-chain UI)
-                            "phase_id": milestone_doc.get("phase_id"),
-
-                            "is_achieved": False,
-                            "is_approved": False,
-                            "obtained_score": 0,
-                            "hint_used": False,
-                            "retires": 0,
-                            "screenshot_url": "",
-
-                            # locking + decay anchors
-                            "status": True,
-                            "locked_by_admin": bool(milestone_doc.get("is_locked", False)),
-                            "first_visible_at": current_time_stamp,
-
-                            # timestamps
-                            "assigned_at": current_time_stamp,
-                            "submitted_at": None,
-                            "achieved_at": None,
-                            "approved_at": None,
-                            "updated_at": current_time_stamp,
-                        })
-
-                    participant_data["milestone_data"] = milestone_data_list
-                    participant_data["total_score"] = total_score
-
-                else:
-                    logging.error("Unknown Error: scenario has neither flag_data nor milestone_data")
-
-                participant_data_collection.insert_one(participant_data)
-                participant_id_dict[participant_id] = participant_data_id
+    def _flag_doc(fid):
+        if fid not in flag_doc_cache:
+            flag_doc_cache[fid] = flag_data_collection.find_one({"id": fid}) or {}
+        return flag_doc_cache[fid]
 
-            except Exception as e:
-                # This catches instance creation failures too
-                logging.error("Instance Exception Occured (team=%s, machine=%s): %s", team_name, logical_machine_name, e)
-                continue
+    def _milestone_doc(mid):
+        if mid not in milestone_doc_cache:
+            milestone_doc_cache[mid] = milestone_data_collection.find_one({"id": mid}) or {}
+        return milestone_doc_cache[mid]
+
+    participant_data_list = []
+    for job, (result, error) in zip(instance_jobs, instance_results):
+        team_name = job["team_group"]
+        logical_machine_name = job["logical_machine_name"]
+
+        if error:
+            # This catches instance creation failures too
+            logging.error("Instance Exception Occured (team=%s, machine=%s): %s", team_name, logical_machine_name, error)
+            continue
+
+        try:
+            cloud_instance, instance_ip = result
+            participant_id = job["participant_id"]
+            cloud_machine_name = job["cloud_machine_name"]
+            team_role = job["team"]
+
+            # Save instance object (keep logical name to not break existing UI)
+            instances_obj_list.append({
+                "team_group": team_name,
+                "id": cloud_instance.id,
+                "name": logical_machine_name,     # logical machine name (existing usage)
+                "cloud_name": cloud_machine_name, # unique in openstack
+                "flavor": job["flavor"],
+                "network": job["networks"],
+                "image": job["image"],
+                "team": team_role,
+                "ip": instance_ip,                # safe extra for reports/ops
+            })
+
+            # ---- Create participant_data (ONLY AFTER cloud_instance + participant_id exist) ----
+            participant_data_id = generate_random_string(id_type="Particiapnt Data", length=40)
+
+            participant_data = {
+                "id": participant_data_id,
+                "user_id": participant_id,
+                "team": team_role,                         # RED/BLUE/PURPLE/YELLOW (role)
+                "team_group": team_name,                   # Team A / Team B (non-breaking extra)
+                "instance_id": cloud_instance.id,
+                "logical_machine_name": logical_machine_name,
+                "cloud_machine_name": cloud_machine_name,
+                "total_obtained_score": 0,
+                "scenario_id": scenario["id"],
+                "created_at": current_time_stamp,
+                "updated_at": current_time_stamp,
+            }
+
+            if participant_id not in participant_array:
+                participant_array.append(participant_id)
+
+            # ----- Flag init -----
+            if scenario.get("flag_data"):
+                flag_data_list = []
+                flag_ids = scenario["flag_data"].get(team_role.lower() + "_team", [])
+                total_score = 0
+
+                for fid in flag_ids:
+                    flag_doc = _flag_doc(fid)
+                    total_score += int(flag_doc.get("score", 0))
+
+                    flag_data_list.append({
+                        "flag_id": fid,
+                        #(for phase-wise UI)
+                        "phase_id": flag_doc.get("phase_id"),  
+                        "submitted_response": "",
+                        "obtained_score": 0,
+                        "hint_used": False,
+                        "retires": 0,
+                        "assigned_at": current_time_stamp,
+                        "first_visible_at": current_time_stamp,  #  (decay anchor)
+                        "submitted_at": None,
+                        "approved_at": None,
+                        "locked_by_admin": bool(flag_doc.get("is_locked", False)),
+                        "updated_at": current_time_stamp,
+                        "status": True
+                    })
+
+                participant_data["flag_data"] = flag_data_list
+                participant_data["total_score"] = total_score
+
+            # ----- Milestone init -----
+            elif scenario.get("milestone_data"):
+                milestone_data_list = []
+                milestone_ids = scenario["milestone_data"].get(team_role.lower() + "_team", [])
+                total_score = 0
+
+                for mid in milestone_ids:
+                    milestone_doc = _milestone_doc(mid)
+                    total_score += int(milestone_doc.get("score", 0))
+
+                    milestone_data_list.append({
+                        "milestone_id": mid,
+
+                        # phase mapping (kill-chain UI)
+                        "phase_id": milestone_doc.get("phase_id"),
+
+                        "is_achieved": False,
+                        "is_approved": False,
+                        "obtained_score": 0,
+                        "hint_used": False,
+                        "retires": 0,
+                        "screenshot_url": "",
+
+                        # locking + decay anchors
+                        "status": True,
+                        "locked_by_admin": bool(milestone_doc.get("is_locked", False)),
+                        "first_visible_at": current_time_stamp,
+
+                        # timestamps
+                        "assigned_at": current_time_stamp,
+                        "submitted_at": None,
+                        "achieved_at": None,
+                        "approved_at": None,
+                        "updated_at": current_time_stamp,
+                    })
+
+                participant_data["milestone_data"] = milestone_data_list
+                participant_data["total_score"] = total_score
+
+            else:
+                logging.error("Unknown Error: scenario has neither flag_data nor milestone_data")
+
+            participant_data_list.append(participant_data)
+            participant_id_dict[participant_id] = participant_data_id
+
+        except Exception as e:
+            logging.error("Participant Data Exception Occured (team=%s, machine=%s): %s", team_name, logical_machine_name, e)
+            continue
+
+    if participant_data_list:
+        participant_data_collection.insert_many(participant_data_list)
 
     # --------- active scenario record (keep SAME keys to avoid breaking existing code) ----------
     active_scenario_id = generate_random_string(id_type="Active Scenario Id", length=40)
@@ -626,83 +697,144 @@ def start_corporate_game(validated_data):
     active_scenario_collection.insert_one(active_scenario_data)
 
     # --------- notifications ----------
-    for participant in participant_array:
-        notification = {
-            "type": "action",
-            "title": f"{corporate_game.get('name', 'Corporate')} Corporate Started",
-            "description": f"{corporate_game.get('name', 'Corporate')} Corporate started successfully.",
-            "timestamp": start_time,
-            "user_id": participant,
-            "action_urls": [],
-            "redirection_url": "/ActiveGameSenario/corporate",
-        }
-        notification_collection.insert_one(notification)
-        async_to_sync(send_notification)(group_name=participant)
+    dispatch_notifications(participant_array, {
+        "type": "action",
+        "title": f"{corporate_game.get('name', 'Corporate')} Corporate Started",
+        "description": f"{corporate_game.get('name', 'Corporate')} Corporate started successfully.",
+        "timestamp": start_time,
+        "action_urls": [],
+        "redirection_url": "/ActiveGameSenario/corporate",
+    })
 
     # white team notification (keep your existing else-style semantics)
-    notification = {
+    dispatch_notifications([user["user_id"]], {
         "type": "information",
         "title": f"{corporate_game.get('name', 'Corporate')} Corporate Started",
         "description": f"{corporate_game.get('name', 'Corporate')} Corporate started successfully for {user_emails}.",
         "timestamp": start_time,
-        "user_id": user["user_id"],
         "action_urls": [],
         "redirection_url": "",
-    }
-    notification_collection.insert_one(notification)
-    async_to_sync(send_notification)(group_name=user["user_id"])
+    })
 
 def _now():
     return datetime.datetime.now()
 
+def _archive_scenario_documents(active_scenario, participant_docs, session=None):
+    archive_scenario_collection.insert_one(dict(active_scenario), session=session)
+    active_scenario_collection.delete_one({"id": active_scenario["id"]}, session=session)
+
+    if participant_docs:
+        archive_participant_collection.insert_many(participant_docs, session=session)
+        participant_data_collection.delete_many(
+            {"id": {"$in": [participant["id"] for participant in participant_docs]}},
+            session=session
+        )
+
+
+def archive_corporate_scenario(active_scenario):
+    """
+    Moves the active scenario and all of its participant documents to the
+    archive collections in one transaction, so an ended game is never left
+    half archived. Deployments without a replica set (no transactions) fall
+    back to the same bulk writes without a session.
+    """
+    participant_docs = list(participant_data_collection.find(
+        {"id": {"$in": list(active_scenario.get("participant_data", {}).values())}}
+    ))
+
+    try:
+        with mongo_client.start_session() as session:
+            session.with_transaction(
+                lambda s: _archive_scenario_documents(active_scenario, participant_docs, session=s)
+            )
+    except OperationFailure as e:
+        if e.code != MONGO_TRANSACTIONS_UNSUPPORTED:
+            raise
+        _archive_scenario_documents(active_scenario, participant_docs)
+
+
+def end_active_corporate_scenario(active_scenario):
+    """Archives a running corporate scenario and schedules its teardown."""
+    active_scenario.pop("_id", None)
+    active_scenario["end_time"] = datetime.datetime.now()
+    active_scenario["end_progress"] = {step: CORPORATE_END_PENDING for step in CORPORATE_END_STEPS}
+    # The end_corporate_game queued below is the first attempt and holds the lease
+    active_scenario["end_attempts"] = 1
+    active_scenario["end_lease_at"] = active_scenario["end_time"]
+
+    archive_corporate_scenario(active_scenario)
+    invalidate_chat_roster(active_scenario["id"])
+
+    end_corporate_game.delay(active_scenario)
+    refresh_winning_wall_task.delay("corporate", list(active_scenario.get("participant_data", {}).keys()))
+
+
+def _record_end_progress(active_scenario_id, step, status, **extra):
+    update = {f"end_progress.{step}": status}
+    update.update(extra)
+    archive_scenario_collection.update_one({"id": active_scenario_id}, {"$set": update})
+
+
+def _send_end_notifications(active_scenario):
+    end_time = datetime.datetime.now()
+    corporate_game = corporate_scenario_collection.find_one({"id": active_scenario["scenario_id"]}, {"_id": 0, "name": 1}) or {}
+    name = corporate_game.get('name', 'Corporate')
+
+    recipients = list(active_scenario["participant_data"]) + [active_scenario["started_by"]]
+    dispatch_notifications(recipients, {
+        "type": "information",
+        "title": f"{name} Corporate Ended",
+        "description": f"{name} Corporate ended successfully.",
+        "timestamp": end_time,
+        "redirection_url": "",
+    })
+
+
 @shared_task
 def end_corporate_game(active_scenario):
-    
-    subnet_dict = {}
+    """
+    Tears an ended corporate scenario down through the cloud teardown engine
+    and records the report on the archived scenario. Teardown is idempotent,
+    so resume_corporate_game_end simply reruns whichever step is not DONE.
+    """
+    clear_leaderboard(active_scenario["id"])
+    invalidate_scenario_scoring_config(active_scenario["id"])
 
-    for network in active_scenario["networks"]:
-        subnet_dict[network["network_name"]] = network["subnet_id"]
+    progress = active_scenario.get("end_progress", {})
 
-    for instance in active_scenario["instances"]:
-        cloud_instance = get_cloud_instance(instance["id"])
-        if cloud_instance:
-            deleted_cloud_instance = delete_cloud_instance(cloud_instance)
+    if progress.get("teardown") != CORPORATE_END_DONE:
+        subnet_dict = {}
 
-    for router in active_scenario["routers"]:
-        cloud_router = get_cloud_router(router['id'])
-        if cloud_router:
-            for network_name in router["network_name"]:
-                disconnect_router_from_private_network(router['id'], subnet_dict[network_name])
-            delete_cloud_router(router['id'])
+        for network in active_scenario["networks"]:
+            subnet_dict[network["network_name"]] = network["subnet_id"]
 
-    for network in active_scenario["networks"]:
-        delete_cloud_network(network['network_id'], network['subnet_id'])
+        report = teardown_resources(
+            instance_ids=[instance["id"] for instance in active_scenario["instances"]],
+            routers=[
+                {"router_id": router["id"], "subnet_ids": [subnet_dict[name] for name in router["network_name"]]}
+                for router in active_scenario["routers"]
+            ],
+            networks=active_scenario["networks"],
+            max_workers=CORPORATE_TEARDOWN_MAX_WORKERS,
+        )
+        status = CORPORATE_END_DONE if report["status"] == TEARDOWN_COMPLETED else CORPORATE_END_FAILED
+        _record_end_progress(active_scenario["id"], "teardown", status, teardown_report=report)
+        if status == CORPORATE_END_FAILED:
+            return {"message": "Corporate teardown failed.", "active_scenario_id": active_scenario["id"], "report": report}
 
-    end_time = datetime.datetime.now()
-    corporate_game = corporate_scenario_collection.find_one({"id":active_scenario["scenario_id"]},{"_id":0})
-
-    for key in active_scenario["participant_data"]:
-        notification = {
-            "type": "information",
-            "title": f"{corporate_game['name']} Corporate Ended",
-            "description": f"{corporate_game['name']} Corporate ended successfully.",
-            "timestamp": end_time,
-            "user_id": key,
-            "redirection_url": "",
-        }
-        notification_collection.insert_one(notification)
-        async_to_sync(send_notification)(group_name=key)
-    else:
-        notification = {
-            "type": "information",
-            "title": f"{corporate_game['name']} Corporate Ended",
-            "description": f"{corporate_game['name']} Corporate ended successfully.",
-            "timestamp": end_time,
-            "user_id": active_scenario["started_by"],
-            "redirection_url": "",
-        }
-        notification_collection.insert_one(notification)
-        async_to_sync(send_notification)(group_name=active_scenario["started_by"])
+    if progress.get("notifications") != CORPORATE_END_DONE:
+        _send_end_notifications(active_scenario)
+        _record_end_progress(active_scenario["id"], "notifications", CORPORATE_END_DONE)
+
+    return {"message": "Corporate teardown completed.", "active_scenario_id": active_scenario["id"]}
+
+
+@shared_task
+def resume_corporate_game_end(active_scenario_id):
+    archived_scenario = archive_scenario_collection.find_one({"id": active_scenario_id}, {"_id": 0})
+    if not archived_scenario:
+        return {"errors": "Invalid Active Scenario ID"}
+    return end_corporate_game(archived_scenario)
 
 
 # report data 
@@ -1,9 +1,8 @@
 from django.shortcuts import render
-from rest_framework import generics, status, views
+from rest_framework import generics, status, views, serializers
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from asgiref.sync import async_to_sync
-from threading import Thread
 from rest_framework.views import APIView
 
 
@@ -48,7 +47,9 @@ from .serializers import (
 )
 from corporate_management.api.serializers.scenario import ActiveScenarioIPListSerializer
 from corporate_management.services.chat_access import build_chat_channels
-from .utils import corporate_send_notification,send_notification_reload
+from corporate_management.services.chat_history import CHAT_PAGE_SIZE, CHAT_MAX_PAGE_SIZE, broadcast_chat_message
+from .utils import corporate_send_notification,send_notification_reload,milestone_state_update
+from .services.leaderboard import broadcast_leaderboard_row
 
 
 class CorporateScenarioPhaseCreateView(generics.CreateAPIView):
@@ -276,11 +277,11 @@ class CorporateScenarioSubmitFlagView(generics.CreateAPIView):
         # respond first (SAFE)
         response = Response(result, status=status.HTTP_201_CREATED)
 
-        if result.get("is_correct") is True:
-            Thread(
-                target=corporate_send_notification,
-                kwargs={"group_name": request.data["active_scenario_id"]}
-            ).start()
+        if result.get("leaderboard"):
+            async_to_sync(broadcast_leaderboard_row)(
+                group_name=request.data["active_scenario_id"],
+                row=result["leaderboard"]
+            )
 
         return response
     
@@ -296,7 +297,10 @@ class CorporateScenarioAchieveMilestoneView(generics.CreateAPIView):
             response = serializer.data
             response.pop('_id', None)
             if response:
-                async_to_sync(send_notification_reload)(group_name=request.data["active_scenario_id"])
+                async_to_sync(send_notification_reload)(
+                    group_name=request.data["active_scenario_id"],
+                    data=milestone_state_update(request.user["user_id"], request.data["milestone_id"], "ACHIEVED")
+                )
             return Response(response, status=status.HTTP_201_CREATED)
         return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -312,8 +316,15 @@ class CorporateScenarioApproveMilestoneView(generics.CreateAPIView):
             response = serializer.data
             response.pop('_id', None)
             if response:
-                async_to_sync(corporate_send_notification)(group_name=request.data["active_scenario_id"])
-                async_to_sync(send_notification_reload)(group_name=request.data["active_scenario_id"])
+                if scenario.get("leaderboard"):
+                    async_to_sync(broadcast_leaderboard_row)(
+                        group_name=request.data["active_scenario_id"],
+                        row=scenario["leaderboard"]
+                    )
+                async_to_sync(send_notification_reload)(
+                    group_name=request.data["active_scenario_id"],
+                    data=milestone_state_update(request.data["participant_id"], request.data["milestone_id"], "APPROVED")
+                )
             return Response(response, status=status.HTTP_201_CREATED)
         return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
     
@@ -329,7 +340,10 @@ class CorporateScenarioRejectMilestoneView(generics.CreateAPIView):
             response = serializer.data
             response.pop('_id', None)
             if response:
-                async_to_sync(send_notification_reload)(group_name=request.data["active_scenario_id"])
+                async_to_sync(send_notification_reload)(
+                    group_name=request.data["active_scenario_id"],
+                    data=milestone_state_update(request.data["participant_id"], request.data["milestone_id"], "REJECTED")
+                )
             return Response(response, status=status.HTTP_201_CREATED)
         return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
     
@@ -629,8 +643,35 @@ class ScenarioChatMessagesView(APIView):
 
     def get(self, request, channel_key):
         serializer = ScenarioChatMessageListSerializer()
-        messages = serializer.get(channel_key)
-        return Response({"messages": messages})
+        try:
+            page = serializer.get(
+                channel_key,
+                before=request.query_params.get("before"),
+                limit=request.query_params.get("limit", CHAT_PAGE_SIZE),
+            )
+        except serializers.ValidationError as e:
+            return Response({"errors": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(page)
+
+
+class ScenarioChatMessagesSinceView(APIView):
+    """Messages after the `after` cursor of the last page a client saw, for reconnects."""
+    permission_classes = [CustomIsAuthenticated]
+
+    def get(self, request, channel_key):
+        if not request.query_params.get("after"):
+            return Response({"errors": ["after cursor is required"]}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = ScenarioChatMessageListSerializer()
+        try:
+            page = serializer.get(
+                channel_key,
+                after=request.query_params["after"],
+                limit=request.query_params.get("limit", CHAT_MAX_PAGE_SIZE),
+            )
+        except serializers.ValidationError as e:
+            return Response({"errors": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(page)
 
 class ScenarioChatSendView(APIView):
     permission_classes = [CustomIsAuthenticated]
@@ -643,6 +684,7 @@ class ScenarioChatSendView(APIView):
 
         serializer.is_valid(raise_exception=True)
         msg = serializer.save()
+        async_to_sync(broadcast_chat_message)(msg)
 
         # 🔍 HARD DEBUG — DO NOT SKIP
         from bson import ObjectId
@@ -0,0 +1,83 @@
+import hashlib
+import json
+
+import redis
+from django.conf import settings
+
+from core.cache import TTLCache
+from database_management.pymongo_client import ctf_category_collection, ctf_game_collection
+from database_management.redis_client import redis_client
+
+CTF_CATALOG_CACHE_TTL = getattr(settings, "CTF_CATALOG_CACHE_TTL", 3600)
+CTF_CATALOG_VERSION_KEY = "ctf_catalog:version"
+
+# Keyed by catalog version, so a bump makes every process miss immediately
+ctf_catalog_cache = TTLCache("ctf_catalog", ttl=CTF_CATALOG_CACHE_TTL)
+
+
+def get_ctf_catalog_version():
+    try:
+        return int(redis_client.get(CTF_CATALOG_VERSION_KEY) or 0)
+    except redis.RedisError:
+        return None
+
+
+def bump_ctf_catalog_version():
+    """Call after any write to a CTF game, category or cloud mapping shown in the catalog."""
+    try:
+        redis_client.incr(CTF_CATALOG_VERSION_KEY)
+    except redis.RedisError:
+        # Cached catalogs still expire after CTF_CATALOG_CACHE_TTL
+        ctf_catalog_cache.invalidate()
+
+
+def build_ctf_catalog():
+    games_by_category = {
+        group["_id"]: group["category_items"]
+        for group in ctf_game_collection.aggregate([
+            {"$match": {"ctf_target_uploaded": True}},
+            {"$group": {
+                "_id": "$ctf_category_id",
+                "category_items": {"$push": {
+                    "ctf_id": "$ctf_id",
+                    "ctf_name": "$ctf_name",
+                    "ctf_description": "$ctf_description",
+                    "ctf_thumbnail": "$ctf_thumbnail",
+                    "ctf_creator_id": "$ctf_creator_id",
+                    "ctf_creator_name": "$ctf_creator_name",
+                    "ctf_assigned_severity": "$ctf_assigned_severity",
+                    "ctf_rated_severity": "$ctf_rated_severity",
+                    "ctf_score": "$ctf_score",
+                    "ctf_players_count": "$ctf_players_count",
+                }},
+            }},
+        ])
+    }
+
+    ctf_categories_list = []
+    for category in ctf_category_collection.find({}, {"_id": 0}):
+        ctf_games_list = games_by_category.get(category['ctf_category_id'], [])
+        ctf_categories_list.append({
+            "ctf_category_id": category['ctf_category_id'],
+            "ctf_category_name": category['ctf_category_name'],
+            "ctf_category_description": category['ctf_category_description'],
+            "ctf_category_thumbnail": category["ctf_category_thumbnail"],
+            "category_items": ctf_games_list,
+            "count": len(ctf_games_list),
+        })
+
+    return sorted(ctf_categories_list, key=lambda x: x["count"], reverse=True)
+
+
+def _build_cached_catalog():
+    catalog = build_ctf_catalog()
+    payload = json.dumps(catalog, sort_keys=True, default=str).encode()
+    return {"etag": '"' + hashlib.md5(payload).hexdigest() + '"', "catalog": catalog}
+
+
+def get_ctf_catalog():
+    """Returns {"etag": ..., "catalog": [...]} for the current catalog version."""
+    version = get_ctf_catalog_version()
+    if version is None:
+        return _build_cached_catalog()
+    return ctf_catalog_cache.get(version, loader=_build_cached_catalog)
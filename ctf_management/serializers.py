@@ -26,47 +26,17 @@ from database_management.pymongo_client import (
     user_resource_collection,
     game_start_buffer_collection
 )
-from .utils import create_ctf_game, delete_ctf_game, validate_file_size
+from .utils import create_ctf_game, delete_ctf_game, schedule_ctf_game_expiry, validate_file_size
+from .warm_pool import claim_warm_pool_game, get_warm_pool_metrics
+from .catalog import get_ctf_catalog, bump_ctf_catalog_version
+from user_management.utils import set_user_profile_score
+from user_management.winning_wall import refresh_winning_wall
 
 
 class CTFCategorySerializer(serializers.Serializer):
 
     def get(self):
-        ctf_categories_list = []
-        ctf_categories = ctf_category_collection.find()
-
-        for category in ctf_categories:
-            ctf_games_list = []
-
-            ctf_games = ctf_game_collection.find({"ctf_category_id": category['ctf_category_id'], "ctf_target_uploaded": True})
-
-            for ctf_game in ctf_games:
-                temp_game = {
-                    "ctf_id": ctf_game['ctf_id'],
-                    "ctf_name": ctf_game['ctf_name'],
-                    "ctf_description": ctf_game['ctf_description'],
-                    "ctf_thumbnail": ctf_game['ctf_thumbnail'],
-                    "ctf_creator_id": ctf_game['ctf_creator_id'],
-                    "ctf_creator_name": ctf_game['ctf_creator_name'],
-                    "ctf_assigned_severity": ctf_game['ctf_assigned_severity'],
-                    "ctf_rated_severity": ctf_game['ctf_rated_severity'],
-                    "ctf_score": ctf_game['ctf_score'],
-                    "ctf_players_count": ctf_game['ctf_players_count']
-                }
-                ctf_games_list.append(temp_game)
-
-            temp_category = {
-                "ctf_category_id": category['ctf_category_id'],
-                "ctf_category_name": category['ctf_category_name'],
-                "ctf_category_description": category['ctf_category_description'],
-                "ctf_category_thumbnail": category["ctf_category_thumbnail"],
-                "category_items": ctf_games_list,
-                "count": len(ctf_games_list),
-            }
-
-            ctf_categories_list.append(temp_category)
-
-        return sorted(ctf_categories_list, key=lambda x: x["count"], reverse=True)
+        return get_ctf_catalog()["catalog"]
 
     class Meta:
         ref_name = 'CTFCategory'
@@ -205,6 +175,7 @@ class CTFGameSerializer(serializers.Serializer):
         }
 
         ctf_game_collection.insert_one(ctf)
+        bump_ctf_catalog_version()
 
         return ctf
 
@@ -293,6 +264,7 @@ class CTFGameMachineSerializer(serializers.Serializer):
             'ctf_updated_at': current_date_time
         }}
         ctf_update = ctf_game_collection.update_one({'ctf_id': ctf_id}, ctf_values)
+        bump_ctf_catalog_version()
 
         return validated_data
 
@@ -467,6 +439,14 @@ class CTFStartGameSerializer(serializers.Serializer):
         ctf_mapping = ctf_cloud_mapping_collection.find_one({"ctf_id": validated_data['ctf_game'].get('ctf_id')}, {"_id": 0})
         ctf_name = validated_data['ctf_game'].get('ctf_name')
 
+        ctf_active_game = claim_warm_pool_game(user_id, ctf_mapping, ctf_name)
+        if ctf_active_game:
+            schedule_ctf_game_expiry(ctf_active_game['ctf_game_id'], ctf_active_game['ctf_end_time'])
+            return {
+                "ctf_game_id": ctf_active_game['ctf_game_id'],
+                "ctf_is_ready": True
+            }
+
         buffer_id = generate_random_string('buffer_id', length=10)
         buffer = {
             "buffer_id": buffer_id,
@@ -486,6 +466,14 @@ class CTFStartGameSerializer(serializers.Serializer):
         ref_name = 'CTFStartGame'
 
 
+class CTFWarmPoolMetricsSerializer(serializers.Serializer):
+    def get(self):
+        return get_warm_pool_metrics()
+
+    class Meta:
+        ref_name = 'CTFWarmPoolMetrics'
+
+
 class CTFGameConsoleSerializer(serializers.Serializer):
     ctf_game_id = serializers.CharField(read_only=True)
 
@@ -787,6 +775,7 @@ class CTFDeleteGameSerializer(serializers.Serializer):
                     }
                     }
                 )
+                bump_ctf_catalog_version()
 
         elif score_percentage >= 65:
             ctf_game_status = "pass"
@@ -800,7 +789,9 @@ class CTFDeleteGameSerializer(serializers.Serializer):
 
         if ctf_players_arsenal:
             ctf_archive_game_list = ctf_players_arsenal['ctf_archive_game_list']
-            ctf_archive_game_list.append(ctf_archive_game_id)
+            # A retried delete scores the same archive id again
+            if ctf_archive_game_id not in ctf_archive_game_list:
+                ctf_archive_game_list.append(ctf_archive_game_id)
 
             ctf_player_arsenal_collection.update_one(
                 {'user_id': ctf_active_game['user_id'], 'ctf_id': ctf_game['ctf_id']},
@@ -839,32 +830,55 @@ class CTFDeleteGameSerializer(serializers.Serializer):
             user_ctf_score += game['ctf_score_obtained']
 
             # For updating total score
-        user_profile_update = user_profile_collection.update_one({'user_id': ctf_active_game['user_id']}, {'$set': {
-            'user_ctf_score': user_ctf_score,
-            'user_profile_updated_at': datetime.datetime.now()
-        }})
+        set_user_profile_score(ctf_active_game['user_id'], 'user_ctf_score', user_ctf_score)
+        refresh_winning_wall('ctf', [ctf_active_game['user_id']])
+
+    def delete_game(self, ctf_game_id, user_id, is_superadmin=None, claim_filter=None):
+        """
+        Archives an active game. Flipping ctf_is_ready is the claim: a player's
+        delete, the expiry ETA task and the expiry sweep all go through it, so
+        only one of them can score and archive the game. Returns None when the
+        game is not claimable (already being deleted, or claim_filter no longer
+        matches). The archive id is kept on the active game before any score is
+        written, so a delete retried after a failure scores the same archive.
+        """
+        if is_superadmin is None:
+            is_superadmin = self.context['request'].user.get("is_superadmin")
+
+        claim_query = {'ctf_game_id': ctf_game_id, 'ctf_is_ready': True}
+        if not is_superadmin:
+            claim_query['user_id'] = user_id
+        claim_query.update(claim_filter or {})
+
+        claimed_game = ctf_active_game_collection.find_one_and_update(
+            claim_query,
+            {'$set': {'ctf_is_ready': False}},
+            projection={"_id": 0}
+        )
+        if not claimed_game:
+            return None
 
-    def delete_game(self, ctf_game_id, user_id):
-        request = self.context['request']
-        if request.user.get("is_superadmin"):
-            ctf_active_game = ctf_active_game_collection.find_one(
-                {'ctf_game_id': ctf_game_id},
-                {"_id": 0}
-            )
-        else:
-            ctf_active_game = ctf_active_game_collection.find_one(
-                {'ctf_game_id': ctf_game_id, "user_id": user_id},
-                {"_id": 0}
-            )
+        try:
+            ctf_active_game = claimed_game
 
-        user_resource = user_resource_collection.find_one({"user_id": ctf_active_game['user_id']}, {"_id": 0})
+            user_resource = user_resource_collection.find_one({"user_id": ctf_active_game['user_id']}, {"_id": 0})
 
-        ctf_archive_game_id = generate_random_string('ctf_archive_game_id', length=35)
+            ctf_archive_game_id = ctf_active_game.get('ctf_archive_game_id')
+            if not ctf_archive_game_id:
+                ctf_archive_game_id = generate_random_string('ctf_archive_game_id', length=35)
+                ctf_active_game_collection.update_one(
+                    {'ctf_game_id': ctf_game_id},
+                    {'$set': {'ctf_archive_game_id': ctf_archive_game_id}}
+                )
 
-        ctf_score_obtained, ctf_score, ctf_game_status = self.update_player_arsenal(ctf_active_game, ctf_archive_game_id)
-        self.update_user_profile(ctf_active_game)
+            ctf_score_obtained, ctf_score, ctf_game_status = self.update_player_arsenal(ctf_active_game, ctf_archive_game_id)
+            self.update_user_profile(ctf_active_game)
 
-        delete_ctf_game.delay(ctf_active_game, user_resource, ctf_archive_game_id)
+            delete_ctf_game.delay(ctf_active_game, user_resource, ctf_archive_game_id)
+        except Exception:
+            # Release the claim so the player or the next sweep can retry
+            ctf_active_game_collection.update_one({'ctf_game_id': ctf_game_id}, {'$set': {'ctf_is_ready': True}})
+            raise
 
         response = {
             "ctf_archive_game_id": ctf_archive_game_id,
@@ -918,6 +932,7 @@ class CTFRatedSeveritySerializer(serializers.Serializer):
             'ctf_rating_count': total_rating,
             'ctf_updated_at': datetime.datetime.now()
         }})
+        bump_ctf_catalog_version()
 
     def validate(self, data):
         user_id = self.context['request'].user['user_id']
@@ -1,10 +1,81 @@
+import logging
+import time
+
 from celery import shared_task
+from django.conf import settings
 
+from cloud_management.utils import run_in_pool
+from database_management.pymongo_client import ctf_active_game_collection
 from .serializers import CTFDeleteGameSerializer
+from .utils import schedule_ctf_game_expiry
+from .warm_pool import activate_warm_pool_entry, replenish_ctf_warm_pool, maintain_ctf_warm_pool
+
+logger = logging.getLogger(__name__)
+
+# Max expired games archived concurrently by the expiry sweep
+CTF_EXPIRY_MAX_WORKERS = getattr(settings, "CTF_EXPIRY_MAX_WORKERS", 4)
 
 
 @shared_task
 def delete_ctf_game_task(ctf_game_id, user_id):
     serializer = CTFDeleteGameSerializer()
     ctf_archive_game = serializer.delete_game(ctf_game_id, user_id)
-    return ctf_archive_game
\ No newline at end of file
+    return ctf_archive_game
+
+
+def _expire_ctf_game(ctf_game_id):
+    # delete_game claims the game atomically, so the ETA task, the sweep and a
+    # player's own delete can never archive the same game twice.
+    serializer = CTFDeleteGameSerializer()
+    ctf_archive_game = serializer.delete_game(
+        ctf_game_id, None, is_superadmin=True,
+        claim_filter={"ctf_end_time": {"$lte": time.time()}}
+    )
+    return ctf_archive_game is not None
+
+
+@shared_task
+def expire_ctf_game(ctf_game_id):
+    ctf_active_game = ctf_active_game_collection.find_one({"ctf_game_id": ctf_game_id}, {"_id": 0, "ctf_end_time": 1})
+    if not ctf_active_game:
+        return False
+
+    # The player extended the game after this task was scheduled
+    if ctf_active_game["ctf_end_time"] > time.time():
+        schedule_ctf_game_expiry(ctf_game_id, ctf_active_game["ctf_end_time"])
+        return False
+
+    return _expire_ctf_game(ctf_game_id)
+
+
+@shared_task
+def expire_ctf_games():
+    expired_games = ctf_active_game_collection.find(
+        {"ctf_end_time": {"$lte": time.time()}, "ctf_is_ready": True},
+        {"_id": 0, "ctf_game_id": 1}
+    )
+    expired_game_ids = [game["ctf_game_id"] for game in expired_games]
+
+    active_game_id_list = list()
+    error_list = list()
+    results = run_in_pool(_expire_ctf_game, expired_game_ids, max_workers=CTF_EXPIRY_MAX_WORKERS)
+    for ctf_game_id, (is_expired, error) in zip(expired_game_ids, results):
+        if error:
+            logger.error(f"Error while expiring game {ctf_game_id}: {str(error)}")
+            error_list.append(ctf_game_id)
+        elif is_expired:
+            active_game_id_list.append(ctf_game_id)
+
+    if active_game_id_list:
+        response = {
+            "message" : "Games Delete Successfully.",
+            "ctf_game_id_list" : active_game_id_list,
+            "error_list" : error_list,
+        }
+    else:
+        response = {
+            "message" : "No pending games to delete.",
+            "ctf_game_id_list" : [],
+            "error_list" : error_list,
+        }
+    return response
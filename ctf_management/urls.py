@@ -17,7 +17,8 @@ from .views import (
     CTFGameListView,
     CTFTargetIPView,
     CTFLMSListView,
-    CTFGetScoreByGameIdView
+    CTFGetScoreByGameIdView,
+    CTFWarmPoolMetricsView
 )
 
 app_name = "ctf-management"
@@ -40,6 +41,7 @@ urlpatterns = [
     path('game/based-on-category/<slug:category_id>/', CTFGameListView.as_view(), name='ctf-game-list'),
     path('game/ctf_list/', CTFLMSListView.as_view(), name='ctf-list'),
     path('game/score_by_id/', CTFGetScoreByGameIdView.as_view(), name='ctf-score-by-id'),
+    path('game/warm-pool/metrics/', CTFWarmPoolMetricsView.as_view(), name='ctf-warm-pool-metrics'),
     path('game/<slug:ctf_id>/', CTFGameDetailView.as_view(), name='ctf-game-detail'),
    
 ]
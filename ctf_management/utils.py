@@ -1,16 +1,14 @@
 import datetime
-from asgiref.sync import async_to_sync
-from celery import shared_task
+from celery import shared_task, current_app
 
 from core.utils import generate_random_string, API_URL, FRONTEND_URL
-from notification_management.utils import send_notification
+from notification_management.utils import dispatch_notifications
 from database_management.pymongo_client import (
     ctf_active_game_collection,
     user_resource_collection,
     ctf_archive_game_collection,
     ctf_game_collection,
     game_start_buffer_collection,
-    notification_collection,
 )
 from cloud_management.utils import (
     get_cloud_network,
@@ -20,16 +18,28 @@ from cloud_management.utils import (
     get_instance_private_ip,
     create_cloud_network,
     create_cloud_router,
-    create_cloud_instance,
+    submit_cloud_instance,
+    get_boot_group,
+    delete_boot_group,
     connect_router_to_public_network,
     connect_router_to_private_network,
-    disconnect_router_from_private_network,
-    delete_cloud_instance,
-    delete_cloud_router,
-    delete_cloud_network
+    CLOUD_BOOT_READY,
  )
+from cloud_management.teardown import teardown_resources, record_leaked_resources, TEARDOWN_COMPLETED
 from django.core.exceptions import ValidationError
 
+from .warm_pool import warm_pool_teardown_resources
+
+CTF_TEARDOWN_MAX_RETRIES = 3
+
+
+def schedule_ctf_game_expiry(ctf_game_id, ctf_end_time):
+    current_app.send_task(
+        "ctf_management.tasks.expire_ctf_game",
+        args=[ctf_game_id],
+        eta=datetime.datetime.fromtimestamp(ctf_end_time, tz=datetime.timezone.utc)
+    )
+
 
 @shared_task
 def create_ctf_game(user_id, ctf_mapping, ctf_name):
@@ -58,22 +68,20 @@ def create_ctf_game(user_id, ctf_mapping, ctf_name):
         user_resource_id = generate_random_string('user_resource_id', length=10)
         new_user_resource = True
         
-    # Creating Target Machine Server
+    # Both machines boot in the background; finalize_ctf_game flips ctf_is_ready once they are up
     target_instance_name = user_id + "_" + ctf_game_id +  "_target"
-    target_cloud_instance, target_ip = create_cloud_instance(target_instance_name, target_image_id, target_flavor_id, network.id)
-
-    target_cloud_instance = get_cloud_instance(target_cloud_instance.id)
-    if not target_ip:
-        target_ip = get_instance_private_ip(target_cloud_instance)
+    target_cloud_instance = submit_cloud_instance(
+        target_instance_name, target_image_id, target_flavor_id, network.id,
+        boot_group_id=ctf_game_id, on_ready="ctf_management.utils.finalize_ctf_game"
+    )
 
-    # Creating Attacker Machine Server
     attacker_instance_name = user_id + "_" + ctf_game_id + "_attacker"
-    attacker_cloud_instance, attacker_ip = create_cloud_instance(attacker_instance_name, attacker_image_id, attacker_flavor_id, network.id)
-
-    attacker_cloud_instance = get_cloud_instance(attacker_cloud_instance.id)
-    if not attacker_ip:
-        attacker_ip = get_instance_private_ip(attacker_cloud_instance)
+    attacker_cloud_instance = submit_cloud_instance(
+        attacker_instance_name, attacker_image_id, attacker_flavor_id, network.id,
+        boot_group_id=ctf_game_id, on_ready="ctf_management.utils.finalize_ctf_game"
+    )
 
+    # Provisional timings, reset by finalize_ctf_game when the machines are ready
     start_time = datetime.datetime.now()
     end_time = start_time + datetime.timedelta(hours=ctf_time)
 
@@ -87,13 +95,13 @@ def create_ctf_game(user_id, ctf_mapping, ctf_name):
         "ctf_time_extended": False,
         "ctf_flags_captured": [],
         "ctf_target_machine_id": target_cloud_instance.id,
-        "ctf_target_private_ip": target_ip,
+        "ctf_target_private_ip": "",
         "ctf_attacker_machine_id": attacker_cloud_instance.id,
-        "ctf_attacker_private_ip": attacker_ip,
+        "ctf_attacker_private_ip": "",
         "user_resource_id": user_resource_id,
         "ctf_game_created_at": start_time,
         "ctf_game_updated_at": start_time,
-        "ctf_is_ready": True
+        "ctf_is_ready": False
     }
     ctf_active_game_collection.insert_one(ctf_active_game)
 
@@ -121,53 +129,121 @@ def create_ctf_game(user_id, ctf_mapping, ctf_name):
     response = {
         "ctf_game_id": ctf_game_id
     }
+    return response
+
+
+@shared_task
+def finalize_ctf_game(ctf_game_id):
+    ctf_active_game = ctf_active_game_collection.find_one({"ctf_game_id": ctf_game_id}, {"_id": 0})
+    boots = {boot["instance_id"]: boot for boot in get_boot_group(ctf_game_id)}
+    delete_boot_group(ctf_game_id)
+
+    if not ctf_active_game:
+        return
+
+    user_id = ctf_active_game['user_id']
+    ctf_game = ctf_game_collection.find_one({'ctf_id': ctf_active_game['ctf_id']}, {'_id': 0, 'ctf_name': 1})
+    ctf_name = ctf_game['ctf_name'] if ctf_game else "CTF"
+
+    target_boot = boots.get(ctf_active_game['ctf_target_machine_id'], {})
+    attacker_boot = boots.get(ctf_active_game['ctf_attacker_machine_id'], {})
+    current_time = datetime.datetime.now()
 
     game_start_buffer_collection.delete_one({"user_id": user_id})
 
-    notification = {
-        "type": "redirection",
-        "title": f"{ctf_name} CTF Started",
-        "description": f"{ctf_name} CTF started successfully.",
-        "timestamp": start_time,
-        "user_id": user_id,
-        "action_urls": [],
-        "redirection_url": "/activegame",
-    }
-    notification_collection.insert_one(notification)
-    
-    async_to_sync(send_notification)(group_name=user_id)
+    if target_boot.get("status") == CLOUD_BOOT_READY and attacker_boot.get("status") == CLOUD_BOOT_READY:
+        target_ip = target_boot.get("ip") or get_instance_private_ip(get_cloud_instance(ctf_active_game['ctf_target_machine_id']))
+        attacker_ip = attacker_boot.get("ip") or get_instance_private_ip(get_cloud_instance(ctf_active_game['ctf_attacker_machine_id']))
+
+        # The play clock starts when the machines are reachable, not when they were requested
+        ctf_duration = ctf_active_game['ctf_end_time'] - ctf_active_game['ctf_start_time']
+        ctf_active_game_collection.update_one({"ctf_game_id": ctf_game_id}, {"$set": {
+            "ctf_start_time": current_time.timestamp(),
+            "ctf_end_time": current_time.timestamp() + ctf_duration,
+            "ctf_target_private_ip": target_ip,
+            "ctf_attacker_private_ip": attacker_ip,
+            "ctf_game_updated_at": current_time,
+            "ctf_is_ready": True,
+        }})
+        schedule_ctf_game_expiry(ctf_game_id, current_time.timestamp() + ctf_duration)
+
+        notification = {
+            "type": "redirection",
+            "title": f"{ctf_name} CTF Started",
+            "description": f"{ctf_name} CTF started successfully.",
+            "timestamp": current_time,
+            "user_id": user_id,
+            "action_urls": [],
+            "redirection_url": "/activegame",
+        }
+    else:
+        user_resource = user_resource_collection.find_one({"user_id": user_id}, {"_id": 0})
+        # Nothing retries a failed boot, so leaks are recorded right away
+        release_ctf_game_resources(ctf_active_game, user_resource, record_leaks=True)
+        ctf_active_game_collection.delete_one({"ctf_game_id": ctf_game_id})
+
+        notification = {
+            "type": "information",
+            "title": f"{ctf_name} CTF Failed To Start",
+            "description": f"{ctf_name} CTF machines could not be created. Please try again.",
+            "timestamp": current_time,
+            "user_id": user_id,
+            "action_urls": [],
+            "redirection_url": "",
+        }
+
+    dispatch_notifications([user_id], notification)
     
     # async_to_sync(send_notification)(group_name=user_id, message=f"CTF {ctf_name} is ready. Navigate CTF Arena > Active Machine in order to play the game.")
 
 
-@shared_task
-def delete_ctf_game(ctf_active_game, user_resource, ctf_archive_game_id):
-    ctf_active_game_collection.update_one({"ctf_game_id": ctf_active_game['ctf_game_id']}, {"$set": {"ctf_is_ready":False}})
+def release_ctf_game_resources(ctf_active_game, user_resource, record_leaks=False):
+    """
+    Tears down the game's machines, and the user's network when this was their
+    last game, and returns the report. A failed teardown leaves the
+    user_resource row untouched so a retry tears down the same resources; with
+    record_leaks (the last attempt) the resources go to the leaked resource
+    sweep instead and the row is updated anyway, so no stale game id keeps the
+    user's network alive.
+    """
+    if ctf_active_game.get('ctf_warm_pool_resource'):
+        resources = warm_pool_teardown_resources(ctf_active_game['ctf_warm_pool_resource'])
+        user_resource = None
+    else:
+        resources = {"instance_ids": [ctf_active_game['ctf_target_machine_id'], ctf_active_game['ctf_attacker_machine_id']]}
 
-    target_cloud_instance = get_cloud_instance(ctf_active_game['ctf_target_machine_id'])
-    if target_cloud_instance:
-        deleted_target_cloud_instance = delete_cloud_instance(target_cloud_instance)
+    is_last_game = bool(user_resource) and user_resource['ctf_active_game_list'] == [ctf_active_game['ctf_game_id']]
+    if is_last_game:
+        resources["routers"] = [{"router_id": user_resource['router_id'], "subnet_ids": [user_resource['subnet_id']]}]
+        resources["networks"] = [{"network_id": user_resource['network_id'], "subnet_id": user_resource['subnet_id']}]
 
-    attacker_cloud_instance = get_cloud_instance(ctf_active_game['ctf_attacker_machine_id'])
-    if attacker_cloud_instance:
-        deleted_attacker_cloud_instance = delete_cloud_instance(attacker_cloud_instance)
+    report = teardown_resources(**resources)
+    if report["status"] != TEARDOWN_COMPLETED:
+        if not record_leaks:
+            return report
+        record_leaked_resources("ctf_game", ctf_active_game['ctf_game_id'], resources, report)
 
-    current_time = datetime.datetime.now()
-    
-    if len(user_resource['ctf_active_game_list']) == 1 and ctf_active_game['ctf_game_id'] in user_resource['ctf_active_game_list']:
+    if is_last_game:
         user_resource_collection.delete_one({"user_id": ctf_active_game['user_id']})
-        disconnect_router_from_private_network(user_resource['router_id'], user_resource['subnet_id'])
-        delete_cloud_router(user_resource['router_id'])
-        delete_cloud_network(user_resource['network_id'], user_resource['subnet_id'])
-    else:
-        ctf_active_game_list = user_resource['ctf_active_game_list']
-        ctf_active_game_list.remove(ctf_active_game['ctf_game_id'])
+    elif user_resource:
         user_resource_collection.update_one({"user_id": ctf_active_game['user_id']}, {
-            "$set": {
-                "ctf_active_game_list": ctf_active_game_list,
-                "user_resource_updated_at": current_time
-            }}
-        )
+            "$pull": {"ctf_active_game_list": ctf_active_game['ctf_game_id']},
+            "$set": {"user_resource_updated_at": datetime.datetime.now()},
+        })
+    return report
+
+
+@shared_task(bind=True, max_retries=CTF_TEARDOWN_MAX_RETRIES, default_retry_delay=60)
+def delete_ctf_game(self, ctf_active_game, user_resource, ctf_archive_game_id):
+    ctf_active_game_collection.update_one({"ctf_game_id": ctf_active_game['ctf_game_id']}, {"$set": {"ctf_is_ready":False}})
+
+    # Out of retries the game is archived anyway and its leftovers go to the leaked resource sweep
+    last_attempt = self.request.retries >= self.max_retries
+    report = release_ctf_game_resources(ctf_active_game, user_resource, record_leaks=last_attempt)
+    if report["status"] != TEARDOWN_COMPLETED and not last_attempt:
+        raise self.retry()
+
+    current_time = datetime.datetime.now()
 
     ctf_active_game_collection.delete_one({ "ctf_game_id": ctf_active_game['ctf_game_id']})
 
@@ -175,6 +251,7 @@ def delete_ctf_game(ctf_active_game, user_resource, ctf_archive_game_id):
         "ctf_archive_game_id": ctf_archive_game_id,
         "ctf_archive_created_at": current_time,
         "ctf_archive_updated_at": current_time,
+        "ctf_teardown_report": report,
     }
     ctf_archive_game.update(ctf_active_game)
     ctf_archive_game_collection.insert_one(ctf_archive_game)
@@ -191,8 +268,7 @@ def delete_ctf_game(ctf_active_game, user_resource, ctf_archive_game_id):
         "redirection_url": "",
     }
 
-    notification_collection.insert_one(notification)
-    async_to_sync(send_notification)(group_name=ctf_active_game['user_id'])
+    dispatch_notifications([ctf_active_game['user_id']], notification)
     
     # async_to_sync(send_notification)(group_name=ctf_active_game['user_id'], message=f"CTF {ctf_game.get('ctf_name')} is deleted successfully. View your profile to check out the score obtained.")
     
@@ -1,7 +1,7 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 
-from user_management.permissions import CustomIsAuthenticated, CustomIsAdmin
+from user_management.permissions import CustomIsAuthenticated, CustomIsAdmin, CustomIsSuperAdmin
 
 from .serializers import (
     CTFGameSerializer,
@@ -19,28 +19,25 @@ from .serializers import (
     CTFGameListSerializer,
     CTFTargetIPSerializer,
     CTFLMSListSerializer,
-    CTFGetScoreByGameIdSerializer
+    CTFGetScoreByGameIdSerializer,
+    CTFWarmPoolMetricsSerializer
 )
 from drf_yasg.utils import swagger_auto_schema
+from .catalog import get_ctf_catalog
 
 
 class CTFCategoryListView(generics.ListAPIView):
     serializer_class = CTFCategorySerializer
     
-    def get_queryset(self):
-        serializer = self.serializer_class()
-        queryset = serializer.get()
-        return queryset
-
     @swagger_auto_schema(
         responses={200: CTFCategorySerializer(many=True)}
     )
     def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
+        catalog = get_ctf_catalog()
 
-        if 'errors' in queryset:
-            return Response(queryset, status=status.HTTP_400_BAD_REQUEST)
-        return Response(queryset, status=status.HTTP_200_OK)    
+        if catalog["etag"] in request.headers.get("If-None-Match", ""):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": catalog["etag"]})
+        return Response(catalog["catalog"], status=status.HTTP_200_OK, headers={"ETag": catalog["etag"]})
         
 
 class CTFGameView(generics.CreateAPIView):
@@ -142,7 +139,10 @@ class CTFStartGameView(generics.CreateAPIView):
         if serializer.is_valid():
             game = serializer.save()
             response = serializer.data
-            response['message'] = "Please wait while we are creating dedicated machines for you."
+            if response.get('ctf_is_ready'):
+                response['message'] = "Your dedicated machines are ready."
+            else:
+                response['message'] = "Please wait while we are creating dedicated machines for you."
             return Response(response, status=status.HTTP_201_CREATED)
         return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -240,6 +240,8 @@ class CTFDeleteGameView(generics.DestroyAPIView):
             user_id = request.user.get('user_id')
 
             ctf_archive_game = serializer.delete_game(ctf_game_id, user_id)
+            if ctf_archive_game is None:
+                return Response({'errors': {'non_field_errors': ["Some operations are being performed. Please Wait!!"]}}, status=status.HTTP_400_BAD_REQUEST)
             
             response = ctf_archive_game
             response['message'] = 'CTF Game Deletion: Successful'
@@ -344,3 +346,21 @@ class CTFGetScoreByGameIdView(generics.CreateAPIView):
             response = serializer.data
             return Response(response, status=status.HTTP_201_CREATED)
         return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class CTFWarmPoolMetricsView(generics.ListAPIView):
+    permission_classes = [CustomIsSuperAdmin]
+    serializer_class = CTFWarmPoolMetricsSerializer
+
+    def get_queryset(self):
+        serializer = self.serializer_class()
+        queryset = serializer.get()
+        return queryset
+
+    @swagger_auto_schema(
+        operation_summary="CTF Warm Pool Hit/Miss Metrics",
+        responses={200: CTFWarmPoolMetricsSerializer(many=True)}
+    )
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        return Response(queryset, status=status.HTTP_200_OK)
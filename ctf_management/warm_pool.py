@@ -0,0 +1,257 @@
+import datetime
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from core.utils import generate_random_string
+from notification_management.utils import dispatch_notifications
+from database_management.pymongo_client import (
+    ctf_active_game_collection,
+    ctf_cloud_mapping_collection,
+    ctf_warm_pool_collection,
+    ctf_warm_pool_metrics_collection,
+)
+from cloud_management.utils import (
+    get_cloud_instance,
+    get_instance_private_ip,
+    create_cloud_network,
+    create_cloud_router,
+    submit_cloud_instance,
+    get_boot_group,
+    delete_boot_group,
+    connect_router_to_public_network,
+    connect_router_to_private_network,
+    CLOUD_BOOT_READY,
+)
+from cloud_management.teardown import teardown_resources, record_leaked_resources, TEARDOWN_COMPLETED
+
+logger = logging.getLogger(__name__)
+
+# Pre-booted, unassigned target/attacker pairs kept per popular CTF (0 disables the pool)
+CTF_WARM_POOL_SIZE = getattr(settings, "CTF_WARM_POOL_SIZE", 0)
+# How many of the most started CTFs get a warm pool
+CTF_WARM_POOL_TOP_GAMES = getattr(settings, "CTF_WARM_POOL_TOP_GAMES", 5)
+
+WARM_POOL_BOOTING = "BOOTING"
+WARM_POOL_AVAILABLE = "AVAILABLE"
+WARM_POOL_CLAIMED = "CLAIMED"
+
+
+def record_warm_pool_metric(ctf_mapping_id, metric):
+    ctf_warm_pool_metrics_collection.update_one(
+        {"ctf_mapping_id": ctf_mapping_id},
+        {
+            "$inc": {metric: 1},
+            "$set": {"updated_at": datetime.datetime.now()},
+        },
+        upsert=True
+    )
+
+
+def get_warm_pool_metrics():
+    metrics = list(ctf_warm_pool_metrics_collection.find({}, {"_id": 0}))
+    for metric in metrics:
+        hits, misses = metric.get("hits", 0), metric.get("misses", 0)
+        metric["hits"], metric["misses"] = hits, misses
+        metric["hit_rate"] = round(hits / (hits + misses), 2) if hits + misses else 0
+        metric["available"] = ctf_warm_pool_collection.count_documents(
+            {"ctf_mapping_id": metric["ctf_mapping_id"], "status": WARM_POOL_AVAILABLE}
+        )
+        metric["booting"] = ctf_warm_pool_collection.count_documents(
+            {"ctf_mapping_id": metric["ctf_mapping_id"], "status": WARM_POOL_BOOTING}
+        )
+    return sorted(metrics, key=lambda x: x["hits"] + x["misses"], reverse=True)
+
+
+def get_popular_ctf_mapping_ids():
+    metrics = ctf_warm_pool_metrics_collection.aggregate([
+        {"$project": {"_id": 0, "ctf_mapping_id": 1, "starts": {"$add": [{"$ifNull": ["$hits", 0]}, {"$ifNull": ["$misses", 0]}]}}},
+        {"$sort": {"starts": -1}},
+        {"$limit": CTF_WARM_POOL_TOP_GAMES},
+    ])
+    return [metric["ctf_mapping_id"] for metric in metrics]
+
+
+def boot_warm_pool_entry(ctf_mapping):
+    entry_id = generate_random_string('warm_pool_entry_id', length=25)
+
+    network, subnet = create_cloud_network("warmpool_" + entry_id)
+    router = create_cloud_router("warmpool_" + entry_id)
+    updated_router = connect_router_to_public_network(router)
+    connect_router_to_private_network(updated_router, subnet)
+
+    target_cloud_instance = submit_cloud_instance(
+        "warmpool_" + entry_id + "_target", ctf_mapping['ctf_target_image_id'], ctf_mapping['ctf_target_flavor_id'], network.id,
+        boot_group_id=entry_id, on_ready="ctf_management.warm_pool.activate_warm_pool_entry"
+    )
+    attacker_cloud_instance = submit_cloud_instance(
+        "warmpool_" + entry_id + "_attacker", ctf_mapping['ctf_attacker_image_id'], ctf_mapping['ctf_attacker_flavor_id'], network.id,
+        boot_group_id=entry_id, on_ready="ctf_management.warm_pool.activate_warm_pool_entry"
+    )
+
+    current_time = datetime.datetime.now()
+    ctf_warm_pool_collection.insert_one({
+        "warm_pool_entry_id": entry_id,
+        "ctf_mapping_id": ctf_mapping['ctf_mapping_id'],
+        "ctf_id": ctf_mapping['ctf_id'],
+        "status": WARM_POOL_BOOTING,
+        "network_id": network.id,
+        "subnet_id": subnet.id,
+        "router_id": router.id,
+        "ctf_target_machine_id": target_cloud_instance.id,
+        "ctf_target_private_ip": "",
+        "ctf_attacker_machine_id": attacker_cloud_instance.id,
+        "ctf_attacker_private_ip": "",
+        "created_at": current_time,
+        "updated_at": current_time,
+    })
+    return entry_id
+
+
+def warm_pool_teardown_resources(resource):
+    return {
+        "instance_ids": [resource['ctf_target_machine_id'], resource['ctf_attacker_machine_id']],
+        "routers": [{"router_id": resource['router_id'], "subnet_ids": [resource['subnet_id']]}],
+        "networks": [{"network_id": resource['network_id'], "subnet_id": resource['subnet_id']}],
+    }
+
+
+@shared_task
+def activate_warm_pool_entry(entry_id):
+    entry = ctf_warm_pool_collection.find_one({"warm_pool_entry_id": entry_id}, {"_id": 0})
+    boots = {boot["instance_id"]: boot for boot in get_boot_group(entry_id)}
+    delete_boot_group(entry_id)
+
+    if not entry:
+        return
+
+    target_boot = boots.get(entry['ctf_target_machine_id'], {})
+    attacker_boot = boots.get(entry['ctf_attacker_machine_id'], {})
+
+    if target_boot.get("status") == CLOUD_BOOT_READY and attacker_boot.get("status") == CLOUD_BOOT_READY:
+        ctf_warm_pool_collection.update_one({"warm_pool_entry_id": entry_id}, {"$set": {
+            "status": WARM_POOL_AVAILABLE,
+            "ctf_target_private_ip": target_boot.get("ip") or get_instance_private_ip(get_cloud_instance(entry['ctf_target_machine_id'])),
+            "ctf_attacker_private_ip": attacker_boot.get("ip") or get_instance_private_ip(get_cloud_instance(entry['ctf_attacker_machine_id'])),
+            "updated_at": datetime.datetime.now(),
+        }})
+    else:
+        logger.error(f"Warm pool entry {entry_id} failed to boot, releasing its resources.")
+        resources = warm_pool_teardown_resources(entry)
+        report = teardown_resources(**resources)
+        if report["status"] != TEARDOWN_COMPLETED:
+            record_leaked_resources("ctf_warm_pool_entry", entry_id, resources, report)
+        ctf_warm_pool_collection.delete_one({"warm_pool_entry_id": entry_id})
+
+
+@shared_task
+def replenish_ctf_warm_pool(ctf_mapping_id):
+    if not CTF_WARM_POOL_SIZE:
+        return 0
+
+    ctf_mapping = ctf_cloud_mapping_collection.find_one({"ctf_mapping_id": ctf_mapping_id}, {"_id": 0})
+    if not ctf_mapping:
+        return 0
+
+    pool_count = ctf_warm_pool_collection.count_documents({
+        "ctf_mapping_id": ctf_mapping_id,
+        "status": {"$in": [WARM_POOL_BOOTING, WARM_POOL_AVAILABLE]}
+    })
+
+    booted = 0
+    for _ in range(CTF_WARM_POOL_SIZE - pool_count):
+        try:
+            boot_warm_pool_entry(ctf_mapping)
+            booted += 1
+        except Exception as e:
+            logger.error(f"Warm pool boot failed for {ctf_mapping_id}: {str(e)}")
+            break
+    return booted
+
+
+@shared_task
+def maintain_ctf_warm_pool():
+    if not CTF_WARM_POOL_SIZE:
+        return {"message": "CTF warm pool is disabled.", "booted": {}}
+
+    booted = {}
+    for ctf_mapping_id in get_popular_ctf_mapping_ids():
+        booted[ctf_mapping_id] = replenish_ctf_warm_pool(ctf_mapping_id)
+
+    return {"message": "CTF warm pool replenished.", "booted": booted}
+
+
+def claim_warm_pool_game(user_id, ctf_mapping, ctf_name):
+    """
+    Hands a pre-booted target/attacker pair to the player and returns the new
+    active game, or None on a pool miss so the caller can boot on demand.
+    """
+    if not CTF_WARM_POOL_SIZE:
+        # A disabled pool is not a miss
+        return None
+
+    ctf_mapping_id = ctf_mapping['ctf_mapping_id']
+    current_time = datetime.datetime.now()
+
+    entry = ctf_warm_pool_collection.find_one_and_update(
+        {"ctf_mapping_id": ctf_mapping_id, "status": WARM_POOL_AVAILABLE},
+        {"$set": {"status": WARM_POOL_CLAIMED, "claimed_by": user_id, "updated_at": current_time}},
+        projection={"_id": 0},
+        sort=[("created_at", 1)]
+    )
+
+    if not entry:
+        record_warm_pool_metric(ctf_mapping_id, "misses")
+        return None
+
+    record_warm_pool_metric(ctf_mapping_id, "hits")
+
+    ctf_game_id = generate_random_string('ctf_game_id', length=25)
+    end_time = current_time + datetime.timedelta(hours=ctf_mapping['ctf_time'])
+
+    ctf_active_game = {
+        "ctf_game_id": ctf_game_id,
+        "user_id": user_id,
+        "ctf_mapping_id": ctf_mapping_id,
+        "ctf_id": ctf_mapping['ctf_id'],
+        "ctf_start_time": current_time.timestamp(),
+        "ctf_end_time": end_time.timestamp(),
+        "ctf_time_extended": False,
+        "ctf_flags_captured": [],
+        "ctf_target_machine_id": entry['ctf_target_machine_id'],
+        "ctf_target_private_ip": entry['ctf_target_private_ip'],
+        "ctf_attacker_machine_id": entry['ctf_attacker_machine_id'],
+        "ctf_attacker_private_ip": entry['ctf_attacker_private_ip'],
+        # Pool games own their network instead of sharing the player's user_resource
+        "user_resource_id": "",
+        "ctf_warm_pool_resource": {
+            "warm_pool_entry_id": entry['warm_pool_entry_id'],
+            "network_id": entry['network_id'],
+            "subnet_id": entry['subnet_id'],
+            "router_id": entry['router_id'],
+            "ctf_target_machine_id": entry['ctf_target_machine_id'],
+            "ctf_attacker_machine_id": entry['ctf_attacker_machine_id'],
+        },
+        "ctf_game_created_at": current_time,
+        "ctf_game_updated_at": current_time,
+        "ctf_is_ready": True
+    }
+    ctf_active_game_collection.insert_one(ctf_active_game)
+    ctf_warm_pool_collection.delete_one({"warm_pool_entry_id": entry['warm_pool_entry_id']})
+
+    replenish_ctf_warm_pool.delay(ctf_mapping_id)
+
+    notification = {
+        "type": "redirection",
+        "title": f"{ctf_name} CTF Started",
+        "description": f"{ctf_name} CTF started successfully.",
+        "timestamp": current_time,
+        "user_id": user_id,
+        "action_urls": [],
+        "redirection_url": "/activegame",
+    }
+    dispatch_notifications([user_id], notification)
+
+    ctf_active_game.pop('_id', None)
+    return ctf_active_game
@@ -4,6 +4,7 @@ import os
 from celery import Celery
 from django.conf import settings
 from celery.schedules import crontab
+from datetime import timedelta
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cyber_range_platform.settings')
 
@@ -32,9 +33,32 @@ app.conf.beat_schedule = {
         'task' : 'core.utils.update_blacklisted_domains',
         'schedule' : crontab(day_of_week="*", hour=1, minute= 0),    
         },
-    'games-auto-delete-scheduler-in-every-30-min':{
-        'task' : 'core.utils.game_auto_delete_in_30_min',
-        'schedule' : crontab(day_of_week="*", hour="*", minute= "*/30"), 
+    # Games are expired by ETA tasks scheduled at start; this sweep only catches lost ones
+    'games-expiry-sweep-in-every-5-min':{
+        'task' : 'ctf_management.tasks.expire_ctf_games',
+        'schedule' : crontab(day_of_week="*", hour="*", minute= "*/5"), 
+    },
+    'pending-instance-boots-poller':{
+        'task' : 'cloud_management.tasks.poll_pending_cloud_instances',
+        'schedule' : timedelta(seconds=getattr(settings, "CLOUD_BOOT_POLL_SECONDS", 15)),
+    },
+    'leaked-cloud-resources-sweep-every-hour':{
+        'task' : 'cloud_management.tasks.release_leaked_cloud_resources',
+        'schedule' : crontab(day_of_week="*", hour="*", minute= 30),
+    },
+    # Winning walls are updated incrementally; the nightly rebuild only fixes drift
+    'winning-wall-rebuild-everyday-at-2-am':{
+        'task' : 'user_management.winning_wall.rebuild_winning_wall',
+        'schedule' : crontab(day_of_week="*", hour=2, minute= 0),
+    },
+    'ctf-warm-pool-scheduler-in-every-5-min':{
+        'task' : 'ctf_management.warm_pool.maintain_ctf_warm_pool',
+        'schedule' : crontab(day_of_week="*", hour="*", minute= "*/5"),
+    },
+    # Corporate ends that failed or were interrupted are resumed from their end_progress
+    'corporate-game-end-resume-in-every-15-min':{
+        'task' : 'corporate_management.tasks.resume_pending_corporate_game_ends',
+        'schedule' : crontab(day_of_week="*", hour="*", minute= "*/15"),
     },
     # 'scenario-games-auto-delete-scheduler-in-every-30-min':{
     #     'task' : 'core.utils.scenario_game_auto_delete_in_30_min',
@@ -2,8 +2,9 @@ import datetime
 from collections import defaultdict
 from typing import Optional
 
-from cloud_management.utils import get_cloud_instance, get_instance_console, get_instance_private_ip, get_flavor_detail
-from corporate_management.utils import start_corporate_game, end_corporate_game
+from cloud_management.utils import get_cloud_instance, get_instance_console_url, get_instance_private_ip, get_flavor_detail
+from corporate_management.utils import start_corporate_game, end_active_corporate_scenario
+from corporate_management.services.scenario_summary import get_scenario_points, get_scenario_type_label
 from database_management.pymongo_client import (
     corporate_scenario_collection,
     scenario_category_collection,
@@ -19,7 +20,7 @@ class CorporateScenarioService:
 
     @staticmethod
     def _get_scenario_type(scenario: dict):
-        return "Milestone" if scenario.get("milestone_data") else "Flag"
+        return get_scenario_type_label(scenario)
 
     @staticmethod
     def _get_scenario_category_name(scenario: dict):
@@ -28,17 +29,8 @@ class CorporateScenarioService:
 
     @classmethod
     def _calculate_points(cls, scenario: dict) -> int:
-        total_score = 0
-        data_source = scenario.get("milestone_data") or scenario.get("flag_data", {})
-
-        collection = milestone_data_collection if scenario.get("milestone_data") else flag_data_collection
-
-        for team in cls.TEAM_KEYS:
-            for item_id in data_source.get(team, []):
-                score_doc = collection.find_one({"id": item_id}, {"_id": 0, "score": 1})
-                total_score += score_doc.get("score", 0) if score_doc else 0
-
-        return total_score
+        # Maintained on the scenario by the flag/milestone serializers
+        return get_scenario_points(scenario)
 
     @classmethod
     def get_all_scenarios(cls, is_approved: Optional[bool] = None, is_prepared: Optional[bool] = None, category_id: Optional[str] = None, user_id: Optional[str] = None):
@@ -259,26 +251,8 @@ class CorporateScenarioService:
             if not is_superadmin:
                 return {"errors": "You are not authorised to delete this scenario."}
 
-        # Mark end time
-        active_scenario["end_time"] = datetime.datetime.now()
-
-        # Archive the scenario
-        archive_scenario_collection.insert_one(active_scenario)
-
-        # Delete from active (pop _id if present to avoid conflicts)
-        active_scenario.pop("_id", None)
-        active_scenario_collection.delete_one({"id": active_scenario["id"]})
-
-        # Trigger any post‑end processing asynchronously
-        end_corporate_game.delay(active_scenario)
-
-        # Archive participants and delete from active participants
-        participant_ids = active_scenario.get("participant_data", {}).values()
-        for pid in participant_ids:
-            participant_data = participant_data_collection.find_one({"id": pid})
-            if participant_data:
-                archive_participant_collection.insert_one(participant_data)
-                participant_data_collection.delete_one({"id": pid})
+        # Archive scenario + participants in one transaction, then tear down asynchronously
+        end_active_corporate_scenario(active_scenario)
 
         return {"message": "Scenario Deleted Successfully"}
 
@@ -523,12 +497,9 @@ class CorporateScenarioService:
             return {"errors": {"non_field_errors": ["Scenario not found."]}}
 
         # Step 4: Get console URL for the current participant
-        try:
-            instance = get_cloud_instance(participant_data['instance_id'])
-            console = get_instance_console(instance)
-            console_url = console.url
-        except Exception as e:
-            return {"errors": {"non_field_errors": str(e)}}
+        console_url = get_instance_console_url(participant_data.get('instance_id'))
+        if not console_url:
+            return {"errors": {"non_field_errors": ["Console is not available for this instance."]}}
 
         # Step 5: Fetch all participants' user data
         participants = []
@@ -0,0 +1,269 @@
+import logging
+
+from pymongo.errors import OperationFailure
+
+from .pymongo_client import dbname
+
+logger = logging.getLogger(__name__)
+
+
+def index(keys, **options):
+    """Declares one index; keys is a field name or a list of (field, direction) pairs."""
+    if isinstance(keys, str):
+        keys = [(keys, 1)]
+    return {"keys": list(keys), "options": options}
+
+
+def unique_id(field):
+    """Unique index for a generated ID field; older documents without the field are ignored."""
+    return index(field, unique=True, partialFilterExpression={field: {"$exists": True}})
+
+
+# collection name -> indexes the application's queries rely on.
+# Every index created in code must be declared here, otherwise
+# `manage.py sync_indexes` reports it as undeclared.
+INDEX_REGISTRY = {
+    # For User Management App
+    "user_collection": [
+        index("user_id", unique=True),
+        index("email", unique=True),
+        index("mobile_number"),
+    ],
+    "user_profile_collection": [
+        index("user_id", unique=True),
+        index([("total_score", -1), ("user_id", 1)]),
+    ],
+    "blacklisted_token_collection": [
+        index("jti", unique=True, partialFilterExpression={"jti": {"$exists": True}}),
+        index("expires_at", expireAfterSeconds=0),
+    ],
+    "otp_hash_collection": [
+        index("created_at", expireAfterSeconds=180),
+        index("user_id"),
+        index("otp_hash"),
+    ],
+    "otp_hash_dump_collection": [
+        index("otp_hash"),
+    ],
+    "user_resource_collection": [
+        index("user_id"),
+        unique_id("user_resource_id"),
+    ],
+    "winning_wall_collection": [
+        index([("game_type", 1), ("user_id", 1)], unique=True),
+        index([("game_type", 1), ("score_obtained", -1), ("user_id", 1)]),
+    ],
+
+    # For CTF Management App
+    "ctf_category_collection": [
+        index("ctf_category_id", unique=True),
+    ],
+    "ctf_game_collection": [
+        index("ctf_id", unique=True),
+        index("ctf_category_id"),
+        index("ctf_is_approved"),
+    ],
+    "ctf_cloud_mapping_collection": [
+        index("ctf_mapping_id", unique=True),
+        index("ctf_id"),
+    ],
+    "ctf_active_game_collection": [
+        index("ctf_game_id", unique=True),
+        index("user_id"),
+        index("ctf_end_time"),
+    ],
+    "ctf_player_arsenal_collection": [
+        index([("user_id", 1), ("ctf_id", 1)]),
+        unique_id("arsenal_id"),
+    ],
+    "ctf_archive_game_collection": [
+        unique_id("ctf_archive_game_id"),
+    ],
+    "ctf_warm_pool_collection": [
+        index("warm_pool_entry_id", unique=True),
+        index([("ctf_mapping_id", 1), ("status", 1)]),
+    ],
+    "ctf_warm_pool_metrics_collection": [
+        index("ctf_mapping_id", unique=True),
+    ],
+
+    # For Cloud Management App
+    "cloud_instance_boot_collection": [
+        index("instance_id"),
+        index("status"),
+        index("boot_group_id"),
+    ],
+    "cloud_leaked_resource_collection": [
+        unique_id("leaked_resource_id"),
+        index("status"),
+    ],
+
+    # For Scenario Management App
+    "scenario_category_collection": [
+        index("scenario_category_id", unique=True),
+    ],
+    "scenario_collection": [
+        index("scenario_id", unique=True),
+        index("scenario_category_id"),
+        index("scenario_is_approved"),
+    ],
+    "scenario_active_game_collection": [
+        unique_id("scenario_game_id"),
+        index("user_id"),
+    ],
+    "scenario_archive_game_collection": [
+        unique_id("scenario_archive_game_id"),
+    ],
+    "scenario_player_arsenal_collection": [
+        index("scenario_id"),
+        index("scenario_participant_id"),
+        unique_id("scenario_arsenal_id"),
+    ],
+    "scenario_invitation_collection": [
+        index("scenario_invitation_id", unique=True),
+    ],
+
+    # For webbased
+    "web_based_category_collection": [
+        index("category_id", unique=True),
+    ],
+    "web_based_game_collection": [
+        index("game_id", unique=True),
+        index("category_id"),
+    ],
+    "web_based_game_started_collection": [
+        index("game_id"),
+    ],
+
+    # For notification
+    "notification_collection": [
+        index("user_id"),
+        index("group_name"),
+    ],
+
+    # For Buffer
+    "game_start_buffer_collection": [
+        index("created_at", expireAfterSeconds=900),
+        index("user_id"),
+        unique_id("buffer_id"),
+    ],
+
+    # For Challenge Management App
+    "challenge_game_collection": [
+        unique_id("challenge_id"),
+    ],
+
+    "resource_credentials_collection": [
+        index("image_id"),
+    ],
+
+    # Corporate
+    "corporate_scenario": [
+        index("id", unique=True),
+        index("is_approved"),
+    ],
+    "corporate_scenario_infra": [
+        index("id", unique=True),
+    ],
+    "corporate_flag_data": [
+        index("id", unique=True),
+        index("scenario_id"),
+    ],
+    "corporate_milestone_data": [
+        index("id", unique=True),
+        index("scenario_id"),
+    ],
+    "corporate_participant_data": [
+        index("id", unique=True),
+        index("user_id"),
+    ],
+    "corporate_active_scenario": [
+        index("id", unique=True),
+        index("started_by"),
+    ],
+    "corporate_archive_scenario": [
+        unique_id("id"),
+        # resume_pending_corporate_game_ends
+        index("end_time"),
+    ],
+    "corporate_archive_participant_data": [
+        unique_id("id"),
+        index([("scenario_id", 1), ("user_id", 1)]),
+    ],
+
+    # Scenario Team Chat
+    "scenario_chat_messages": [
+        index("channel_key"),
+        index([("channel_key", 1), ("created_at", 1)]),
+    ],
+}
+
+
+def _key_signature(keys):
+    return tuple((field, direction) for field, direction in keys)
+
+
+def get_index_usage(collection):
+    """Returns {index name: {"key": ..., "ops": ..., "since": ...}} from $indexStats."""
+    usage = {}
+    for stat in collection.aggregate([{"$indexStats": {}}]):
+        usage[stat["name"]] = {
+            "key": _key_signature(stat["key"].items()),
+            "ops": stat.get("accesses", {}).get("ops", 0),
+            "since": stat.get("accesses", {}).get("since"),
+        }
+    return usage
+
+
+def sync_indexes(create=True, drop_undeclared=False):
+    """
+    Creates every declared index that is missing and reports, per collection,
+    which indexes were created, failed, are undeclared or have never been used
+    since the server started. Unique indexes fail (and are reported) while the
+    collection still holds duplicate values.
+    """
+    report = {}
+    for collection_name, declared in INDEX_REGISTRY.items():
+        collection = dbname.get_collection(collection_name)
+        existing = {
+            _key_signature(info["key"]): name
+            for name, info in collection.index_information().items()
+        }
+
+        result = {"created": [], "missing": [], "failed": [], "undeclared": [], "dropped": [], "unused": []}
+        declared_signatures = set()
+
+        for spec in declared:
+            signature = _key_signature(spec["keys"])
+            declared_signatures.add(signature)
+            if signature in existing:
+                continue
+            if not create:
+                result["missing"].append(signature)
+                continue
+            try:
+                result["created"].append(collection.create_index(spec["keys"], **spec["options"]))
+            except OperationFailure as e:
+                logger.error(f"Index {signature} on {collection_name} could not be created: {str(e)}")
+                result["failed"].append({"keys": signature, "error": str(e)})
+
+        for signature, name in existing.items():
+            if name == "_id_" or signature in declared_signatures:
+                continue
+            if drop_undeclared:
+                collection.drop_index(name)
+                result["dropped"].append(name)
+            else:
+                result["undeclared"].append(name)
+
+        try:
+            usage = get_index_usage(collection)
+        except OperationFailure:
+            usage = {}
+        result["unused"] = [
+            name for name, stat in usage.items()
+            if name != "_id_" and name not in result["dropped"] and not stat["ops"]
+        ]
+
+        report[collection_name] = result
+    return report
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from database_management.indexes import sync_indexes
+
+
+class Command(BaseCommand):
+    help = "Creates the MongoDB indexes declared in database_management.indexes and reports missing or unused ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--report-only", action="store_true", help="Only report, do not create missing indexes.")
+        parser.add_argument("--drop-undeclared", action="store_true", help="Drop indexes that are not declared in the registry.")
+
+    def handle(self, *args, **options):
+        if options["report_only"] and options["drop_undeclared"]:
+            raise CommandError("--report-only does not change any index, it cannot be combined with --drop-undeclared.")
+
+        report = sync_indexes(create=not options["report_only"], drop_undeclared=options["drop_undeclared"])
+
+        for collection_name, result in report.items():
+            for name in result["created"]:
+                self.stdout.write(self.style.SUCCESS(f"{collection_name}: created {name}"))
+            for keys in result["missing"]:
+                self.stdout.write(self.style.WARNING(f"{collection_name}: missing {keys}"))
+            for failure in result["failed"]:
+                self.stdout.write(self.style.ERROR(f"{collection_name}: failed {failure['keys']} ({failure['error']})"))
+            for name in result["dropped"]:
+                self.stdout.write(self.style.WARNING(f"{collection_name}: dropped undeclared {name}"))
+            for name in result["undeclared"]:
+                self.stdout.write(self.style.WARNING(f"{collection_name}: undeclared {name}"))
+            for name in result["unused"]:
+                self.stdout.write(f"{collection_name}: unused since server start {name}")
+
+        failed = sum(len(result["failed"]) for result in report.values())
+        self.stdout.write(self.style.SUCCESS(f"Checked {len(report)} collections, {failed} indexes failed."))
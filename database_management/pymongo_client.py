@@ -6,13 +6,16 @@ client = pymongo.MongoClient(settings.MONGO_DB_URI)
 # Define Db Name
 dbname = client['cyber_range']
 
-# For All Apps
+# Legacy ID registry, no longer written; see `manage.py migrate_id_registry`
 id_collection = dbname.get_collection("id_collection")
 
 # For User Management App
 user_collection = dbname.get_collection("user_collection")
 user_profile_collection = dbname.get_collection("user_profile_collection")
+user_profile_collection.create_index([("total_score", -1), ("user_id", 1)])
 blacklisted_token_collection = dbname.get_collection("blacklisted_token_collection")
+blacklisted_token_collection.create_index("jti", unique=True, partialFilterExpression={"jti": {"$exists": True}})
+blacklisted_token_collection.create_index("expires_at", expireAfterSeconds=0)
 
 otp_hash_dump_collection = dbname.get_collection("otp_hash_dump_collection")
 otp_hash_collection = dbname.get_collection("otp_hash_collection")
@@ -20,13 +23,30 @@ otp_hash_collection.create_index("created_at", expireAfterSeconds=180)
 
 user_resource_collection = dbname.get_collection("user_resource_collection")
 
+# Materialized per-user score rollups, one document per (game_type, user_id)
+winning_wall_collection = dbname.get_collection("winning_wall_collection")
+winning_wall_collection.create_index([("game_type", 1), ("user_id", 1)], unique=True)
+winning_wall_collection.create_index([("game_type", 1), ("score_obtained", -1), ("user_id", 1)])
+
 # For CTF Management App
 ctf_category_collection = dbname.get_collection("ctf_category_collection")
 ctf_game_collection = dbname.get_collection("ctf_game_collection")
 ctf_cloud_mapping_collection = dbname.get_collection("ctf_cloud_mapping_collection")
 ctf_active_game_collection = dbname.get_collection("ctf_active_game_collection")
+ctf_active_game_collection.create_index("ctf_end_time")
 ctf_archive_game_collection = dbname.get_collection("ctf_archive_game_collection")
 ctf_player_arsenal_collection = dbname.get_collection("ctf_player_arsenal_collection")
+ctf_warm_pool_collection = dbname.get_collection("ctf_warm_pool_collection")
+ctf_warm_pool_collection.create_index([("ctf_mapping_id", 1), ("status", 1)])
+ctf_warm_pool_metrics_collection = dbname.get_collection("ctf_warm_pool_metrics_collection")
+
+# For Cloud Management App
+cloud_instance_boot_collection = dbname.get_collection("cloud_instance_boot_collection")
+cloud_instance_boot_collection.create_index("status")
+cloud_instance_boot_collection.create_index("boot_group_id")
+# Resources whose teardown kept failing, retried by the leaked resource sweep
+cloud_leaked_resource_collection = dbname.get_collection("cloud_leaked_resource_collection")
+cloud_leaked_resource_collection.create_index("status")
 
 # For Scenario Management App
 scenario_category_collection = dbname.get_collection("scenario_category_collection")
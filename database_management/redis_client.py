@@ -0,0 +1,10 @@
+import redis
+from django.conf import settings
+
+# Short timeouts so an unreachable Redis makes the caches fall back to Mongo
+# instead of blocking every request on the TCP connect
+redis_client = redis.Redis.from_url(
+    getattr(settings, "REDIS_URL", "redis://127.0.0.1:6379/0"),
+    socket_timeout=getattr(settings, "REDIS_SOCKET_TIMEOUT", 0.5),
+    socket_connect_timeout=getattr(settings, "REDIS_SOCKET_CONNECT_TIMEOUT", 0.5),
+)
@@ -1,21 +1,83 @@
+import json
 import pymongo
+from urllib.parse import parse_qs
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from rest_framework.exceptions import AuthenticationFailed
 
 from database_management.pymongo_client import notification_group_collection, notification_collection
 from user_management.utils import get_user_from_access_token
 from database_management.pymongo_client import user_collection
+from .utils import get_missed_events, is_group_member
 
-class NotificationConsumer(AsyncJsonWebsocketConsumer):
 
-    async def connect(self):
+class GroupEventReplayMixin:
+    """
+    Joins the group of the URL once the ?token= access token proves the caller
+    may read it, and replays the group events the client missed while
+    disconnected, either on connect (?last_seq=N) or on request
+    ({"action": "replay", "last_seq": N}).
+    """
+
+    async def join_authorized_group(self):
         self.group_name = self.scope['url_route']['kwargs']['group_name']
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+
+        try:
+            self.user = await database_sync_to_async(get_user_from_access_token)(query.get('token', [None])[0])
+        except AuthenticationFailed:
+            await self.close()
+            return False
+
+        if not await database_sync_to_async(is_group_member)(self.user, self.group_name):
+            await self.close()
+            return False
+
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
+        await self.replay_from_query_string()
+        return True
 
-    async def receive(self, text_data):
+    async def replay_missed_events(self, last_seq):
+        missed = await database_sync_to_async(get_missed_events)(self.group_name, last_seq)
+        if missed["resync"]:
+            await self.send_json({'notifications': "reload", 'seq': missed["seq"], 'resync': True})
+            return
+        for event in missed["events"]:
+            await self.send_json({'notifications': event['notification'], 'seq': event['seq']})
+
+    async def replay_from_query_string(self):
+        last_seq = parse_qs(self.scope.get('query_string', b'').decode()).get('last_seq')
+        if last_seq and last_seq[0].isdigit():
+            await self.replay_missed_events(int(last_seq[0]))
+
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            content = json.loads(text_data)
+        except (TypeError, ValueError):
+            content = None
+
+        if isinstance(content, dict) and content.get('action') == 'replay':
+            try:
+                await self.replay_missed_events(int(content.get('last_seq', 0)))
+            except (TypeError, ValueError):
+                await self.send_json({'error': "last_seq must be an integer"})
+            return
         await self.send_json(text_data)
 
+    async def notification_message(self, event):
+        await self.send_json({
+            'notifications': event['notification'],
+            'seq': event.get('seq'),
+        })
+
+
+class NotificationConsumer(GroupEventReplayMixin, AsyncJsonWebsocketConsumer):
+
+    async def connect(self):
+        await self.join_authorized_group()
+
     # async def receive_json(self, content, **kwargs):
     #     print("\n\n Data Received from Client: \n", content, "\n\n")
     #     await self.send_json(content)
@@ -57,11 +119,6 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
     #     })
     #     print("\n\n 22 \n\n")
 
-    async def notification_message(self, event):
-        await self.send_json({
-            'notifications': event['notification']
-        })        
-        
     async def disconnect(self, close_code):         
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
         
\ No newline at end of file
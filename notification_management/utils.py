@@ -1,14 +1,173 @@
+import asyncio
+import copy
 import datetime
+import json
+
+import redis
+from asgiref.sync import async_to_sync, sync_to_async
 from channels.layers import get_channel_layer
+from django.conf import settings
 
-from database_management.pymongo_client import notification_collection
+from database_management.pymongo_client import notification_collection, active_scenario_collection
+from database_management.redis_client import redis_client
 from core.utils import generate_random_string
 
+# Events kept per group for clients reconnecting with ?last_seq=
+NOTIFICATION_REPLAY_SIZE = getattr(settings, "NOTIFICATION_REPLAY_SIZE", 100)
+NOTIFICATION_REPLAY_TTL = getattr(settings, "NOTIFICATION_REPLAY_TTL", 24 * 60 * 60)
+
+
+def _seq_key(group_name):
+    return f"notification_seq:{group_name}"
+
+
+def _events_key(group_name):
+    return f"notification_events:{group_name}"
+
+
+def is_group_member(user, group_name):
+    """A user may read their own group and the group of a corporate scenario they play or run."""
+    if group_name == user["user_id"]:
+        return True
+
+    active_scenario = active_scenario_collection.find_one(
+        {"id": group_name},
+        {"_id": 0, "started_by": 1, "participant_data": 1}
+    )
+    if not active_scenario:
+        return False
+    return (
+        user.get("is_superadmin", False)
+        or active_scenario.get("started_by") == user["user_id"]
+        or user["user_id"] in active_scenario.get("participant_data", {})
+    )
+
+
+def _json_safe(payload):
+    # Channel layers only carry plain types; notification documents hold datetimes
+    # and the ObjectId insert_one adds to them
+    if isinstance(payload, dict):
+        payload = {key: value for key, value in payload.items() if key != "_id"}
+    return json.loads(json.dumps(payload, default=str))
+
+
+def record_group_events(group_payloads):
+    """
+    Assigns the next per-group sequence numbers and keeps the events for replay,
+    in two Redis round trips whatever the batch size.
+
+    group_payloads: [(group_name, payload), ...]; returns [(group_name, event), ...]
+    """
+    group_events = [(group_name, {"seq": None, "notification": _json_safe(payload)}) for group_name, payload in group_payloads]
+    if not group_events:
+        return group_events
+
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        for group_name, _ in group_events:
+            pipeline.incr(_seq_key(group_name))
+        for (_, event), seq in zip(group_events, pipeline.execute()):
+            event["seq"] = seq
+
+        pipeline = redis_client.pipeline(transaction=False)
+        for group_name, event in group_events:
+            pipeline.rpush(_events_key(group_name), json.dumps(event))
+            pipeline.ltrim(_events_key(group_name), -NOTIFICATION_REPLAY_SIZE, -1)
+            pipeline.expire(_events_key(group_name), NOTIFICATION_REPLAY_TTL)
+            pipeline.expire(_seq_key(group_name), NOTIFICATION_REPLAY_TTL)
+        pipeline.execute()
+    except redis.RedisError:
+        # Still delivered live, just not replayable
+        pass
+    return group_events
+
+
+def record_group_event(group_name, payload):
+    """Assigns the next per-group sequence number and keeps the event for replay."""
+    return record_group_events([(group_name, payload)])[0][1]
 
-async def send_notification(group_name=""):
+
+def get_missed_events(group_name, last_seq):
+    """
+    Returns {"events": [...], "seq": current, "resync": bool} for events after last_seq.
+    resync is True when some of them already fell out of the replay window, in which
+    case the client has to reload over REST once.
+    """
+    try:
+        current_seq = int(redis_client.get(_seq_key(group_name)) or 0)
+        raw_events = redis_client.lrange(_events_key(group_name), 0, -1)
+    except redis.RedisError:
+        return {"events": [], "seq": None, "resync": True}
+
+    if last_seq >= current_seq:
+        # Nothing new, or the counter expired/reset since the client last saw it
+        return {"events": [], "seq": current_seq, "resync": last_seq > current_seq}
+
+    events = [event for event in map(json.loads, raw_events) if event["seq"] > last_seq]
+    return {
+        "events": events,
+        "seq": current_seq,
+        "resync": not events or events[0]["seq"] != last_seq + 1,
+    }
+
+
+async def publish_group_event(group_name, payload):
     channel_layer = get_channel_layer()
+    # Redis sequencing blocks, keep it off the event loop
+    event = await sync_to_async(record_group_event)(group_name, payload)
 
     await channel_layer.group_send(group_name, {
         'type': 'notification.message',
-        'notification': "New Notification Added"
+        'notification': event['notification'],
+        'seq': event['seq'],
     })
+
+
+async def publish_group_events(group_payloads):
+    """Publishes a batch of events concurrently on one event loop."""
+    channel_layer = get_channel_layer()
+    group_events = await sync_to_async(record_group_events)(group_payloads)
+    await asyncio.gather(*[
+        channel_layer.group_send(group_name, {
+            'type': 'notification.message',
+            'notification': event['notification'],
+            'seq': event['seq'],
+        })
+        for group_name, event in group_events
+    ])
+
+
+def dispatch_notifications(recipients, template, overrides=None):
+    """
+    Stores one notification per recipient with a single insert_many and pushes
+    them to each recipient's group in one batch. Safe to call from Celery tasks
+    and sync views; it runs one event loop for the whole batch.
+
+    template: notification fields shared by every recipient ("timestamp" defaults to now)
+    overrides: optional {user_id: {field: value}} for per-recipient fields
+    Returns the stored notifications.
+    """
+    overrides = overrides or {}
+    timestamp = template.get("timestamp") or datetime.datetime.now()
+
+    notifications = []
+    for user_id in dict.fromkeys(recipients):
+        notification = copy.deepcopy(template)
+        notification.update(overrides.get(user_id, {}))
+        notification["timestamp"] = notification.get("timestamp") or timestamp
+        notification["user_id"] = user_id
+        notifications.append(notification)
+
+    if not notifications:
+        return notifications
+
+    notification_collection.insert_many(notifications)
+    async_to_sync(publish_group_events)([
+        (notification["user_id"], notification) for notification in notifications
+    ])
+    return notifications
+
+
+async def send_notification(group_name="", notification=None):
+    """Pushes the notification document itself so clients don't have to refetch the list."""
+    await publish_group_event(group_name, notification if notification is not None else "New Notification Added")
@@ -44,6 +44,8 @@ from cloud_management.utils import (
 )
 
 from .utils import send_invitation_by_email
+from user_management.utils import set_user_profile_score
+from user_management.winning_wall import refresh_winning_wall
 
 
 class ScenarioCategorySerializer(serializers.Serializer):
@@ -1205,10 +1207,9 @@ class ScenarioGameDeleteSerializer(serializers.Serializer):
                 user_scenario_score += game['scenario_score_obtained'] 
 
             # For updating total score
-            user_profile_update = user_profile_collection.update_one({'user_id': participant['scenario_participant_id']}, {'$set': {
-                'user_scenario_score': user_scenario_score,
-                'user_profile_updated_at': datetime.datetime.now()
-            }})
+            set_user_profile_score(participant['scenario_participant_id'], 'user_scenario_score', user_scenario_score)
+
+        refresh_winning_wall('scenario', [participant['scenario_participant_id'] for participant in scenario_archive_game['scenario_participants']])
 
     def delete_game(self, scenario_game_id):
         scenario_active_game_collection.update_one({'scenario_game_id': scenario_game_id}, {"$set": {"scenario_is_ready":False}})
@@ -1265,7 +1266,7 @@ class ScenarioGameDeleteSerializer(serializers.Serializer):
                     "redirection_url": "",
                 }
             notification_collection.insert_one(notification)
-            async_to_sync(send_notification)(group_name=user_object['scenario_participant_id'])
+            async_to_sync(send_notification)(group_name=user_object['scenario_participant_id'], notification=notification)
 
         scenario_active_game_collection.delete_one({ "scenario_game_id": scenario_active_game['scenario_game_id']})
 
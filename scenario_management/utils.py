@@ -248,4 +248,4 @@ def create_scenario_game(validated_data):
         }
 
         notification_collection.insert_one(notification)
-        async_to_sync(send_notification)(group_name=invitation["scenario_participant_id"])
\ No newline at end of file
+        async_to_sync(send_notification)(group_name=invitation["scenario_participant_id"], notification=notification)
\ No newline at end of file
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from database_management.pymongo_client import user_profile_collection
+from user_management.utils import PROFILE_TOTAL_SCORE
+
+
+class Command(BaseCommand):
+    help = "Stores total_score (user_ctf_score + user_scenario_score) on every user profile."
+
+    def handle(self, *args, **options):
+        result = user_profile_collection.update_many({}, [{"$set": {"total_score": PROFILE_TOTAL_SCORE}}])
+        self.stdout.write(self.style.SUCCESS(f"Updated total_score on {result.modified_count} of {result.matched_count} profiles."))
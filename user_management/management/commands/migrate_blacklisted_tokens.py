@@ -0,0 +1,36 @@
+import datetime
+
+import jwt
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from database_management.pymongo_client import blacklisted_token_collection
+from user_management.utils import revoke_refresh_token
+
+
+class Command(BaseCommand):
+    help = "Moves legacy {token: ...} blacklist entries to the jti/expires_at revocation store."
+
+    def handle(self, *args, **options):
+        migrated, dropped = 0, 0
+        now = datetime.datetime.utcnow().timestamp()
+
+        for legacy in blacklisted_token_collection.find({"token": {"$exists": True}}):
+            try:
+                payload = jwt.decode(
+                    legacy["token"], settings.SECRET_KEY, algorithms=['HS256'], options={"verify_exp": False}
+                )
+            except jwt.InvalidTokenError:
+                payload = {}
+
+            # Expired tokens are rejected by signature validation anyway
+            if payload.get("jti") and payload.get("exp", 0) > now:
+                if not blacklisted_token_collection.find_one({"jti": payload["jti"]}):
+                    revoke_refresh_token(payload)
+                migrated += 1
+            else:
+                dropped += 1
+
+            blacklisted_token_collection.delete_one({"_id": legacy["_id"]})
+
+        self.stdout.write(self.style.SUCCESS(f"Migrated {migrated} revoked tokens, dropped {dropped} expired or invalid entries."))
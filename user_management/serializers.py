@@ -1,5 +1,7 @@
+import base64
 import datetime
 import hashlib
+import json
 import os
 import re
 import random
@@ -10,30 +12,31 @@ from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth.models import AnonymousUser
 from django.conf import settings
 from asgiref.sync import async_to_sync
+from pymongo.errors import DuplicateKeyError
 
 from core.utils import generate_random_string, API_URL, is_email_valid
-from scenario_management.utils import convert_score
 from database_management.pymongo_client import (
     user_collection,
     user_profile_collection,
     otp_hash_collection,
-    blacklisted_token_collection,
     ctf_game_collection,
     ctf_player_arsenal_collection,
     ctf_category_collection,
-    scenario_player_arsenal_collection,
-    scenario_collection,
-    archive_participant_collection,
 )
 
 from .authentications import CustomRefreshToken
+from .winning_wall import WINNING_WALL_TYPES, get_winning_wall
 from .encryption import cipher_suite
 from .utils import ( 
     generate_access_token_payload,
     get_user_from_refresh_token,
+    get_refresh_token_payload,
+    is_refresh_token_revoked,
+    revoke_refresh_token,
     generate_otp,
     send_otp_by_sms,
     send_otp_by_email,
+    invalidate_user_principal,
     USER_ROLES
 )
 
@@ -128,6 +131,7 @@ class UserRegisterSerializer(serializers.Serializer):
             "user_bio": "",
             "user_ctf_score": 0,
             "user_scenario_score": 0,
+            "total_score": 0,
             "user_badges_earned": [],
             "user_profile_liked_by": [],
             "user_profiles_liked": [],
@@ -200,19 +204,21 @@ class CustomTokenRefreshSerializer(serializers.Serializer):
         return data
 
     def validate(self, data):
+        payload = get_refresh_token_payload(data['refresh_token'])
+
         # Check if refresh token is blacklisted
-        if blacklisted_token_collection.find_one({'token': data['refresh_token']}):
+        if is_refresh_token_revoked(payload):
             raise serializers.ValidationError("Expired Token.")   
 
-        user = get_user_from_refresh_token(data['refresh_token'])
+        data['payload'] = payload
         return data
     
     def create(self, validated_data):
         # Updating Database
-        blacklisted_refresh_token = {
-            'token': validated_data['refresh_token']
-        }
-        blacklisted_token_collection.insert_one(blacklisted_refresh_token)
+        try:
+            revoke_refresh_token(validated_data['payload'])
+        except DuplicateKeyError:
+            raise serializers.ValidationError("Expired Token.")
 
         # Generating New Token
         # refresh = CustomRefreshToken.for_user(self.context['request'].user)
@@ -267,6 +273,7 @@ class SendOTPSerializer(serializers.Serializer):
         if validated_data.get('mobile_number'):
             mobile_number = validated_data.get('mobile_number')
             user_collection.update_one({"user_id": user_obj['user_id']}, { "$set": {"mobile_number": mobile_number, "updated_at": datetime.datetime.now()}})
+            invalidate_user_principal(user_obj['user_id'])
         else:
             mobile_number = user_obj.get('mobile_number')
 
@@ -328,6 +335,7 @@ class VerifyOTPSerializer(serializers.Serializer):
                     "updated_at": datetime.datetime.now()
                     }
             })
+            invalidate_user_principal(user_id)
             otp_hash_collection.delete_one({"user_id": user_id})
         else:
             error_msg = {
@@ -516,8 +524,36 @@ class UserListSerializer(serializers.Serializer):
     
 
 class TopPerformerSerializer(serializers.Serializer):
-    def get(self):
+    @staticmethod
+    def encode_cursor(total_score, user_id):
+        return base64.urlsafe_b64encode(json.dumps([total_score, user_id]).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            total_score, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, TypeError):
+            raise serializers.ValidationError("Invalid cursor.")
+        return total_score, user_id
+
+    def get(self, limit=7, cursor=None):
+        """
+        Returns `limit` performers of the global ranking, best first, plus the
+        cursor of the next page. Ties on total_score are ordered by user_id so
+        the (total_score, user_id) cursor is stable.
+        """
+        match = {"total_score": {"$gt": 0}}
+        if cursor:
+            total_score, user_id = self.decode_cursor(cursor)
+            match["$or"] = [
+                {"total_score": {"$lt": total_score}},
+                {"total_score": total_score, "user_id": {"$gt": user_id}},
+            ]
+
         pipeline = [
+            {"$match": match},
+            {"$sort": {"total_score": -1, "user_id": 1}},
+            {"$limit": limit + 1},
             {
                 "$lookup": {
                     "from": "user_collection",
@@ -535,174 +571,35 @@ class TopPerformerSerializer(serializers.Serializer):
                     "user_id": "$user_info.user_id",
                     "full_name": "$user_info.user_full_name",
                     "avatar": "$user_info.user_avatar",
-                    "total_score": { "$add": ["$user_ctf_score", "$user_scenario_score"] },
+                    "total_score": 1,
                 }
             }
         ]
-        
+
         result = list(user_profile_collection.aggregate(pipeline))
 
-        for user in result[:]:  
-            if user["total_score"] > 0:
-                user["total_score"] = round(user["total_score"])
-                user["badge"] = "Gold"
-            else:
-                result.remove(user)
+        next_cursor = None
+        if len(result) > limit:
+            result = result[:limit]
+            next_cursor = self.encode_cursor(result[-1]["total_score"], result[-1]["user_id"])
 
-        top_7_users = sorted(result, key=lambda x: x["total_score"], reverse=True)[:7]
-        
-        return top_7_users
+        for user in result:
+            user["total_score"] = round(user["total_score"])
+            user["badge"] = "Gold"
+
+        return {"results": result, "next_cursor": next_cursor}
 
 
 class CommonWinningWallSerializer(serializers.Serializer):
-    def get(self, keyword):
-        if keyword not in ('ctf', 'scenario', 'corporate'):
+    def get(self, keyword, page=1, page_size=None):
+        if keyword not in WINNING_WALL_TYPES:
             return {
                 "errors": {
                     "non_field_errors": ["Invalid Keyword"]
                 }
             }  
 
-        user_scores = {}
-        winning_wall_data = []
-
-        if keyword == 'ctf':
-            challenge_ctf_games = ctf_game_collection.find({'ctf_is_challenge': True}, {'_id': 0, 'ctf_id': 1, 'ctf_score':1})
-            challenge_ctf_ids = [game['ctf_id'] for game in challenge_ctf_games]
-            ctf_players = ctf_player_arsenal_collection.find({}, {'_id': 0, 'user_id': 1, 'ctf_score_obtained': 1, 'ctf_id': 1})
-
-            for player in ctf_players:
-                user_id = player['user_id']
-                ctf_score_obtained = player['ctf_score_obtained']
-                ctf_id = player['ctf_id']
-
-                if user_id not in user_scores:
-                    user_scores[user_id] = {
-                        'ctf_score_obtained': 0,
-                        'ctf_challenge_score': 0,
-                        'max_score': 0
-                    }
-
-                user_scores[user_id]['ctf_score_obtained'] += ctf_score_obtained
-
-                ctf_scores = [game['ctf_score'] for game in ctf_game_collection.find({'ctf_id': ctf_id}, {'_id': 0, 'ctf_score': 1})]
-
-                if ctf_scores:
-                    user_scores[user_id]['max_score'] += sum(ctf_scores)  
-                else:
-                    user_scores[user_id]['max_score'] += 0
-
-                if ctf_id in challenge_ctf_ids:
-                    user_scores[user_id]['ctf_challenge_score'] += ctf_score_obtained
-
-            for user_id, user_data in user_scores.items():
-                user = user_collection.find_one({'user_id': user_id})
-
-                if user:
-                    winning_wall_data.append({
-                        "user_id": user['user_id'],
-                        "user_full_name": user["user_full_name"],
-                        "user_avatar": user["user_avatar"],
-                        "user_role": user.get("user_role", ""),
-                        "score_obtained": str(round(user_data['ctf_score_obtained']))+'/'+str(round(user_data['max_score'])),
-                        "challenge_score": str(round(user_data['ctf_challenge_score']))+'/'+str(round(user_data['max_score'])),
-                        "badge_earned": "Gold"
-                    })
-
-            return sorted(winning_wall_data, key=lambda x: convert_score(x["score_obtained"]), reverse=True)
-
-        elif keyword == 'scenario':
-            scenario_game = scenario_collection.find({})
-
-            if scenario_game:
-                scenario_players_count = scenario_player_arsenal_collection.count_documents({})
-
-                if scenario_players_count > 0:
-                    scenario_players = scenario_player_arsenal_collection.find({})
-
-                    for player in scenario_players:
-                        scenario_score_obtained = player['scenario_score_obtained']
-                        user_id = player['scenario_participant_id']
-                        scenario_id = player['scenario_id']
-
-                        if user_id not in user_scores:
-                            user_scores[user_id] = {
-                                'scenario_score_obtained': 0,
-                                'max_score':0
-                            }
-
-                        user_scores[user_id]['scenario_score_obtained'] += scenario_score_obtained
-
-                        scenario_scores = [game['scenario_score'] for game in scenario_collection.find({'scenario_id': scenario_id}, {'_id': 0, 'scenario_score': 1})]
-
-                        if scenario_scores:
-                            user_scores[user_id]['max_score'] += sum(scenario_scores)  
-                        else:
-                            user_scores[user_id]['max_score'] += 0
-
-                    for user_id, user_data in user_scores.items():
-                        user = user_collection.find_one({'user_id': user_id})
-
-                        if user:
-                            winning_wall_data.append({
-                                "user_id": user['user_id'],
-                                "user_full_name": user["user_full_name"],
-                                "user_avatar": user["user_avatar"],
-                                "user_role": user["user_role"],
-                                "score_obtained": str(round(user_data['scenario_score_obtained']))+'/'+str(round(user_data['max_score'])),
-                                "badge_earned": "Gold"
-                            })
-
-            return sorted(winning_wall_data, key=lambda x: convert_score(x["score_obtained"]), reverse=True)
-
-        elif keyword == 'corporate':
-            corporate_games = list(archive_participant_collection.find({},{"_id":0, "user_id":1, "scenario_id":1, "total_obtained_score":1,"total_score":1}))
-            if corporate_games:
-                p_array = {}
-                for games in corporate_games:
-                    if p_array.get(games["user_id"]):
-                        p_array[games["user_id"]].append(games)
-                    else:
-                        p_array[games["user_id"]] = [games,]
-                max_user_scores = []
-
-                for user_id, records in p_array.items():
-                    new_score_obj = {}
-                    scenario_based = {}
-                    for record in records:
-                        if scenario_based.get(record["scenario_id"]):
-                            scenario_based[record["scenario_id"]].append(record)
-                        else:
-                            scenario_based[record["scenario_id"]] = [record,]
-                    total_obtained_score = 0
-                    total_score = 0
-                    for s_id, records1 in scenario_based.items():
-                        
-                        max_score_obj = max(records1, key=lambda x: x['total_obtained_score'])
-                        total_obtained_score+=max_score_obj["total_obtained_score"]
-                        total_score+=max_score_obj["total_score"]
-
-                    new_score_obj["user_id"] = user_id
-                    new_score_obj["total_obtained_score"] = total_obtained_score
-                    new_score_obj["total_score"] = total_score
-                    user_info = user_collection.find_one({"user_id":user_id},{"_id":0,"user_full_name":1,"user_role":1,"user_avatar":1})
-                    new_score_obj.update(user_info)
-                    new_score_obj["badge_earned"] = "Gold"
-                    new_score_obj["score_obtained"]= str(round(total_obtained_score))+'/'+str(round(total_score))
-                    max_user_scores.append(new_score_obj)
-
-                    # adding corporate score to user profile collection
-                    profile_obj = user_profile_collection.find_one({"user_id":user_id},{"_id":0})
-                    if profile_obj.get("user_corporate_score"):
-                        if round(profile_obj["user_corporate_score"]) != round(total_obtained_score):
-                            user_profile_collection.update_one({"user_id":user_id},{"$set":{"user_corporate_score":round(total_obtained_score)}})
-                    else:
-                        user_profile_collection.update_one({"user_id":user_id},{"$set":{"user_corporate_score":round(total_obtained_score)}})
-
-                sorted_achivers_data = sorted(max_user_scores, key=lambda x: x["total_obtained_score"], reverse=True)
-            else:
-                sorted_achivers_data = []
-            return sorted_achivers_data
+        return get_winning_wall(keyword, page=page, page_size=page_size)
         
 class ForgotPasswordSerializer(serializers.Serializer):
     email = serializers.EmailField(max_length=100, write_only=True)
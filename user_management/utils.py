@@ -2,6 +2,7 @@ import random
 import string
 import jwt
 import hashlib
+import redis
 
 from django.conf import settings
 from datetime import datetime, timedelta
@@ -15,9 +16,12 @@ from django.template.loader import render_to_string
 
 from database_management.pymongo_client import (
     user_collection, 
-    id_collection,
-    otp_hash_dump_collection
+    user_profile_collection,
+    otp_hash_dump_collection,
+    blacklisted_token_collection
 )
+from database_management.redis_client import redis_client
+from core.cache import TTLCache
 from core.utils import EMAIL_LOGO_URL
 
 
@@ -30,6 +34,29 @@ USER_ROLES = [
 ]
 
 
+# Fields of the authenticated principal (request.user); the password never leaves Mongo
+USER_PRINCIPAL_PROJECTION = {
+    "_id": 0,
+    "user_id": 1,
+    "user_full_name": 1,
+    "mobile_number": 1,
+    "email": 1,
+    "user_avatar": 1,
+    "user_role": 1,
+    "is_active": 1,
+    "is_premium": 1,
+    "is_verified": 1,
+    "is_admin": 1,
+    "is_superadmin": 1,
+}
+
+USER_PRINCIPAL_CACHE_TTL = getattr(settings, "USER_PRINCIPAL_CACHE_TTL", 60)
+user_principal_cache = TTLCache("user_principals", ttl=USER_PRINCIPAL_CACHE_TTL, local_ttl=5)
+
+# Revoked refresh tokens: one Redis bloom filter per expiry date in front of the Mongo store
+REVOKED_TOKEN_BLOOM_BITS = 2 ** 20
+REVOKED_TOKEN_BLOOM_HASHES = 7
+
 
 class InvalidUser(AuthenticationFailed):
     status_code = status.HTTP_403_FORBIDDEN
@@ -37,12 +64,25 @@ class InvalidUser(AuthenticationFailed):
     default_code = 'user_credentials_not_valid'
 
 
+def get_user_principal(user_id):
+    user = user_principal_cache.get(
+        user_id, lambda: user_collection.find_one({'user_id': user_id}, USER_PRINCIPAL_PROJECTION)
+    )
+    # Callers mutate request.user, so never hand out the cached object itself
+    return dict(user) if user else None
+
+
+def invalidate_user_principal(user_id):
+    """Call after any change to a user's identity, verification or role fields, or on delete."""
+    user_principal_cache.invalidate(user_id)
+
+
 def get_user_from_jwt_token(token):
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
         user_id = payload['user_id']
 
-        user = user_collection.find_one({'user_id': user_id})
+        user = get_user_principal(user_id)
         if not user:
             raise AuthenticationFailed('Invalid Token.')
 
@@ -53,10 +93,6 @@ def get_user_from_jwt_token(token):
     except Exception as e:
         raise InvalidUser('Invalid token.')
 
-    keys_to_remove = ['_id', 'password']
-    for key in keys_to_remove:
-        user.pop(key, None)
-
     return user, payload
 
 def get_user_from_refresh_token(token):
@@ -67,6 +103,14 @@ def get_user_from_refresh_token(token):
     else:
         return user
     
+def get_refresh_token_payload(token):
+    user, payload = get_user_from_jwt_token(token)
+    # Check if the token is a refresh token
+    if payload['token_type'] != 'refresh':
+        raise AuthenticationFailed('Invalid Refresh Token.')
+    else:
+        return payload
+    
 def get_user_from_access_token(token):
     user, payload = get_user_from_jwt_token(token)
     # Check if the token is a refresh token
@@ -76,6 +120,71 @@ def get_user_from_access_token(token):
         return user
 
 
+def _revoked_token_bloom(jti, exp):
+    expiry_date = datetime.utcfromtimestamp(exp).strftime("%Y%m%d")
+    digest = hashlib.sha256(jti.encode()).digest()
+    positions = [
+        int.from_bytes(digest[i * 4:(i + 1) * 4], "big") % REVOKED_TOKEN_BLOOM_BITS
+        for i in range(REVOKED_TOKEN_BLOOM_HASHES)
+    ]
+    return f"bloom:revoked_refresh_tokens:{expiry_date}", positions
+
+
+def is_refresh_token_revoked(payload):
+    jti = payload.get('jti')
+    if not jti:
+        return False
+
+    # A clear bit means the token was never revoked, so most refreshes skip Mongo
+    bloom_key, positions = _revoked_token_bloom(jti, payload['exp'])
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        for position in positions:
+            pipeline.getbit(bloom_key, position)
+        if not all(pipeline.execute()):
+            return False
+    except redis.RedisError:
+        pass
+
+    return blacklisted_token_collection.find_one({'jti': jti}, {'_id': 1}) is not None
+
+
+def revoke_refresh_token(payload):
+    """
+    Records the token as used. Raises pymongo DuplicateKeyError when it was
+    already revoked, e.g. by a concurrent refresh with the same token.
+    """
+    jti = payload['jti']
+    expires_at = datetime.utcfromtimestamp(payload['exp'])
+    blacklisted_token_collection.insert_one({
+        'jti': jti,
+        'user_id': payload.get('user_id'),
+        'expires_at': expires_at,
+    })
+
+    bloom_key, positions = _revoked_token_bloom(jti, payload['exp'])
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        for position in positions:
+            pipeline.setbit(bloom_key, position, 1)
+        pipeline.expireat(bloom_key, int(payload['exp']) + 86400)
+        pipeline.execute()
+    except redis.RedisError:
+        pass
+
+
+# Kept on every profile so the global ranking can be served from an index
+PROFILE_TOTAL_SCORE = {"$add": [{"$ifNull": ["$user_ctf_score", 0]}, {"$ifNull": ["$user_scenario_score", 0]}]}
+
+
+def set_user_profile_score(user_id, score_field, score):
+    """Sets user_ctf_score/user_scenario_score and recomputes the stored total_score in the same update."""
+    return user_profile_collection.update_one({'user_id': user_id}, [
+        {'$set': {score_field: score, 'user_profile_updated_at': datetime.now()}},
+        {'$set': {'total_score': PROFILE_TOTAL_SCORE}},
+    ])
+
+
 def generate_access_token_payload(access_token):
     access_token_payload = jwt.decode(access_token, settings.SECRET_KEY, algorithms=['HS256'])
     
@@ -1,4 +1,4 @@
-from rest_framework import generics, status
+from rest_framework import generics, serializers, status
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 
@@ -195,16 +195,21 @@ class UserListView(generics.ListAPIView):
 class TopPerformerView(generics.ListAPIView):
     serializer_class = TopPerformerSerializer
 
-    def get_queryset(self):
-        return self.serializer_class().get()
-
     @swagger_auto_schema(
         responses={200: TopPerformerSerializer()},
         operation_summary="Top Performers List",
     )
     def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        return Response(queryset)
+        # Without paging params keep returning the plain top 7 list the home page expects
+        if 'cursor' not in request.query_params and 'limit' not in request.query_params:
+            return Response(self.serializer_class().get()["results"])
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 7)), 1), 100)
+            response = self.serializer_class().get(limit=limit, cursor=request.query_params.get('cursor'))
+        except (ValueError, serializers.ValidationError):
+            return Response({'errors': {'non_field_errors': ['Invalid pagination parameters.']}}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(response)
     
 
 class CommonWinningWallView(generics.ListAPIView):
@@ -212,7 +217,14 @@ class CommonWinningWallView(generics.ListAPIView):
 
     def get_queryset(self):
         keyword = self.kwargs['keyword']
-        return self.serializer_class().get(keyword)
+        try:
+            page = max(int(self.request.query_params.get('page', 1)), 1)
+            # Without page_size the whole wall is returned, as before paging existed
+            page_size = self.request.query_params.get('page_size')
+            page_size = min(max(int(page_size), 1), 100) if page_size is not None else None
+        except ValueError:
+            page, page_size = 1, None
+        return self.serializer_class().get(keyword, page=page, page_size=page_size)
     
     @swagger_auto_schema(
         responses={200: CommonWinningWallSerializer()},
@@ -0,0 +1,185 @@
+import datetime
+
+from celery import shared_task
+
+from database_management.pymongo_client import (
+    user_collection,
+    user_profile_collection,
+    ctf_game_collection,
+    ctf_player_arsenal_collection,
+    scenario_collection,
+    scenario_player_arsenal_collection,
+    archive_participant_collection,
+    winning_wall_collection,
+)
+
+WINNING_WALL_TYPES = ('ctf', 'scenario', 'corporate')
+
+
+def _ctf_rollup(user_id):
+    arsenals = list(ctf_player_arsenal_collection.find({'user_id': user_id}, {'_id': 0, 'ctf_id': 1, 'ctf_score_obtained': 1}))
+    if not arsenals:
+        return None
+
+    ctf_games = {
+        game['ctf_id']: game
+        for game in ctf_game_collection.find(
+            {'ctf_id': {'$in': [arsenal['ctf_id'] for arsenal in arsenals]}},
+            {'_id': 0, 'ctf_id': 1, 'ctf_score': 1, 'ctf_is_challenge': 1}
+        )
+    }
+
+    rollup = {'score_obtained': 0, 'max_score': 0, 'challenge_score': 0}
+    for arsenal in arsenals:
+        ctf_game = ctf_games.get(arsenal['ctf_id'], {})
+        rollup['score_obtained'] += arsenal['ctf_score_obtained']
+        rollup['max_score'] += ctf_game.get('ctf_score', 0)
+        if ctf_game.get('ctf_is_challenge'):
+            rollup['challenge_score'] += arsenal['ctf_score_obtained']
+    return rollup
+
+
+def _scenario_rollup(user_id):
+    arsenals = list(scenario_player_arsenal_collection.find(
+        {'scenario_participant_id': user_id},
+        {'_id': 0, 'scenario_id': 1, 'scenario_score_obtained': 1}
+    ))
+    if not arsenals:
+        return None
+
+    scenario_scores = {
+        scenario['scenario_id']: scenario.get('scenario_score', 0)
+        for scenario in scenario_collection.find(
+            {'scenario_id': {'$in': [arsenal['scenario_id'] for arsenal in arsenals]}},
+            {'_id': 0, 'scenario_id': 1, 'scenario_score': 1}
+        )
+    }
+
+    rollup = {'score_obtained': 0, 'max_score': 0}
+    for arsenal in arsenals:
+        rollup['score_obtained'] += arsenal['scenario_score_obtained']
+        rollup['max_score'] += scenario_scores.get(arsenal['scenario_id'], 0)
+    return rollup
+
+
+def _corporate_rollup(user_id):
+    records = archive_participant_collection.find(
+        {'user_id': user_id},
+        {'_id': 0, 'scenario_id': 1, 'total_obtained_score': 1, 'total_score': 1}
+    )
+
+    # Only the best attempt of each scenario counts
+    best_attempts = {}
+    for record in records:
+        best = best_attempts.get(record['scenario_id'])
+        if not best or record['total_obtained_score'] > best['total_obtained_score']:
+            best_attempts[record['scenario_id']] = record
+    if not best_attempts:
+        return None
+
+    rollup = {
+        'score_obtained': sum(record['total_obtained_score'] for record in best_attempts.values()),
+        'max_score': sum(record['total_score'] for record in best_attempts.values()),
+    }
+    user_profile_collection.update_one(
+        {'user_id': user_id},
+        {'$set': {'user_corporate_score': round(rollup['score_obtained'])}}
+    )
+    return rollup
+
+
+ROLLUPS = {
+    'ctf': _ctf_rollup,
+    'scenario': _scenario_rollup,
+    'corporate': _corporate_rollup,
+}
+
+
+def refresh_winning_wall(game_type, user_ids):
+    """Recomputes the winning wall rows of the given users from their arsenals/archives."""
+    current_time = datetime.datetime.now()
+    for user_id in set(user_ids):
+        rollup = ROLLUPS[game_type](user_id)
+        if rollup is None:
+            winning_wall_collection.delete_one({'game_type': game_type, 'user_id': user_id})
+            continue
+
+        rollup['updated_at'] = current_time
+        winning_wall_collection.update_one(
+            {'game_type': game_type, 'user_id': user_id},
+            {'$set': rollup},
+            upsert=True
+        )
+
+
+@shared_task
+def refresh_winning_wall_task(game_type, user_ids):
+    refresh_winning_wall(game_type, user_ids)
+
+
+@shared_task
+def rebuild_winning_wall(game_type=None):
+    """Batch recompute of the whole winning wall, for drift or after data fixes."""
+    player_sources = {
+        'ctf': lambda: ctf_player_arsenal_collection.distinct('user_id'),
+        'scenario': lambda: scenario_player_arsenal_collection.distinct('scenario_participant_id'),
+        'corporate': lambda: archive_participant_collection.distinct('user_id'),
+    }
+
+    rebuilt = {}
+    for wall_type in ([game_type] if game_type else WINNING_WALL_TYPES):
+        user_ids = player_sources[wall_type]()
+        refresh_winning_wall(wall_type, user_ids)
+        winning_wall_collection.delete_many({'game_type': wall_type, 'user_id': {'$nin': user_ids}})
+        rebuilt[wall_type] = len(user_ids)
+    return rebuilt
+
+
+def get_winning_wall(game_type, page=1, page_size=None):
+    """Reads one page of the materialized winning wall, highest score first; user_id breaks ties so pages stay stable."""
+    cursor = winning_wall_collection.find({'game_type': game_type}, {'_id': 0}).sort([('score_obtained', -1), ('user_id', 1)])
+    if page_size:
+        cursor = cursor.skip((page - 1) * page_size).limit(page_size)
+    rows = list(cursor)
+
+    users = {
+        user['user_id']: user
+        for user in user_collection.find(
+            {'user_id': {'$in': [row['user_id'] for row in rows]}},
+            {'_id': 0, 'user_id': 1, 'user_full_name': 1, 'user_avatar': 1, 'user_role': 1}
+        )
+    }
+
+    winning_wall_data = []
+    for row in rows:
+        user = users.get(row['user_id'])
+        if not user:
+            continue
+
+        score_obtained = str(round(row['score_obtained'])) + '/' + str(round(row['max_score']))
+        if game_type == 'corporate':
+            winning_wall_data.append({
+                "user_id": row['user_id'],
+                "total_obtained_score": row['score_obtained'],
+                "total_score": row['max_score'],
+                "user_full_name": user.get("user_full_name"),
+                "user_role": user.get("user_role", ""),
+                "user_avatar": user.get("user_avatar"),
+                "badge_earned": "Gold",
+                "score_obtained": score_obtained,
+            })
+            continue
+
+        data = {
+            "user_id": row['user_id'],
+            "user_full_name": user.get("user_full_name"),
+            "user_avatar": user.get("user_avatar"),
+            "user_role": user.get("user_role", ""),
+            "score_obtained": score_obtained,
+            "badge_earned": "Gold",
+        }
+        if game_type == 'ctf':
+            data["challenge_score"] = str(round(row.get('challenge_score', 0))) + '/' + str(round(row['max_score']))
+        winning_wall_data.append(data)
+
+    return winning_wall_data